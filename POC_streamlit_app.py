@@ -1,15 +1,42 @@
 import os
 import base64
-import random
-import string
+import sys
+import time
 
 import streamlit as st
 
+from master_kdf import SessionKeyCache, authenticate
+from master_kdf import create_master_password as store_master_password
+from reuse_index import reuse_warning
+from search_index import search_accounts
+from secret_cache import secret_cache_for
+from strength_estimator import clear_caches
+from vault_autosave import autosave_for
+from vault_engine import (
+    ConflictError,
+    compare_and_set,
+    encode_password,
+    evaluate_password,
+    get_vault,
+    password_generator,
+    save_passwords,
+)
+from vault_metrics import enabled as metrics_enabled
+from vault_metrics import snapshot as metrics_snapshot
+from vault_metrics import start_profile, timed
+from vault_view import (
+    PAGE_SIZES,
+    SORT_ORDERS,
+    order_accounts,
+    page_count,
+    page_slice,
+    render_page_html,
+)
+
 # ================== Constants ==================
 
 LOGO_PATH = "logo.png"
 MASTER_FILE = "master_password.txt"
-PASSWORDS_FILE = "app_passwords.txt"
 
 
 # ================== Styles ==================
@@ -113,106 +140,6 @@ def apply_custom_style() -> None:
 
 # ================== Data helpers ==================
 
-def load_passwords() -> dict:
-    """Load stored passwords from file into a dictionary."""
-    storage = {}
-    if os.path.exists(PASSWORDS_FILE):
-        with open(PASSWORDS_FILE, "r") as f:
-            for line in f:
-                if ":" in line:
-                    account, encoded_pw = line.strip().split(":", 1)
-                    storage[account] = encoded_pw
-    return storage
-
-
-def save_passwords(storage: dict) -> None:
-    """Save passwords dictionary to file."""
-    with open(PASSWORDS_FILE, "w") as f:
-        for account, encoded_pw in storage.items():
-            f.write(f"{account}:{encoded_pw}\n")
-
-
-def evaluate_password(pw: str) -> dict:
-    """Evaluate password and return details + strength."""
-    score = 0
-    result = {
-        "length_ok": False,
-        "has_upper": False,
-        "has_lower": False,
-        "has_digit": False,
-        "has_symbol": False,
-        "strength": "Weak",
-    }
-
-    if len(pw) >= 8:
-        result["length_ok"] = True
-        score += 20
-
-    if any(char.isupper() for char in pw):
-        result["has_upper"] = True
-        score += 20
-
-    if any(char.islower() for char in pw):
-        result["has_lower"] = True
-        score += 20
-
-    if any(char.isdigit() for char in pw):
-        result["has_digit"] = True
-        score += 20
-
-    symbols = "!@#$%^&*()-_=+[]{};:,.<>/"
-    if any(char in symbols for char in pw):
-        result["has_symbol"] = True
-        score += 20
-
-    if score == 100:
-        result["strength"] = "Strong"
-    elif 80 >= score >= 50:
-        result["strength"] = "Medium"
-    else:
-        result["strength"] = "Weak"
-
-    return result
-
-
-def password_generator(length: int, preference: list[str]) -> tuple[str, str]:
-    """
-    Generate a password of given length.
-    preference = [upper?, digits?, symbols?] with values "yes"/"no".
-    """
-    all_pools = []
-    password_chars = []
-
-    # Always include lowercase letters
-    lowercase = string.ascii_lowercase
-    all_pools.append(lowercase)
-    password_chars.append(random.choice(lowercase))
-
-    if preference[0] == "yes":
-        uppercase = string.ascii_uppercase
-        all_pools.append(uppercase)
-        password_chars.append(random.choice(uppercase))
-
-    if preference[1] == "yes":
-        digits = string.digits
-        all_pools.append(digits)
-        password_chars.append(random.choice(digits))
-
-    if preference[2] == "yes":
-        symbols = string.punctuation
-        all_pools.append(symbols)
-        password_chars.append(random.choice(symbols))
-
-    # Complete password to required length
-    while len(password_chars) < length:
-        pool = random.choice(all_pools)
-        password_chars.append(random.choice(pool))
-
-    password = "".join(password_chars[:length])
-    eval_results = evaluate_password(password)
-    return password, eval_results["strength"]
-
-
 def get_logo_base64(path: str) -> str | None:
     """Return base64-encoded logo or None."""
     try:
@@ -224,6 +151,21 @@ def get_logo_base64(path: str) -> str | None:
 
 # ================== Authentication UI ==================
 
+def get_key_cache() -> SessionKeyCache:
+    """Per-session cache of the derived master key."""
+    if "key_cache" not in st.session_state:
+        st.session_state.key_cache = SessionKeyCache()
+    return st.session_state.key_cache
+
+
+def logout() -> None:
+    """Forget the session's key and wipe decoded passwords and memoized estimates."""
+    secret_cache_for(st.session_state.storage).clear()
+    clear_caches()
+    get_key_cache().clear()
+    st.session_state.authenticated = False
+
+
 def create_master_password() -> None:
     """Screen to create the initial master password."""
     st.subheader("Create Master Password")
@@ -237,14 +179,15 @@ def create_master_password() -> None:
         evaluation = evaluate_password(new_pw)
         st.write(f"Password strength: **{evaluation['strength']}**")
 
-        encoded_password = base64.b64encode(new_pw.encode()).decode()
-        with open(MASTER_FILE, "w") as f:
-            f.write(encoded_password)
+        # Calibrates scrypt to this machine and stores the verifier.
+        key = store_master_password(new_pw, MASTER_FILE)
+        get_key_cache().remember(new_pw, key)
 
         st.success("Master password created successfully. You are now logged in.")
         st.session_state.authenticated = True
 
 
+@timed("page.login")
 def login_screen() -> None:
     """Login screen for master password."""
     if not os.path.exists(MASTER_FILE):
@@ -255,13 +198,10 @@ def login_screen() -> None:
 
     pw = st.text_input("Enter master password", type="password", autocomplete="off")
     if st.button("Login"):
-        with open(MASTER_FILE, "r") as f:
-            stored = f.read().strip()
-
-        encoded_user_password = base64.b64encode(pw.encode()).decode()
-        if encoded_user_password == stored:
+        # The session cache answers repeated logins without re-running scrypt.
+        if authenticate(pw, get_key_cache(), MASTER_FILE) is not None:
             st.session_state.authenticated = True
-            st.session_state.storage = load_passwords()
+            st.session_state.storage = get_vault()
             st.success("Logged in successfully.")
             st.rerun()
         else:
@@ -270,6 +210,7 @@ def login_screen() -> None:
 
 # ================== Pages / UI functions ==================
 
+@timed("page.add_password")
 def add_password_ui() -> None:
     st.subheader("Add Password")
 
@@ -286,14 +227,23 @@ def add_password_ui() -> None:
 
         evaluation = evaluate_password(password)
         st.write(f"Password strength: **{evaluation['strength']}**")
+        if evaluation["feedback"]:
+            st.caption(evaluation["feedback"])
+        if evaluation["breached"]:
+            st.warning("This password appears in a known data breach.")
 
-        encoded_password = base64.b64encode(password.encode()).decode()
+        warning = reuse_warning(st.session_state.storage, account, password)
+        if warning:
+            st.warning(warning)
+
+        encoded_password = encode_password(password)
         st.session_state.storage[account] = encoded_password
         st.success("Password added successfully.")
 
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+@timed("page.update_password")
 def update_password_ui() -> None:
     st.subheader("Update Password")
 
@@ -304,6 +254,13 @@ def update_password_ui() -> None:
     accounts = sorted(st.session_state.storage.keys())
     selected_account = st.selectbox("Select account to update", accounts)
 
+    # The value shown when the form was drawn; the update is refused if
+    # another session (or the CLI) changes the account before it is submitted.
+    seen_account, expected = st.session_state.get("update_seen", (None, None))
+    if seen_account != selected_account:
+        expected = st.session_state.storage.get(selected_account)
+    st.session_state.update_seen = (selected_account, expected)
+
     with st.form("update_form"):
         new_pw = st.text_input("New password", type="password")
         submitted = st.form_submit_button("Update")
@@ -315,16 +272,31 @@ def update_password_ui() -> None:
 
             evaluation = evaluate_password(new_pw)
             st.write(f"Password strength: **{evaluation['strength']}**")
+            if evaluation["feedback"]:
+                st.caption(evaluation["feedback"])
+            if evaluation["breached"]:
+                st.warning("This password appears in a known data breach.")
+
+            warning = reuse_warning(st.session_state.storage, selected_account, new_pw)
+            if warning:
+                st.warning(warning)
 
             if evaluation["strength"] == "Weak":
                 st.error("Password too weak — update denied.")
                 return
 
-            encoded = base64.b64encode(new_pw.encode()).decode()
-            st.session_state.storage[selected_account] = encoded
+            encoded = encode_password(new_pw)
+            try:
+                compare_and_set(st.session_state.storage, selected_account, expected, encoded)
+            except ConflictError:
+                st.session_state.update_seen = (None, None)
+                st.error("This account was changed in another session. Please try again.")
+                return
+            st.session_state.update_seen = (selected_account, encoded)
             st.success("Password updated successfully.")
 
 
+@timed("page.delete_password")
 def delete_password_ui() -> None:
     st.subheader("Delete Password")
 
@@ -336,10 +308,15 @@ def delete_password_ui() -> None:
     selected_account = st.selectbox("Select account to delete", accounts)
 
     if st.button("Delete this account"):
-        del st.session_state.storage[selected_account]
+        try:
+            del st.session_state.storage[selected_account]
+        except KeyError:
+            st.info(f"**{selected_account}** was already deleted in another session.")
+            return
         st.success(f"Deleted password for **{selected_account}**.")
 
 
+@timed("page.generate_password")
 def generate_password_ui() -> None:
     st.subheader("Generate Password")
 
@@ -399,6 +376,7 @@ def generate_password_ui() -> None:
         )
 
 
+@timed("page.view_passwords")
 def view_passwords_ui() -> None:
     st.subheader("View Saved Accounts")
 
@@ -407,37 +385,91 @@ def view_passwords_ui() -> None:
         st.info("No passwords stored.")
         return
 
-    query = st.text_input("Search by account name (optional)")
-    show_passwords = st.checkbox("Show passwords", value=False)
+    # Keyed widgets keep search, sort and page size across reruns.
+    query = st.text_input("Search by account name (optional)", key="view_query")
+    show_passwords = st.checkbox("Show passwords", value=False, key="view_show")
 
-    filtered = {
-        acc: pw for acc, pw in storage.items()
-        if not query or query.lower() in acc.lower()
-    }
+    col_order, col_size = st.columns(2)
+    with col_order:
+        order = st.selectbox("Sort", SORT_ORDERS, key="view_order")
+    with col_size:
+        page_size = st.selectbox("Accounts per page", PAGE_SIZES, key="view_page_size")
+
+    # Filter on names only through the session's trigram index (sorted A → Z);
+    # passwords are decoded below only for the visible page.
+    filtered = order_accounts(search_accounts(storage, query), order)
 
     if not filtered:
         st.warning(f"No results found for '{query}'.")
         return
 
+    # Clamp the remembered page before the widget is drawn, since the number
+    # of pages changes with the search and the page size.
+    pages = page_count(len(filtered), page_size)
+    st.session_state.view_page = min(st.session_state.get("view_page", 1), pages)
+
     st.markdown(
         f"<p class='listed-passwords'>Total passwords: <b>{len(filtered)}</b></p>",
         unsafe_allow_html=True,
     )
 
-    for i, (acc, enc_pw) in enumerate(sorted(filtered.items()), start=1):
-        if show_passwords:
-            password_display = base64.b64decode(enc_pw.encode()).decode()
-        else:
-            password_display = "<span class='password-hidden'>●●●●●●●●</span>"
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="view_page")
+    start, end = page_slice(len(filtered), page, page_size)
 
-        st.markdown(
-            f"<p class='listed-passwords'>{i}. <b>{acc}</b> : {password_display}</p>",
-            unsafe_allow_html=True,
+    # One HTML block per page instead of one st.markdown call per account.
+    # Decoded passwords come from the cache, so paging back and forth or
+    # re-rendering does not decode them again.
+    cache = secret_cache_for(storage)
+    st.markdown(
+        render_page_html(storage, filtered[start:end], start + 1, show_passwords, cache.get),
+        unsafe_allow_html=True,
+    )
+    st.caption(f"Page {page} of {pages}")
+    if show_passwords:
+        stats = cache.stats
+        st.caption(
+            f"Secret cache: {len(cache)} entries, {cache.hit_rate():.0%} hits "
+            f"({stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions)"
+        )
+
+
+def autosave_status_ui(writer) -> None:
+    """Dirty / last-saved indicator and write batching metrics in the sidebar."""
+    if writer.dirty:
+        st.sidebar.caption("● Unsaved changes")
+    elif writer.last_flushed_at is not None:
+        saved_at = time.strftime("%H:%M:%S", time.localtime(writer.last_flushed_at))
+        st.sidebar.caption(f"✓ All changes saved at {saved_at}")
+    else:
+        st.sidebar.caption("✓ No unsaved changes")
+
+    with st.sidebar.expander("Autosave metrics"):
+        metrics = writer.snapshot_metrics()
+        st.write(
+            f"Changes: **{metrics['mutations']}**  \n"
+            f"Writes: **{metrics['batches']}** "
+            f"({metrics['mutations_per_batch']:.1f} changes per write)  \n"
+            f"Last write: **{metrics['last_flush_ms']:.1f} ms**  \n"
+            f"Errors: **{metrics['errors']}**"
         )
 
 
+def timings_ui() -> None:
+    """Per-operation timings in the sidebar, when metrics are being collected."""
+    if not metrics_enabled():
+        return
+    with st.sidebar.expander("Timings"):
+        operations = metrics_snapshot()["operations"]
+        st.write("  \n".join(
+            f"{name}: **{op['count']}** × {op['mean_ms']:.1f} ms "
+            f"(p99 ≤ {op['p99_ms']:.1f} ms, max {op['max_ms']:.1f} ms)"
+            for name, op in operations.items()
+        ) or "No operations yet.")
+
+
 # ================== Main app ==================
 
+@timed("page.rerun")
 def main() -> None:
     st.set_page_config(page_title="Password Manager")
     apply_custom_style()
@@ -482,8 +514,11 @@ def main() -> None:
     # ----- Session state -----
     if "authenticated" not in st.session_state:
         st.session_state.authenticated = False
+    # Every session shares the vault loaded once for the server process.
     if "storage" not in st.session_state:
-        st.session_state.storage = load_passwords()
+        st.session_state.storage = get_vault()
+    # Wipe decoded passwords whose time in the cache is up.
+    secret_cache_for(st.session_state.storage).purge_expired()
 
     # ----- Login -----
     if not st.session_state.authenticated:
@@ -503,9 +538,18 @@ def main() -> None:
         ],
     )
 
+    # Changes are saved by a background writer shortly after they are made;
+    # the button only asks it to write now instead of after the debounce.
+    writer = autosave_for(st.session_state.storage, save=save_passwords)
     if st.sidebar.button("Save Changes"):
-        save_passwords(st.session_state.storage)
-        st.sidebar.success("The changes saved!")
+        writer.request_flush()
+        st.sidebar.success("The changes are being saved!")
+    autosave_status_ui(writer)
+    timings_ui()
+
+    if st.sidebar.button("Log out"):
+        logout()
+        st.rerun()
 
     # ----- Main content -----
     if choice == "Add password":
@@ -521,4 +565,9 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    # `streamlit run POC_streamlit_app.py -- --profile` profiles every rerun
+    # and writes pm_profile.* when the server stops.
+    if "--profile" in sys.argv:
+        start_profile().run(main)
+    else:
+        main()
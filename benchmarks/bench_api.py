@@ -0,0 +1,150 @@
+"""
+Load test for vault_api.py: requests per second and latency percentiles.
+
+Starts the API server on a synthetic vault in a temporary directory and
+drives it from concurrent keep-alive clients with a mix of reads, searches,
+updates, adds and generate calls.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_api [--vault-size 10000] [--clients 32] [--requests 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_suite import synthetic_entries, write_synthetic_vault
+from master_kdf import make_verifier, write_verifier
+
+MASTER = "bench-master"
+TOKEN = "bench-token"
+SERVER = os.path.abspath("vault_api.py")
+
+# (weight, method, path, body) templates; {account} and {n} are filled in per request.
+MIX = [
+    (70, "GET", "/accounts/{account}", None),
+    (10, "GET", "/accounts?search=prod&limit=25", None),
+    (10, "PUT", "/accounts/{account}", {"password": "Bench-Updated-{n}!", "force": True}),
+    (5, "POST", "/accounts", {"account": "Bench-New-{n}", "password": "Bench-Added-{n}!"}),
+    (5, "POST", "/generate", {"length": 16, "count": 1}),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def build_request(method: str, path: str, body: dict | None, keep_alive: bool) -> bytes:
+    payload = json.dumps(body).encode() if body is not None else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\n"
+        "Host: localhost\r\n"
+        f"Authorization: Bearer {TOKEN}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode() + payload
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            await reader.readexactly(int(line.split(b":", 1)[1]))
+            break
+    return status
+
+
+async def client(port: int, count: int, accounts: list[str], keep_alive: bool,
+                 seed: int, latencies: list[float], errors: list[int]) -> None:
+    tag = f"{'k' if keep_alive else 'c'}{seed}"
+    rng = random.Random(seed)
+    weights = [weight for weight, *_ in MIX]
+    reader = writer = None
+    for n in range(count):
+        _, method, path, body = rng.choices(MIX, weights)[0]
+        account = rng.choice(accounts)
+        path = path.format(account=account)
+        if body is not None:
+            body = {key: value.format(n=f"{tag}-{n}") if isinstance(value, str) else value
+                    for key, value in body.items()}
+
+        start = time.perf_counter()
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(build_request(method, path, body, keep_alive))
+        status = await read_response(reader)
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            errors.append(status)
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port: int, clients: int, total: int, accounts: list[str],
+                keep_alive: bool) -> tuple[list[float], list[int], float]:
+    latencies, errors = [], []
+    per_client = total // clients
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, per_client, accounts, keep_alive, seed, latencies, errors)
+        for seed in range(clients)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vault-size", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    accounts = [account for account, _ in synthetic_entries(args.vault_size)]
+    with tempfile.TemporaryDirectory() as tmp:
+        write_synthetic_vault(os.path.join(tmp, "app_passwords.txt"), args.vault_size)
+        # Cheap scrypt parameters: the benchmark is about the API, not the login.
+        record, _ = make_verifier(MASTER, {"n": 2 ** 12, "r": 8, "p": 1})
+        write_verifier(record, os.path.join(tmp, "master_password.txt"))
+
+        port = free_port()
+        env = dict(os.environ, PM_MASTER_PASSWORD=MASTER, PM_API_TOKEN=TOKEN,
+                   PYTHONPATH=os.getcwd())
+        server = subprocess.Popen([sys.executable, SERVER, "--port", str(port)], cwd=tmp,
+                                  env=env, stdout=subprocess.PIPE, text=True)
+        try:
+            print(server.stdout.readline().strip())
+            print(f"{'connections':<12} {'requests':>9} {'rps':>9} {'p50 ms':>8} "
+                  f"{'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+            for keep_alive in (True, False):
+                latencies, errors, elapsed = asyncio.run(
+                    drive(port, args.clients, args.requests, accounts, keep_alive))
+                latencies.sort()
+                ms = [percentile(latencies, p) * 1000 for p in (0.5, 0.9, 0.99)]
+                print(f"{'keep-alive' if keep_alive else 'per-request':<12} {len(latencies):>9} "
+                      f"{len(latencies) / elapsed:>9,.0f} {ms[0]:>8.2f} {ms[1]:>8.2f} "
+                      f"{ms[2]:>8.2f} {latencies[-1] * 1000:>8.2f} {len(errors):>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Bulk audit throughput vs calling evaluate_password once per password.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_audit [--count 200000]
+"""
+import argparse
+import random
+import string
+import time
+
+from password_audit import audit_passwords
+from strength_estimator import clear_caches
+from vault_engine import evaluate_password
+
+ALPHABET = string.ascii_letters + string.digits + string.punctuation + " "
+
+
+def synthetic_passwords(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    passwords = []
+    for i in range(count):
+        pw = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 20)))
+        # A few non-ASCII passwords exercise the Unicode fallback.
+        if i % 97 == 0:
+            pw += rng.choice("éÅ²߷")
+        passwords.append(pw)
+    return passwords
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    passwords = synthetic_passwords(args.count)
+
+    clear_caches()
+    start = time.perf_counter()
+    scalar = [evaluate_password(pw) for pw in passwords]
+    scalar_s = time.perf_counter() - start
+
+    # Both runs start without memoized strength estimates.
+    clear_caches()
+    start = time.perf_counter()
+    bulk, counts = audit_passwords(passwords)
+    bulk_s = time.perf_counter() - start
+
+    assert bulk == scalar, "bulk audit diverged from evaluate_password"
+
+    print(f"{args.count} passwords  {counts}")
+    print(f"evaluate_password: {args.count / scalar_s:>12,.0f} passwords/s")
+    print(f"audit_passwords:   {args.count / bulk_s:>12,.0f} passwords/s  ({scalar_s / bulk_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
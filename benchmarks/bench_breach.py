@@ -0,0 +1,67 @@
+"""
+Breach corpus index build time and lookup latency.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_breach [--hashes 5000000] [--lookups 200000]
+
+Builds an index of random SHA-1 hashes (plus a few known passwords) in a
+temporary directory, then times hits and misses.
+"""
+import argparse
+import hashlib
+import os
+import resource
+import tempfile
+import time
+
+from breach_check import BreachCorpus, build_index
+
+KNOWN = ["password", "123456", "Password1!", "qwerty"]
+
+
+def hash_lines(count: int):
+    digests = [os.urandom(20) for _ in range(count)]
+    digests += [hashlib.sha1(pw.encode()).digest() for pw in KNOWN]
+    digests.sort()
+    for i, digest in enumerate(digests):
+        yield f"{digest.hex().upper()}:{i % 1000 + 1}\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hashes", type=int, default=5_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.bin")
+        start = time.perf_counter()
+        total = build_index(hash_lines(args.hashes), path)
+        build_s = time.perf_counter() - start
+        size_mib = os.path.getsize(path) / 1024 / 1024
+        print(f"built {total:,} hashes ({size_mib:.0f} MiB) in {build_s:.1f}s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        corpus = BreachCorpus(path)
+        assert all(corpus.breach_count(pw) for pw in KNOWN)
+
+        misses = [os.urandom(20) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for digest in misses:
+            corpus.count_digest(digest)
+        miss_us = (time.perf_counter() - start) / args.lookups * 1e6
+
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            corpus.breach_count(KNOWN[i % len(KNOWN)])
+        hit_us = (time.perf_counter() - start) / args.lookups * 1e6
+
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        corpus.close()
+
+    print(f"miss lookup: {miss_us:.2f} us   hit lookup (incl. SHA-1): {hit_us:.2f} us")
+    print(f"peak RSS growth during lookups: {(rss_after - rss_before) / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
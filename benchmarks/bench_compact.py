@@ -0,0 +1,111 @@
+"""
+Resident memory of the compact vault store against a dict, by vault size.
+
+The synthetic vault is written once as a compressed container; every
+(store, size) case then loads it in its own process, a dict through
+read_compressed_vault and the compact store by streaming the blocks into
+it (as CompressedStorage does). Each one reports the RSS
+the loaded vault adds to the interpreter, bytes per entry, the peak while
+loading, load time, the time of a full iteration, and of a lookup, an
+update (longer payload, so it moves to the overflow) and an insert.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_compact [--sizes 1000000 10000000]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+
+STORES = ["dict", "compact"]
+LOOKUPS = 10_000
+
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 2**20
+
+
+def per_op_us(fn, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def write_vault(path: str, size: int) -> None:
+    from benchmarks.bench_suite import synthetic_entries
+    from vault_compressed import write_compressed_vault
+    write_compressed_vault(dict(synthetic_entries(size)), path)
+
+
+def run_case(store: str, path: str, size: int) -> dict:
+    from vault_compact import CompactStorage
+    from vault_compressed import iter_blocks, read_compressed_vault
+
+    gc.collect()
+    base = rss_mib()
+    start = time.perf_counter()
+    if store == "dict":
+        vault = {}
+        read_compressed_vault(path, vault)
+    else:
+        vault = CompactStorage(entry for entries in iter_blocks(path) for entry in entries)
+    load_s = time.perf_counter() - start
+    gc.collect()
+    rss = rss_mib() - base
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - base
+
+    start = time.perf_counter()
+    keys = [account for account, _ in islice(vault.items(), 0, None, max(1, size // LOOKUPS))]
+    iterate_s = time.perf_counter() - start
+    random.Random(0).shuffle(keys)
+    lookup_us = per_op_us(vault.__getitem__, keys)
+    update_us = per_op_us(lambda key: vault.__setitem__(key, "dXBkYXRlZC1wYXNzd29yZA=="), keys)
+    insert_us = per_op_us(lambda key: vault.__setitem__(key + "-New", "bmV3"), keys)
+    return {"rss_mib": rss, "peak_mib": peak, "load_s": load_s, "iterate_s": iterate_s,
+            "lookup_us": lookup_us, "update_us": update_us, "insert_us": insert_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--case", nargs=3, metavar=("STORE", "PATH", "SIZE"), help=argparse.SUPPRESS)
+    parser.add_argument("--write", nargs=2, metavar=("PATH", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], int(args.case[2]))))
+        return
+    if args.write:
+        write_vault(args.write[0], int(args.write[1]))
+        return
+
+    def child(*argv: str) -> str:
+        return subprocess.run([sys.executable, "-m", "benchmarks.bench_compact", *argv],
+                              capture_output=True, text=True, check=True).stdout
+
+    print(f"{'size':>11} {'store':<8} {'MiB':>8} {'B/entry':>8} {'peak MiB':>9} {'load s':>7} "
+          f"{'get us':>7} {'update us':>10} {'insert us':>10} {'iterate s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"vault-{size}.pmz")
+            child("--write", path, str(size))
+            for store in STORES:
+                r = json.loads(child("--case", store, path, str(size)))
+                mib = r["rss_mib"]
+                print(f"{size:>11,} {store:<8} {mib:>8.0f} {mib * 2**20 / size:>8.0f} {r['peak_mib']:>9.0f} "
+                      f"{r['load_s']:>7.1f} {r['lookup_us']:>7.2f} {r['update_us']:>10.2f} "
+                      f"{r['insert_us']:>10.2f} {r['iterate_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compressed container size and load/save time against the plain text vault.
+
+Writes the same synthetic vault as app_passwords.txt text and as a .pmz
+container with each codec, then reports file size, compression ratio and
+the time to save and to load it back into a dictionary.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_compressed [--sizes 100000 1000000] [--repeats 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_suite import synthetic_entries
+from vault_compressed import CODECS, read_compressed_vault, write_compressed_vault
+from vault_journal import read_snapshot, write_snapshot
+
+
+def best_of(repeats: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'format':<6} {'MiB':>8} {'ratio':>6} {'save s':>7} {'load s':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            storage = dict(synthetic_entries(size))
+
+            text_path = os.path.join(tmp, "vault.txt")
+            save = best_of(args.repeats, lambda: write_snapshot(text_path, storage))
+            load = best_of(args.repeats, lambda: read_snapshot(text_path, {}))
+            text_size = os.path.getsize(text_path)
+            print(f"{size:>10,} {'text':<6} {text_size / 2**20:>8.1f} {1:>6.1f} {save:>7.2f} {load:>7.2f}")
+
+            for codec in CODECS:
+                path = os.path.join(tmp, f"vault.{codec}.pmz")
+                save = best_of(args.repeats, lambda: write_compressed_vault(storage, path, codec))
+                loaded = {}
+                load = best_of(args.repeats, lambda: read_compressed_vault(path, loaded))
+                assert loaded == storage
+                file_size = os.path.getsize(path)
+                print(f"{size:>10,} {codec:<6} {file_size / 2**20:>8.1f} {text_size / file_size:>6.1f} "
+                      f"{save:>7.2f} {load:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Stress test: many writer processes on one journaled vault, checked for lost updates.
+
+Every writer adds its own accounts and increments a shared counter account
+with compare_and_set(), while a small compaction threshold makes the
+journal rotate under them. A reader process polls refresh() and checks that
+the counter never goes backwards. Afterwards a fresh load must contain every
+account and the exact counter total; the script exits with status 1 if not.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_concurrency [--writers 8] [--ops 500] [--compact-kib 64]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from vault_journal import ConflictError, JournaledStorage, save_vault
+
+COUNTER = "Shared-Counter"
+
+
+def encode_int(value: int) -> str:
+    return f"{value:x}"
+
+
+def writer(path: str, number: int, ops: int, compact_bytes: int, start, results) -> None:
+    vault = JournaledStorage(path, compact_threshold=compact_bytes)
+    start.wait()
+    conflicts = 0
+    for i in range(ops):
+        vault[f"Writer-{number:03d}-{i:06d}"] = encode_int(i)
+        while True:
+            current = vault.get(COUNTER)
+            new = encode_int(int(current, 16) + 1 if current else 1)
+            try:
+                vault.compare_and_set(COUNTER, current, new)
+                break
+            except ConflictError:
+                conflicts += 1
+        if i % 50 == 0:
+            save_vault(vault, path)
+    vault.close()
+    results.put(conflicts)
+
+
+def reader(path: str, start, stop, results) -> None:
+    vault = JournaledStorage(path)
+    start.wait()
+    refreshes = went_back = 0
+    last = 0
+    while not stop.is_set():
+        vault.refresh()
+        refreshes += 1
+        value = int(vault.get(COUNTER, "0"), 16)
+        went_back += value < last
+        last = max(last, value)
+    vault.close()
+    results.put((refreshes, went_back))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=500, help="accounts added per writer")
+    parser.add_argument("--compact-kib", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app_passwords.txt")
+        start = multiprocessing.Event()
+        stop = multiprocessing.Event()
+        writer_results = multiprocessing.Queue()
+        reader_results = multiprocessing.Queue()
+
+        processes = [
+            multiprocessing.Process(
+                target=writer,
+                args=(path, number, args.ops, args.compact_kib * 1024, start, writer_results),
+            )
+            for number in range(args.writers)
+        ]
+        watcher = multiprocessing.Process(target=reader, args=(path, start, stop, reader_results))
+        for process in [*processes, watcher]:
+            process.start()
+
+        time.sleep(0.5)
+        began = time.perf_counter()
+        start.set()
+        conflicts = sum(writer_results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - began
+        stop.set()
+        refreshes, went_back = reader_results.get()
+        watcher.join()
+
+        vault = JournaledStorage(path)
+        expected = {f"Writer-{n:03d}-{i:06d}" for n in range(args.writers) for i in range(args.ops)}
+        missing = expected - set(vault)
+        counter = int(vault.get(COUNTER, "0"), 16)
+        vault.close()
+
+    commits = args.writers * args.ops * 2
+    print(f"{args.writers} writers x {args.ops} ops, compaction every {args.compact_kib} KiB")
+    print(f"commits:        {commits:>10,} ({commits / elapsed:,.0f}/s over {elapsed:.2f} s)")
+    print(f"CAS conflicts:  {conflicts:>10,} (retried)")
+    print(f"reader polls:   {refreshes:>10,}, counter went back {went_back} times")
+    print(f"missing:        {len(missing):>10,} of {len(expected):,} accounts")
+    print(f"counter:        {counter:>10,} (expected {args.writers * args.ops:,})")
+
+    lost = missing or counter != args.writers * args.ops or went_back
+    print("FAIL: lost updates" if lost else "OK: no lost updates")
+    return 1 if lost else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
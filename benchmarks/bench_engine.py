@@ -0,0 +1,86 @@
+"""
+Engine import time against its budget, and vault memory per Streamlit session.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_engine [--vault-size 100000] [--sessions 8]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.bench_suite import write_synthetic_vault
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def import_ms(module: str, repeat: int = 9) -> float:
+    """Median time to import module in a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+                             capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout))
+    return statistics.median(samples)
+
+
+def traced_bytes(fn) -> int:
+    """Bytes still allocated after fn() returns (its result is kept alive)."""
+    tracemalloc.start()
+    result = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vault-size", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=8)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.getcwd())
+    import vault_engine
+    from vault_engine import get_vault, load_passwords, release_vaults
+
+    print(f"{'module':<22} {'import':>10}")
+    for module in ["vault_engine", "password_manager_app", "vault_journal", "breach_check"]:
+        print(f"{module:<22} {import_ms(module):>7.1f} ms")
+    engine_ms = import_ms("vault_engine")
+    verdict = "within" if engine_ms <= vault_engine.IMPORT_BUDGET_MS else "OVER"
+    print(f"vault_engine: {engine_ms:.1f} ms, {verdict} the "
+          f"{vault_engine.IMPORT_BUDGET_MS:.0f} ms budget")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app_passwords.txt")
+        write_synthetic_vault(path, args.vault_size)
+
+        def per_session():
+            vaults = [load_passwords(path) for _ in range(args.sessions)]
+            for vault in vaults:
+                vault.close()
+            return vaults
+
+        def shared():
+            return [get_vault(path) for _ in range(args.sessions)]
+
+        loaded = traced_bytes(per_session)
+        handle = traced_bytes(shared)
+        release_vaults()
+
+    print(f"\n{args.sessions} sessions, {args.vault_size:,} entries")
+    print(f"{'load per session':<20} {loaded / 2**20:>8.1f} MiB "
+          f"({loaded / args.sessions / 2**20:.1f} MiB/session)")
+    print(f"{'shared handle':<20} {handle / 2**20:>8.1f} MiB "
+          f"({handle / args.sessions / 2**20:.1f} MiB/session)")
+
+
+if __name__ == "__main__":
+    main()
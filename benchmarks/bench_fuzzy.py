@@ -0,0 +1,97 @@
+"""
+Fuzzy account lookup latency against a linear scan, by vault size.
+
+Builds the BK-tree over synthetic account names, then times "did you mean"
+lookups for names with one, two and three typos, prefix completions, and
+keeping the tree up to date on add/delete, against computing the edit
+distance to every account.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_fuzzy [--sizes 10000 100000] [--queries 50]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.bench_suite import synthetic_entries
+from fuzzy_index import bktree_for, levenshtein, suggest_accounts
+from search_index import index_for
+from vault_events import ObservableStorage
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def with_typos(name: str, typos: int, rng: random.Random) -> str:
+    chars = list(name.lower())
+    for _ in range(typos):
+        i = rng.randrange(len(chars))
+        kind = rng.random()
+        if kind < 0.4:
+            chars[i] = rng.choice(LETTERS)
+        elif kind < 0.7:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice(LETTERS))
+    return "".join(chars)
+
+
+def linear_closest(accounts: list[str], query: str, limit: int = 5) -> list[tuple[int, str]]:
+    query = query.lower()
+    return sorted((levenshtein(query, account.lower()), account) for account in accounts)[:limit]
+
+
+def timed_ms(fn, queries: list[str]) -> list[float]:
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(label: str, times: list[float]) -> None:
+    times.sort()
+    print(f"  {label:<22} {statistics.median(times):>9.2f} {times[int(0.9 * len(times))]:>9.2f} "
+          f"{times[-1]:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        rng = random.Random(size)
+        storage = ObservableStorage(synthetic_entries(size))
+        accounts = list(storage)
+
+        start = time.perf_counter()
+        tree = bktree_for(storage)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        index_for(storage)
+        index_s = time.perf_counter() - start
+        print(f"{size:,} accounts: BK-tree built in {build_s:.2f} s, search index in {index_s:.2f} s")
+        print(f"  {'lookup':<22} {'p50 ms':>9} {'p90 ms':>9} {'max ms':>9}")
+
+        targets = rng.sample(accounts, args.queries)
+        for typos in (1, 2, 3):
+            queries = [with_typos(target, typos, rng) for target in targets]
+            report(f"closest, {typos} typo{'s' if typos > 1 else ''}",
+                   timed_ms(lambda q: tree.closest(q, max_distance=typos), queries))
+        prefixes = [target[:rng.randint(3, 12)] for target in targets]
+        report("suggest, prefix", timed_ms(lambda q: suggest_accounts(storage, q), prefixes))
+        queries = [with_typos(target, 1, rng) for target in targets[:5]]
+        report("linear scan", timed_ms(lambda q: linear_closest(accounts, q), queries))
+
+        new = [f"Bench-New-{i:05d}" for i in range(args.queries)]
+        def churn(account: str) -> None:
+            storage[account] = ""
+            del storage[account]
+        report("add + delete", timed_ms(churn, new))
+
+
+if __name__ == "__main__":
+    main()
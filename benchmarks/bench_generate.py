@@ -0,0 +1,42 @@
+"""
+Password generation throughput: batch CSPRNG generator vs password_generator.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_generate [--count 100000] [--lengths 12 32 64]
+"""
+import argparse
+import string
+import time
+
+from password_batch import generate_passwords
+from vault_engine import password_generator
+
+PREFERENCE = ["yes", "yes", "yes"]
+POOLS = [string.ascii_lowercase, string.ascii_uppercase, string.digits, string.punctuation]
+
+
+def rate(fn, count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[12, 32, 64])
+    args = parser.parse_args()
+
+    print(f"{'length':>7} {'password_generator':>20} {'generate_passwords':>20} {'speedup':>8}")
+    for length in args.lengths:
+        scalar = rate(lambda: [password_generator(length, PREFERENCE) for _ in range(args.count)], args.count)
+
+        batch = generate_passwords(args.count, length, PREFERENCE)
+        assert all(any(c in pool for c in pw) for pw in batch for pool in POOLS)
+        bulk = rate(lambda: generate_passwords(args.count, length, PREFERENCE), args.count)
+
+        print(f"{length:>7} {scalar:>16,.0f}/s {bulk:>16,.0f}/s {bulk / scalar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-mutation save latency: full rewrite (old save_passwords) vs journal append.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_journal [--sizes 1000 100000 1000000] [--mutations 200]
+"""
+import argparse
+import base64
+import os
+import statistics
+import tempfile
+import time
+
+from vault_journal import JournaledStorage, write_snapshot
+
+
+def synthetic_vault(size: int) -> dict:
+    """Build a vault of size accounts with base64 payloads."""
+    return {
+        f"Service-{i:07d}": base64.b64encode(f"pw-{i}-secret!".encode()).decode()
+        for i in range(size)
+    }
+
+
+def full_rewrite(path: str, storage: dict) -> None:
+    """The original save_passwords: rewrite every line of the file."""
+    with open(path, "w") as f:
+        for account, encoded_pw in storage.items():
+            f.write(account + ":" + encoded_pw + "\n")
+
+
+def bench_size(size: int, mutations: int) -> dict:
+    storage = synthetic_vault(size)
+    new_pw = base64.b64encode(b"changed-password").decode()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rewrite_path = os.path.join(tmp, "rewrite.txt")
+        rewrite_times = []
+        # A full rewrite at 1M entries takes long enough that fewer rounds suffice.
+        for i in range(max(3, mutations // max(1, size // 10_000))):
+            storage[f"Service-{i % size:07d}"] = new_pw
+            start = time.perf_counter()
+            full_rewrite(rewrite_path, storage)
+            rewrite_times.append(time.perf_counter() - start)
+
+        journal_path = os.path.join(tmp, "journal.txt")
+        write_snapshot(journal_path, storage)
+        vault = JournaledStorage(journal_path, compact_threshold=1 << 62)
+        journal_times = []
+        for i in range(mutations):
+            start = time.perf_counter()
+            vault[f"Service-{i % size:07d}"] = new_pw
+            journal_times.append(time.perf_counter() - start)
+        vault.close()
+
+    return {
+        "size": size,
+        "rewrite_ms": statistics.median(rewrite_times) * 1000,
+        "journal_ms": statistics.median(journal_times) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--mutations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10} {'rewrite (ms)':>14} {'journal (ms)':>14} {'speedup':>9}")
+    for size in args.sizes:
+        row = bench_size(size, args.mutations)
+        speedup = row["rewrite_ms"] / row["journal_ms"] if row["journal_ms"] else float("inf")
+        print(f"{row['size']:>10} {row['rewrite_ms']:>14.3f} {row['journal_ms']:>14.4f} {speedup:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
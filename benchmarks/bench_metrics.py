@@ -0,0 +1,60 @@
+"""
+Overhead of the timing instrumentation per call, with collection off and on.
+
+Times a trivial function called bare, through @timed and inside
+`with timer(...)`, first with metrics disabled (the default) and then
+enabled, and prints the nanoseconds each adds per call.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_metrics [--calls 1000000]
+"""
+import argparse
+import time
+
+import vault_metrics
+from vault_metrics import timed, timer
+
+
+def work(x: int) -> int:
+    return x + 1
+
+
+timed_work = timed("bench.work")(work)
+
+
+def per_call_ns(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def with_timer(x: int) -> int:
+    with timer("bench.block"):
+        return work(x)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    bare = per_call_ns(work, args.calls)
+    print(f"{'collection':<11} {'bare ns':>8} {'@timed ns':>10} {'+ns':>6} {'timer() ns':>11} {'+ns':>6}")
+    for on in (False, True):
+        if on:
+            vault_metrics.enable()
+        else:
+            vault_metrics.disable()
+        decorated = per_call_ns(timed_work, args.calls)
+        block = per_call_ns(with_timer, args.calls)
+        print(f"{'on' if on else 'off':<11} {bare:>8.0f} {decorated:>10.0f} {decorated - bare:>6.0f} "
+              f"{block:>11.0f} {block - bare:>6.0f}")
+
+    op = vault_metrics.snapshot()["operations"]["bench.work"]
+    print(f"recorded {op['count']:,} calls, p50 <= {op['p50_ms'] * 1000:.2f} us, "
+          f"max {op['max_ms'] * 1000:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Account search latency: trigram index vs the original linear scan.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_search [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from search_index import TrigramIndex
+
+PROVIDERS = ["Aws", "Gcp", "Azure", "Github", "Gitlab", "Slack", "Jira", "Vault"]
+ENVS = ["Prod", "Staging", "Dev", "Qa"]
+QUERIES = ["gith", "prod-service-00", "azure-staging", "-0042", "vault-dev-12345", "nomatch"]
+
+
+def synthetic_accounts(size: int) -> list[str]:
+    rng = random.Random(size)
+    return [
+        f"{rng.choice(PROVIDERS)}-{rng.choice(ENVS)}-Service-{i:07d}"
+        for i in range(size)
+    ]
+
+
+def linear_scan(accounts, query: str) -> list[str]:
+    return sorted(acc for acc in accounts if query.lower() in acc.lower())
+
+
+def median_ms(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        accounts = synthetic_accounts(size)
+        start = time.perf_counter()
+        index = TrigramIndex(accounts)
+        build_s = time.perf_counter() - start
+
+        print(f"\n{size} accounts (index build {build_s:.2f}s)")
+        print(f"{'query':>18} {'hits':>8} {'scan (ms)':>10} {'index (ms)':>11}")
+        for query in QUERIES:
+            hits = len(index.search(query))
+            assert hits == len(linear_scan(accounts, query))
+            scan_ms = median_ms(lambda: linear_scan(accounts, query))
+            index_ms = median_ms(lambda: index.search(query))
+            print(f"{query:>18} {hits:>8} {scan_ms:>10.2f} {index_ms:>11.3f}")
+
+        prefix_ms = median_ms(lambda: index.prefix("vault-dev-service-00001"))
+        exact_ms = median_ms(lambda: index.exact(accounts[size // 2]))
+        insert_ms = median_ms(lambda: index.rename(accounts[0], accounts[0]), repeat=50)
+        print(f"prefix {prefix_ms:.3f}ms, exact {exact_ms:.3f}ms, rename {insert_ms:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Hit rate and lookup time of the decoded-secret cache against its capacity.
+
+Replays "Show passwords" page views of a synthetic vault, where a few pages
+are viewed far more often than the rest, through SecretCache at several
+capacities and through plain decoding. --decode-us adds a fixed cost per
+decode to stand in for real decryption, which is slower than base64.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_secret_cache [--vault-size 10000] [--views 2000] [--decode-us 50]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_journal import synthetic_vault
+from secret_cache import SecretCache
+from vault_engine import decode_password
+from vault_events import ObservableStorage
+from vault_view import page_slice
+
+
+def slow_decode(extra_seconds: float):
+    def decode(encoded_pw: str) -> str:
+        deadline = time.perf_counter() + extra_seconds
+        plaintext = decode_password(encoded_pw)
+        while time.perf_counter() < deadline:
+            pass
+        return plaintext
+    return decode
+
+
+def page_views(accounts: list[str], views: int, page_size: int, seed: int = 0) -> list[list[str]]:
+    """Pages picked with a skew towards the first ones, like real browsing."""
+    rng = random.Random(seed)
+    pages = max(1, -(-len(accounts) // page_size))
+    result = []
+    for _ in range(views):
+        page = min(pages, int(rng.paretovariate(1.2)))
+        start, end = page_slice(len(accounts), page, page_size)
+        result.append(accounts[start:end])
+    return result
+
+
+def replay(views: list[list[str]], reveal) -> float:
+    start = time.perf_counter()
+    for page in views:
+        for account in page:
+            reveal(account)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vault-size", type=int, default=10_000)
+    parser.add_argument("--views", type=int, default=2_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--decode-us", type=float, default=50.0)
+    parser.add_argument("--capacities", type=int, nargs="+", default=[0, 256, 1024, 4096])
+    args = parser.parse_args()
+
+    storage = ObservableStorage(synthetic_vault(args.vault_size))
+    accounts = sorted(storage)
+    views = page_views(accounts, args.views, args.page_size)
+    lookups = sum(len(page) for page in views)
+    decode = slow_decode(args.decode_us / 1e6)
+
+    print(f"{lookups:,} lookups over {args.views:,} page views, {args.decode_us:g} us per decode")
+    print(f"{'capacity':>9} {'hit rate':>9} {'hits':>9} {'misses':>9} {'evictions':>10} "
+          f"{'total ms':>9} {'us/lookup':>10}")
+
+    elapsed = replay(views, lambda account: decode(storage[account]))
+    print(f"{'no cache':>9} {'-':>9} {'-':>9} {lookups:>9,} {'-':>10} "
+          f"{elapsed * 1000:>9.1f} {elapsed / lookups * 1e6:>10.2f}")
+
+    for capacity in args.capacities:
+        if capacity <= 0:
+            continue
+        cache = SecretCache(storage, capacity=capacity, decode=decode)
+        elapsed = replay(views, cache.get)
+        stats = cache.stats
+        print(f"{capacity:>9,} {cache.hit_rate():>9.1%} {stats['hits']:>9,} {stats['misses']:>9,} "
+              f"{stats['evictions']:>10,} {elapsed * 1000:>9.1f} {elapsed / lookups * 1e6:>10.2f}")
+        cache.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Load, save and lookup cost of the sharded vault at different shard counts.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_sharded [--size 1000000] [--shards 1 16 64 256]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_journal import synthetic_vault
+from vault_journal import write_snapshot
+from vault_sharded import ShardedStorage, import_text_vault, reshard
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_shards(text_path: str, tmp: str, size: int, shards: int, lookups: int) -> dict:
+    vault_dir = os.path.join(tmp, f"vault-{shards}")
+    import_text_vault(text_path, vault_dir, shards)
+
+    # Cold lookup + single-entry update + save: touches one shard.
+    vault = ShardedStorage(vault_dir)
+    account = f"Service-{size // 2:07d}"
+    lookup_ms = timed(lambda: vault[account])
+    vault[account] = "Y2hhbmdlZA=="
+    save_ms = timed(vault.save)
+
+    # Warm lookups once every shard is resident.
+    len(vault)
+    start = time.perf_counter()
+    for i in range(lookups):
+        _ = f"Service-{i % size:07d}" in vault
+    warm_us = (time.perf_counter() - start) / lookups * 1e6
+
+    full_load_ms = timed(lambda: len(ShardedStorage(vault_dir)))
+
+    return {
+        "shards": shards,
+        "cold_lookup_ms": lookup_ms,
+        "single_save_ms": save_ms,
+        "warm_lookup_us": warm_us,
+        "full_load_ms": full_load_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "app_passwords.txt")
+        write_snapshot(text_path, synthetic_vault(args.size))
+
+        print(f"{args.size} accounts")
+        print(f"{'shards':>7} {'cold lookup':>12} {'1-entry save':>13} {'warm lookup':>12} {'full load':>10}")
+        for shards in args.shards:
+            row = bench_shards(text_path, tmp, args.size, shards, args.lookups)
+            print(
+                f"{row['shards']:>7} {row['cold_lookup_ms']:>10.2f}ms {row['single_save_ms']:>11.2f}ms "
+                f"{row['warm_lookup_us']:>10.2f}us {row['full_load_ms']:>8.0f}ms"
+            )
+
+        vault_dir = os.path.join(tmp, f"vault-{args.shards[0]}")
+        new_count = args.shards[-1] * 2
+        print(f"reshard {args.shards[0]} -> {new_count}: "
+              f"{timed(lambda: reshard(vault_dir, new_count)):.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
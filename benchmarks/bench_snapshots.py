@@ -0,0 +1,106 @@
+"""
+Incremental snapshot size and time against churn rate on a large vault.
+
+Takes a first full snapshot, then for each churn rate changes that share of
+the accounts (mostly password updates, plus some adds and deletes) before
+each further snapshot, and reports the bytes each snapshot wrote next to a
+full copy of the vault. Ends with the time to restore a snapshot and to
+garbage-collect all but the newest one. Runs once with the synthetic
+account names and once with sequential ones ("Account-0000001", ...), whose
+equal lengths and shared prefixes are the hard case for chunk boundaries.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_snapshots [--size 1000000] [--churn 0.0001 0.001 0.01 0.1]
+                                         [--names synthetic sequential]
+"""
+import argparse
+import base64
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_suite import synthetic_entries
+from vault_snapshots import SnapshotStore
+
+
+def churn(storage: dict, rate: float, rng: random.Random, serial: list[int]) -> None:
+    """Change rate * len(storage) accounts: 80% updates, 10% adds, 10% deletes."""
+    changes = max(1, int(len(storage) * rate))
+    accounts = rng.sample(list(storage), changes)
+    for i, account in enumerate(accounts):
+        kind = i % 10
+        if kind < 8:
+            storage[account] = base64.b64encode(f"Rotated-{rng.random()}".encode()).decode()
+        elif kind == 8:
+            serial[0] += 1
+            storage[f"Added-Svc-{serial[0]:07d}"] = base64.b64encode(b"new-secret").decode()
+        else:
+            del storage[account]
+
+
+def full_copy_bytes(storage: dict) -> int:
+    return sum(len(account) + len(encoded) + 2 for account, encoded in storage.items())
+
+
+def build_vault(names: str, size: int) -> dict:
+    if names == "sequential":
+        return {f"Account-{i:07d}": encoded for i, (_, encoded) in enumerate(synthetic_entries(size))}
+    return dict(synthetic_entries(size))
+
+
+def run(args, names: str) -> None:
+    rng = random.Random(0)
+    serial = [0]
+    storage = build_vault(names, args.size)
+    tmp = tempfile.mkdtemp()
+    try:
+        store = SnapshotStore(os.path.join(tmp, "snapshots"))
+        start = time.perf_counter()
+        first = store.create(storage)
+        print(f"{names} names: {args.size:,} accounts, full copy {full_copy_bytes(storage) / 2**20:.1f} MiB; "
+              f"first snapshot {first['new_bytes'] / 2**20:.1f} MiB in {first['chunks']:,} chunks, "
+              f"{time.perf_counter() - start:.2f} s")
+        print(f"{'churn':>7} {'written KiB':>12} {'% of copy':>10} {'new chunks':>11} {'time s':>8}")
+        for rate in args.churn:
+            written, chunks, seconds = [], [], []
+            for _ in range(args.snapshots):
+                churn(storage, rate, rng, serial)
+                start = time.perf_counter()
+                manifest = store.create(storage)
+                seconds.append(time.perf_counter() - start)
+                written.append(manifest["new_bytes"])
+                chunks.append(manifest["new_chunks"])
+            mean = sum(written) / len(written)
+            print(f"{rate:>7.2%} {mean / 1024:>12,.0f} {mean / full_copy_bytes(storage):>10.1%} "
+                  f"{sum(chunks) / len(chunks):>11,.0f} {sum(seconds) / len(seconds):>8.2f}")
+
+        snapshots = store.snapshots()
+        start = time.perf_counter()
+        restored = store.restore(snapshots[0])
+        print(f"restore of the first snapshot ({len(restored):,} accounts): "
+              f"{time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        stats = store.gc(keep=1)
+        print(f"gc keeping 1 of {len(snapshots)} snapshots: {stats['chunks_removed']:,} chunks, "
+              f"{stats['bytes_freed'] / 2**20:.1f} MiB freed in {time.perf_counter() - start:.2f} s")
+        assert store.restore(store.latest()) == storage
+    finally:
+        shutil.rmtree(tmp)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--churn", type=float, nargs="+", default=[0.0001, 0.001, 0.01, 0.1])
+    parser.add_argument("--snapshots", type=int, default=3, help="snapshots per churn rate")
+    parser.add_argument("--names", nargs="+", choices=("synthetic", "sequential"),
+                        default=["synthetic", "sequential"])
+    args = parser.parse_args()
+
+    for names in args.names:
+        run(args, names)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+SQLite backend against the flat text file: load, point update, lookup and migration.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_sqlite [--sizes 1000 100000 1000000] [--mutations 200]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_journal import full_rewrite
+from benchmarks.bench_suite import synthetic_entries, write_synthetic_vault
+from vault_journal import read_snapshot
+from vault_sqlite import SqliteStorage, migrate_text_vault
+
+NEW_PW = "Y2hhbmdlZC1wYXNzd29yZA=="
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def median_ms(fn, repeat: int) -> float:
+    return statistics.median(timed_ms(fn) for _ in range(repeat))
+
+
+def bench_size(size: int, mutations: int) -> dict:
+    accounts = [account for account, _ in synthetic_entries(size)]
+    probes = [accounts[(i * 7919) % size] for i in range(mutations)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "app_passwords.txt")
+        db_path = os.path.join(tmp, "app_passwords.db")
+        write_synthetic_vault(text_path, size)
+
+        row = {"size": size}
+        row["migrate_ms"] = timed_ms(lambda: migrate_text_vault(text_path, db_path))
+
+        flat = {}
+        row["flat_load_ms"] = timed_ms(lambda: read_snapshot(text_path, flat))
+        # The text file has to be rewritten in full to persist one change.
+        rounds = max(3, mutations // max(1, size // 10_000))
+        row["flat_update_ms"] = median_ms(lambda: full_rewrite(text_path, flat), rounds)
+        row["flat_lookup_us"] = median_ms(lambda: [flat[a] for a in probes], 5) * 1000 / mutations
+
+        vault = None
+
+        def open_vault():
+            nonlocal vault
+            vault = SqliteStorage(db_path)
+            vault.get(probes[0])
+
+        row["sqlite_load_ms"] = timed_ms(open_vault)
+        updates = iter(probes * 2)
+        row["sqlite_update_ms"] = median_ms(lambda: vault.__setitem__(next(updates), NEW_PW), mutations)
+        row["sqlite_lookup_us"] = median_ms(lambda: [vault[a] for a in probes], 5) * 1000 / mutations
+        vault.close()
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--mutations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10} {'backend':>8} {'load (ms)':>11} {'update (ms)':>12} "
+          f"{'lookup (us)':>12} {'migrate (ms)':>13}")
+    for size in args.sizes:
+        row = bench_size(size, args.mutations)
+        print(f"{size:>10} {'flat':>8} {row['flat_load_ms']:>11.1f} {row['flat_update_ms']:>12.3f} "
+              f"{row['flat_lookup_us']:>12.2f}")
+        print(f"{'':>10} {'sqlite':>8} {row['sqlite_load_ms']:>11.1f} {row['sqlite_update_ms']:>12.3f} "
+              f"{row['sqlite_lookup_us']:>12.2f} {row['migrate_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
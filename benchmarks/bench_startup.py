@@ -0,0 +1,74 @@
+"""
+Startup cost of the scripted CLI, and batch mode against one process per operation.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup [--vault-size 100000] [--operations 50]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_suite import synthetic_entries, write_synthetic_vault
+
+CLI = os.path.abspath("password_manager_cli.py")
+MASTER = "bench-master"
+
+
+def run_cli(args: list[str], cwd: str, stdin: str = "") -> float:
+    env = dict(os.environ, PM_MASTER_PASSWORD=MASTER)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CLI, *args], cwd=cwd, env=env, input=stdin,
+                   capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def median_ms(fn, repeat: int = 7) -> float:
+    return statistics.median(fn() for _ in range(repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vault-size", type=int, default=100_000)
+    parser.add_argument("--operations", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.getcwd())
+    import master_kdf
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_synthetic_vault(os.path.join(tmp, "app_passwords.txt"), args.vault_size)
+        # Cheap KDF so the numbers show startup and vault cost, not scrypt.
+        record, _ = master_kdf.make_verifier(MASTER, {"n": 1 << 10, "r": 8, "p": 1})
+        master_kdf.write_verifier(record, os.path.join(tmp, "master_password.txt"))
+
+        baseline = median_ms(lambda: run_cli(["--help"], tmp))
+        generate = median_ms(lambda: run_cli(["generate", "--length", "32"], tmp))
+        evaluate = median_ms(lambda: run_cli(["evaluate"], tmp, "Password1!\n"))
+        first_account = next(synthetic_entries(1))[0]
+        get = median_ms(lambda: run_cli(["get", first_account], tmp), repeat=3)
+
+        print(f"interpreter + argparse (--help): {baseline:8.1f} ms")
+        print(f"generate:                        {generate:8.1f} ms")
+        print(f"evaluate:                        {evaluate:8.1f} ms")
+        print(f"get ({args.vault_size} accounts):       {get:8.1f} ms")
+
+        ops = [json.dumps({"op": "add", "account": f"Batch-{i}", "password": f"Pw{i}!abcdef"})
+               for i in range(args.operations)]
+        start = time.perf_counter()
+        for i in range(args.operations):
+            run_cli(["add", f"Single-{i}"], tmp, f"Pw{i}!abcdef\n")
+        per_process = (time.perf_counter() - start) * 1000
+        batch = run_cli(["batch", "-"], tmp, "\n".join(ops) + "\n")
+
+        print(f"{args.operations} adds, one process each:    {per_process:8.0f} ms")
+        print(f"{args.operations} adds, one batch process:   {batch:8.0f} ms "
+              f"({per_process / batch:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
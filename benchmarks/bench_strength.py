@@ -0,0 +1,127 @@
+"""
+Strength estimator speed on a realistic password mix, cold and with warm per-pattern caches.
+
+Reports the word list automaton's compile time against loading it from its
+serialized cache, per-password estimate times over a mix of dictionary
+words with decorations, l33t, keyboard walks, dates and random strings
+(some repeated, as in real vaults), and how many passwords the old
+character-class rule called Strong that the estimate does not.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_strength [--count 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+import strength_estimator
+from strength_estimator import (
+    WORDLIST_FILE,
+    clear_caches,
+    estimate_strength,
+    load_automaton,
+    read_wordlists,
+)
+from vault_engine import SYMBOLS
+
+WALKS = ["qwerty", "asdfgh", "zxcvbn", "1qaz2wsx", "qazwsx", "poiuyt", "147258", "!QAZ2wsx"]
+LEET = str.maketrans({"a": "@", "e": "3", "i": "1", "o": "0", "s": "$"})
+
+
+def synthetic_passwords(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = [word for section in read_wordlists().values() for word in section if word.isalpha()]
+    random_alphabet = string.ascii_letters + string.digits + SYMBOLS
+    passwords = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.35:
+            pw = rng.choice(words)
+            if rng.random() < 0.5:
+                pw = pw.capitalize()
+            pw += rng.choice(["", "1", "123", "!", str(rng.randint(0, 99)), str(rng.randint(1960, 2025))])
+        elif kind < 0.45:
+            pw = rng.choice(words).translate(LEET) + rng.choice(["", "!", "1"])
+        elif kind < 0.55:
+            pw = rng.choice(WALKS) + rng.choice(["", "1", "!"])
+        elif kind < 0.62:
+            pw = rng.choice(words) + f"{rng.randint(1, 28):02d}{rng.randint(1, 12):02d}{rng.randint(1950, 2020)}"
+        elif kind < 0.70:
+            pw = rng.choice(words).capitalize() + rng.choice(words) + rng.choice(words)
+        else:
+            pw = "".join(rng.choice(random_alphabet) for _ in range(rng.randint(8, 20)))
+        passwords.append(pw)
+    # A quarter of the entries reuse an earlier password.
+    for i in range(count // 4):
+        passwords[rng.randrange(count)] = passwords[rng.randrange(count)]
+    return passwords
+
+
+def class_strength(pw: str) -> str:
+    """The previous rule: 20 points per character class and for length >= 8."""
+    score = 20 * sum((
+        len(pw) >= 8,
+        any(char.isupper() for char in pw),
+        any(char.islower() for char in pw),
+        any(char.isdigit() for char in pw),
+        any(char in SYMBOLS for char in pw),
+    ))
+    return "Strong" if score == 100 else "Medium" if score >= 50 else "Weak"
+
+
+def time_estimates(passwords: list[str]) -> tuple[float, list[float]]:
+    times = []
+    start = time.perf_counter()
+    for pw in passwords:
+        t = time.perf_counter()
+        estimate_strength(pw)
+        times.append(time.perf_counter() - t)
+    return time.perf_counter() - start, times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "words.cache")
+        start = time.perf_counter()
+        load_automaton(WORDLIST_FILE, cache)
+        compile_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        strength_estimator._automaton = load_automaton(WORDLIST_FILE, cache)
+        cached_ms = (time.perf_counter() - start) * 1000
+    print(f"automaton: compile {compile_ms:.1f} ms, load from cache {cached_ms:.1f} ms, "
+          f"{len(strength_estimator._automaton[1]):,} states")
+
+    passwords = synthetic_passwords(args.count)
+    print(f"{args.count:,} passwords ({len(set(passwords)):,} distinct)")
+    print(f"{'run':<10} {'total s':>8} {'per pw us':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>9}")
+    clear_caches()
+    for label in ("cold", "warm"):
+        total, times = time_estimates(passwords)
+        times.sort()
+        print(f"{label:<10} {total:>8.2f} {total / len(passwords) * 1e6:>10.1f} "
+              f"{statistics.median(times) * 1e6:>8.1f} {times[int(0.99 * len(times))] * 1e6:>8.1f} "
+              f"{times[-1] * 1e6:>9.1f}")
+
+    scores = [0] * 5
+    overrated = 0
+    for pw in passwords:
+        estimate = estimate_strength(pw)
+        scores[estimate["score"]] += 1
+        overrated += class_strength(pw) == "Strong" and estimate["strength"] != "Strong"
+    print("scores 0-4: " + "  ".join(f"{score}: {n:,}" for score, n in enumerate(scores)))
+    print(f"Strong by character classes but not by estimate: {overrated:,}")
+    print(f"e.g. Password1! -> {estimate_strength('Password1!')['strength']} "
+          f"(character classes: {class_strength('Password1!')})")
+    clear_caches()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+End-to-end benchmark suite for the vault core operations.
+
+Every (operation, vault size) case runs in its own process, so the peak RSS
+reported for it is not inflated by earlier cases. Results are written as
+JSON and two runs can be compared to flag regressions.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_suite run [--sizes 1000 10000 100000 1000000] [--out results.json]
+    python -m benchmarks.bench_suite compare base.json new.json [--threshold 0.10]
+"""
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+OPERATIONS = ["cold_load", "save", "mutation", "search", "audit", "audit_bulk", "generate"]
+
+PROVIDERS = ["Aws", "Gcp", "Azure", "Github", "Gitlab", "Slack", "Jira", "Vault"]
+ENVS = ["Prod", "Staging", "Dev", "Qa"]
+SEARCHES = ["gith", "prod-svc-00", "azure-staging", "-0042", "nomatch"]
+
+
+# ================== Synthetic vaults ==================
+
+def synthetic_entries(size: int, seed: int = 0):
+    """Yield (account, encoded) pairs with realistic names and mixed-strength passwords."""
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
+    for i in range(size):
+        account = f"{rng.choice(PROVIDERS)}-{rng.choice(ENVS)}-Svc-{i:07d}"
+        password = "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 20)))
+        yield account, base64.b64encode(password.encode()).decode()
+
+
+def write_synthetic_vault(path: str, size: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{account}:{encoded}\n" for account, encoded in synthetic_entries(size))
+
+
+# ================== Single case (child process) ==================
+
+def repeats_for(size: int, small: int, large: int) -> int:
+    return small if size <= 10_000 else large
+
+
+def run_case(operation: str, path: str, size: int) -> dict:
+    from password_audit import audit_passwords
+    from password_batch import generate_passwords
+    from vault_engine import evaluate_password
+    from search_index import search_accounts
+    from vault_journal import JournaledStorage, write_snapshot
+
+    samples = []
+    items = size
+
+    def timed(fn) -> None:
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    if operation == "cold_load":
+        for _ in range(repeats_for(size, 10, 3)):
+            timed(lambda: JournaledStorage(path).close())
+    else:
+        storage = JournaledStorage(path, compact_threshold=1 << 62)
+
+        if operation == "save":
+            copy_path = path + ".save"
+            for _ in range(repeats_for(size, 10, 3)):
+                timed(lambda: write_snapshot(copy_path, storage))
+
+        elif operation == "mutation":
+            accounts = list(storage)
+            new_pw = base64.b64encode(b"Changed-Password-1!").decode()
+            items = 1
+            for i in range(500):
+                timed(lambda: storage.__setitem__(accounts[i % size], new_pw))
+
+        elif operation == "search":
+            search_accounts(storage, "warm-up")  # builds the index
+            items = 1
+            for _ in range(repeats_for(size, 20, 5)):
+                for query in SEARCHES:
+                    timed(lambda: search_accounts(storage, query))
+
+        elif operation in ("audit", "audit_bulk"):
+            passwords = [base64.b64decode(enc.encode()).decode() for enc in storage.values()]
+            for _ in range(repeats_for(size, 5, 2)):
+                if operation == "audit":
+                    timed(lambda: [evaluate_password(pw) for pw in passwords])
+                else:
+                    timed(lambda: audit_passwords(passwords))
+
+        elif operation == "generate":
+            for _ in range(repeats_for(size, 5, 2)):
+                timed(lambda: generate_passwords(size, 16, ["yes", "yes", "yes"]))
+
+        else:
+            raise ValueError(f"Unknown operation '{operation}'.")
+
+        storage.close()
+
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return {
+        "operation": operation,
+        "size": size,
+        "samples": len(samples),
+        "p50_ms": p50 * 1000,
+        "p99_ms": p99 * 1000,
+        "throughput_per_s": items / p50 if p50 else None,
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# ================== Suite & comparison ==================
+
+def run_suite(sizes: list[int], operations: list[str]) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            vault_path = os.path.join(tmp, f"vault-{size}.txt")
+            write_synthetic_vault(vault_path, size)
+            for operation in operations:
+                # A fresh journal per case, so cases do not see each other's writes.
+                for leftover in (vault_path + ".journal", vault_path + ".save"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_suite", "_case", operation, vault_path, str(size)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                row = json.loads(out)
+                results.append(row)
+                print(
+                    f"{operation:>11} {size:>9}  p50 {row['p50_ms']:>10.3f}ms  p99 {row['p99_ms']:>10.3f}ms  "
+                    f"{row['throughput_per_s']:>14,.0f}/s  rss {row['peak_rss_mib']:>7.1f}MiB",
+                    file=sys.stderr,
+                )
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[str]:
+    """Cases whose p50, p99 or peak RSS got worse than base by more than threshold."""
+    baseline = {(r["operation"], r["size"]): r for r in base["results"]}
+    regressions = []
+    for row in new["results"]:
+        old = baseline.get((row["operation"], row["size"]))
+        if old is None:
+            continue
+        for metric in ("p50_ms", "p99_ms", "peak_rss_mib"):
+            if old[metric] and row[metric] > old[metric] * (1 + threshold):
+                change = (row[metric] / old[metric] - 1) * 100
+                regressions.append(
+                    f"{row['operation']} @ {row['size']}: {metric} {old[metric]:.3f} -> {row[metric]:.3f} (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    if argv and argv[0] == "_case":
+        print(json.dumps(run_case(argv[1], argv[2], int(argv[3]))))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the suite and write JSON results")
+    run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    run.add_argument("--out", help="write results here instead of stdout")
+
+    cmp = sub.add_parser("compare", help="flag regressions between two result files")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, e.g. 0.10 = 10%%")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = json.dumps(run_suite(args.sizes, args.operations), indent=2)
+        if args.out:
+            with open(args.out, "w") as f:
+                f.write(report + "\n")
+        else:
+            print(report)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(base, new, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+"""
+Streaming import throughput and peak pipeline memory against input size.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_transfer [--sizes 10000 100000 200000]
+
+The pipeline writes into a sink that only counts entries, so the reported
+peak is the memory of the pipeline itself (it must not grow with the input).
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from vault_journal import JournaledStorage
+from vault_transfer import import_file
+
+
+class CountingSink:
+    """Storage stand-in that accepts entries without keeping them."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __contains__(self, account) -> bool:
+        return False
+
+    def set_many(self, items) -> None:
+        for _ in items:
+            self.count += 1
+
+
+def write_export(path: str, rows: int) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url", "username", "password", "note"])
+        for i in range(rows):
+            writer.writerow([f"service-{i:07d}", f"https://s{i}.example.com", "ops", f"Pw{i}!xYz", ""])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 200_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'pipeline rows/s':>16} {'peak pipeline KiB':>18} {'into vault rows/s':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            export_path = os.path.join(tmp, f"export-{rows}.csv")
+            write_export(export_path, rows)
+
+            with open(export_path, newline="") as f:
+                start = time.perf_counter()
+                import_file(f, CountingSink(), run_evaluation=True)
+                sink_s = time.perf_counter() - start
+
+            # Separate run, since tracing allocations slows the pipeline down.
+            tracemalloc.start()
+            with open(export_path, newline="") as f:
+                import_file(f, CountingSink(), run_evaluation=True)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            vault = JournaledStorage(os.path.join(tmp, f"vault-{rows}.txt"))
+            with open(export_path, newline="") as f:
+                start = time.perf_counter()
+                import_file(f, vault, run_evaluation=True)
+                vault.flush()
+                vault_s = time.perf_counter() - start
+            vault.close()
+
+            print(f"{rows:>9} {rows / sink_s:>16,.0f} {peak / 1024:>18,.0f} {rows / vault_s:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Render time of the "View passwords" page against vault size.
+
+Times the work one Streamlit rerun of view_passwords_ui does outside
+Streamlit itself: the old per-account rendering (decode every password,
+one markdown block per account) against the paged rendering.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_view_render [--sizes 1000 10000 100000] [--page-size 50]
+"""
+import argparse
+import base64
+import statistics
+import time
+
+from benchmarks.bench_journal import synthetic_vault
+from search_index import search_accounts
+from vault_events import ObservableStorage
+from vault_view import SORT_ORDERS, order_accounts, page_slice, render_page_html
+
+
+def render_all(storage: dict) -> list[str]:
+    """The previous view_passwords_ui: one block per account, all decoded."""
+    blocks = []
+    for i, (acc, enc_pw) in enumerate(sorted(storage.items()), start=1):
+        password_display = base64.b64decode(enc_pw.encode()).decode()
+        blocks.append(f"<p class='listed-passwords'>{i}. <b>{acc}</b> : {password_display}</p>")
+    return blocks
+
+
+def render_paged(storage, page_size: int) -> str:
+    filtered = order_accounts(search_accounts(storage, ""), SORT_ORDERS[0])
+    start, end = page_slice(len(filtered), 1, page_size)
+    return render_page_html(storage, filtered[start:end], start + 1, True)
+
+
+def median_ms(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'accounts':>9} {'all rows (ms)':>14} {'blocks':>8} {'one page (ms)':>14} {'HTML KiB':>9}")
+    for size in args.sizes:
+        storage = ObservableStorage(synthetic_vault(size))
+        all_ms = median_ms(lambda: render_all(storage))
+        paged_ms = median_ms(lambda: render_paged(storage, args.page_size))
+        page_kib = len(render_paged(storage, args.page_size)) / 1024
+        print(f"{size:>9} {all_ms:>14.1f} {size:>8} {paged_ms:>14.2f} {page_kib:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+# ================== Constants ==================
+
+CORPUS_FILE = "breached_hashes.bin"
+CORPUS_ENV = "PM_BREACH_CORPUS"
+
+MAGIC = b"PMBH"
+VERSION = 1
+
+# magic, version, reserved, record count
+HEADER = struct.Struct("<4sHHQ")
+# fanout[p] = index of the first record whose hash starts with the 2 bytes p;
+# fanout[65536] = record count.
+FANOUT_SLOTS = 65536 + 1
+FANOUT = struct.Struct(f"<{FANOUT_SLOTS}Q")
+FANOUT_ENTRY = struct.Struct("<Q")
+# SHA-1 digest, breach count
+RECORD = struct.Struct("<20sI")
+DIGEST_SIZE = 20
+
+RECORDS_OFFSET = HEADER.size + FANOUT.size
+
+
+# ================== Building the index ==================
+
+def parse_hash_line(line: str) -> tuple[bytes, int] | None:
+    """Parse "SHA1HEX" or "SHA1HEX:COUNT" (the Pwned Passwords download format)."""
+    line = line.strip()
+    if not line:
+        return None
+    digest_hex, _, count = line.partition(":")
+    return bytes.fromhex(digest_hex), int(count) if count else 1
+
+
+def build_index(lines, path: str = CORPUS_FILE, presorted: bool = True) -> int:
+    """
+    Write a binary corpus index from hash lines. Returns the record count.
+
+    Pwned Passwords files come ordered by hash, so they are streamed straight
+    to disk in constant memory. With presorted=False the records are sorted in
+    memory first (fine for corpora that fit in RAM).
+    """
+    records = (parsed for parsed in map(parse_hash_line, lines) if parsed is not None)
+    if not presorted:
+        records = iter(sorted(records))
+
+    counts = [0] * 65536
+    total = 0
+    previous = b""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.seek(RECORDS_OFFSET)
+        for digest, count in records:
+            if len(digest) != DIGEST_SIZE:
+                raise ValueError(f"Not a SHA-1 hash: {digest.hex()}")
+            if digest <= previous:
+                if digest == previous:
+                    continue
+                raise ValueError("Hash list is not sorted; rebuild with --unsorted.")
+            previous = digest
+            f.write(RECORD.pack(digest, min(count, 0xFFFFFFFF)))
+            counts[(digest[0] << 8) | digest[1]] += 1
+            total += 1
+
+        fanout = [0] * FANOUT_SLOTS
+        running = 0
+        for prefix in range(65536):
+            fanout[prefix] = running
+            running += counts[prefix]
+        fanout[65536] = running
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, total))
+        f.write(FANOUT.pack(*fanout))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return total
+
+
+# ================== Lookups ==================
+
+class BreachCorpus:
+    """
+    mmap-backed lookup of SHA-1 hashes in a corpus index.
+
+    The first two bytes of a hash select a range through the fan-out table,
+    and a binary search inside that range finds the record. A lookup reads a
+    handful of pages whatever the corpus size, and memory use stays constant.
+    """
+
+    def __init__(self, path: str = CORPUS_FILE) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a breach corpus index.")
+        self.count = count
+
+    def count_digest(self, digest: bytes) -> int:
+        """Breach count for a SHA-1 digest (0 when absent)."""
+        prefix = (digest[0] << 8) | digest[1]
+        (lo,) = FANOUT_ENTRY.unpack_from(self._mmap, HEADER.size + prefix * FANOUT_ENTRY.size)
+        (hi,) = FANOUT_ENTRY.unpack_from(self._mmap, HEADER.size + (prefix + 1) * FANOUT_ENTRY.size)
+
+        mm = self._mmap
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = RECORDS_OFFSET + mid * RECORD.size
+            candidate = mm[offset:offset + DIGEST_SIZE]
+            if candidate < digest:
+                lo = mid + 1
+            elif candidate > digest:
+                hi = mid
+            else:
+                return RECORD.unpack_from(mm, offset)[1]
+        return 0
+
+    def breach_count(self, password: str) -> int:
+        return self.count_digest(hashlib.sha1(password.encode()).digest())
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+_default_corpus = None
+_default_corpus_key = None
+
+
+def default_corpus() -> BreachCorpus | None:
+    """
+    The corpus named by $PM_BREACH_CORPUS, or breached_hashes.bin in the
+    working directory; None when there is none. It stays open until the file
+    is replaced (e.g. rebuilt by the build command), so a corpus that appears
+    or changes later is picked up.
+    """
+    global _default_corpus, _default_corpus_key
+    path = os.environ.get(CORPUS_ENV, CORPUS_FILE)
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+    if key != _default_corpus_key:
+        # The previous corpus is left to be closed when no caller holds it.
+        _default_corpus = BreachCorpus(path)
+        _default_corpus_key = key
+    return _default_corpus
+
+
+def breach_count(password: str) -> int:
+    corpus = default_corpus()
+    return corpus.breach_count(password) if corpus is not None else 0
+
+
+def is_breached(password: str) -> bool:
+    return breach_count(password) > 0
+
+
+# ================== Command line ==================
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline breached-password corpus.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="build the index from a SHA1[:COUNT] hash list")
+    build.add_argument("hash_list")
+    build.add_argument("--out", default=CORPUS_FILE)
+    build.add_argument("--unsorted", action="store_true", help="sort the list in memory first")
+
+    check = sub.add_parser("check", help="look up a password read from stdin")
+    check.add_argument("--corpus", default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with open(args.hash_list, "r") as f:
+            total = build_index(f, args.out, presorted=not args.unsorted)
+        print(f"Indexed {total} hashes into {args.out}.")
+        return 0
+
+    corpus = BreachCorpus(args.corpus) if args.corpus else default_corpus()
+    if corpus is None:
+        print("No breach corpus found.")
+        return 2
+    count = corpus.breach_count(sys.stdin.readline().rstrip("\n"))
+    print(f"Found in {count} breaches." if count else "Not found in the breach corpus.")
+    return 1 if count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,215 @@
+from search_index import index_for
+
+# ================== Constants ==================
+
+DEFAULT_SUGGESTIONS = 5
+# Typos tolerated: about one per three characters typed, at most MAX_DISTANCE.
+MAX_DISTANCE = 3
+# Rebuild the tree once this share of its nodes belong to deleted accounts.
+MAX_DEAD_RATIO = 0.5
+
+
+# ================== Edit distance ==================
+
+def pattern_masks(pattern: str) -> dict[str, int]:
+    """Bit mask of the positions of each character of pattern."""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def distance_from(masks: dict[str, int], length: int, text: str) -> int:
+    """
+    Levenshtein distance between a pattern (given by pattern_masks and its
+    length) and text, with Myers' bit-parallel algorithm: one pass over text
+    with a handful of integer operations per character, instead of filling
+    a len(pattern) x len(text) table.
+    """
+    if not length:
+        return len(text)
+    full = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv, mv, score = full, 0, length
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+    return score
+
+
+def levenshtein(a: str, b: str) -> int:
+    return distance_from(pattern_masks(a), len(a), b)
+
+
+# ================== BK-tree ==================
+
+class BKTree:
+    """
+    Burkhard-Keller tree of lowercased account names under edit distance.
+
+    Each node keeps its children by their distance to it, so a search with
+    tolerance t only descends into children whose distance d' satisfies
+    |d - d'| <= t (triangle inequality) and skips the rest of the tree.
+    Names map to the accounts spelled that way; deleting an account empties
+    its node, which still routes searches, and the tree is rebuilt once
+    more than MAX_DEAD_RATIO of the nodes are empty. Like the search index,
+    it is kept up to date as a storage listener.
+    """
+
+    def __init__(self, accounts=()) -> None:
+        self._root = None  # [name, {distance: child}, accounts]
+        self._nodes: dict[str, list] = {}
+        self._live = 0
+        for account in accounts:
+            self.add(account)
+
+    def __len__(self) -> int:
+        return self._live
+
+    # ----- maintenance -----
+
+    def add(self, account: str) -> None:
+        name = account.lower()
+        node = self._nodes.get(name)
+        if node is not None:
+            if not node[2]:
+                self._live += 1
+            node[2].add(account)
+            return
+
+        new = [name, {}, {account}]
+        self._nodes[name] = new
+        self._live += 1
+        if self._root is None:
+            self._root = new
+            return
+        masks, length = pattern_masks(name), len(name)
+        node = self._root
+        while True:
+            d = distance_from(masks, length, node[0])
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = new
+                return
+            node = child
+
+    def remove(self, account: str) -> None:
+        node = self._nodes.get(account.lower())
+        if node is None or account not in node[2]:
+            return
+        node[2].discard(account)
+        if not node[2]:
+            self._live -= 1
+            if len(self._nodes) - self._live > MAX_DEAD_RATIO * len(self._nodes):
+                self._rebuild()
+
+    def _rebuild(self) -> None:
+        accounts = [account for node in self._nodes.values() for account in node[2]]
+        self.__init__(accounts)
+
+    # Storage listener hooks (see vault_events).
+
+    def on_set(self, account: str, old: str | None, new: str) -> None:
+        if old is None:
+            self.add(account)
+
+    def on_delete(self, account: str, old: str) -> None:
+        self.remove(account)
+
+    # ----- queries -----
+
+    def within(self, query: str, tolerance: int) -> list[tuple[int, str]]:
+        """(distance, account) for every account within tolerance of query."""
+        if self._root is None:
+            return []
+        needle = query.lower()
+        masks, length = pattern_masks(needle), len(needle)
+        found = []
+        stack = [self._root]
+        while stack:
+            name, children, accounts = stack.pop()
+            d = distance_from(masks, length, name)
+            if d <= tolerance:
+                found.extend((d, account) for account in accounts)
+            low, high = d - tolerance, d + tolerance
+            for distance, child in children.items():
+                if low <= distance <= high:
+                    stack.append(child)
+        return found
+
+    def closest(self, query: str, limit: int = DEFAULT_SUGGESTIONS,
+                max_distance: int | None = None) -> list[tuple[int, str]]:
+        """
+        Up to limit (distance, account) pairs nearest to query, nearest
+        first. The tolerance grows one edit at a time, so a close match is
+        found without searching the wider radius.
+        """
+        if max_distance is None:
+            max_distance = min(MAX_DISTANCE, max(1, len(query) // 3))
+        found = []
+        for tolerance in range(max_distance + 1):
+            found = self.within(query, tolerance)
+            if len(found) >= limit:
+                break
+        return sorted(found)[:limit]
+
+
+def bktree_for(storage) -> BKTree:
+    """
+    Return the BK-tree of storage, building it on first use.
+    Storages that publish change events keep it and update it in place.
+    """
+    tree = getattr(storage, "fuzzy_index", None)
+    if tree is None:
+        tree = BKTree(storage)
+        if hasattr(storage, "subscribe"):
+            storage.fuzzy_index = tree
+            storage.subscribe(tree)
+    return tree
+
+
+# ================== Account resolution ==================
+
+def suggest_accounts(storage, query: str, limit: int = DEFAULT_SUGGESTIONS) -> list[str]:
+    """
+    Ranked accounts for what the user typed: names starting with query
+    (autocompletion, alphabetical) first, then the closest names by edit
+    distance ("did you mean"). The BK-tree is only built, and searched,
+    when completions do not fill the list.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    suggestions = index_for(storage).prefix(query, limit)
+    if len(suggestions) < limit:
+        for _, account in bktree_for(storage).closest(query, limit):
+            if account not in suggestions:
+                suggestions.append(account)
+    return suggestions[:limit]
+
+
+def resolve_account(storage, query: str, limit: int = DEFAULT_SUGGESTIONS) -> tuple[str | None, list[str]]:
+    """
+    (account, suggestions): the account query names exactly (as typed,
+    title-cased, or case-insensitively when only one account is spelled
+    that way), else None and ranked suggestions to choose from.
+    """
+    query = query.strip()
+    for candidate in (query, query.title()):
+        if candidate in storage:
+            return candidate, []
+    exact = index_for(storage).exact(query) if query else []
+    if len(exact) == 1:
+        return exact[0], []
+    return None, exact[:limit] or suggest_accounts(storage, query, limit)
@@ -0,0 +1,207 @@
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import time
+
+# ================== Constants ==================
+
+MASTER_FILE = "master_password.txt"
+SCHEME = "scrypt"
+
+# Default time one verification should take on this machine.
+DEFAULT_TARGET_MS = 250
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+MIN_LOG_N = 12
+# scrypt needs 128 * r * n bytes: 2**17 with r=8 is 128 MiB per login, which
+# a shared Streamlit server can afford for a few concurrent logins.
+MAX_LOG_N = 17
+DEFAULT_R = 8
+DEFAULT_P = 1
+
+
+# ================== Key derivation ==================
+
+def _maxmem(n: int, r: int, p: int) -> int:
+    """Memory scrypt needs for these parameters, plus some headroom."""
+    return 128 * r * (n + p + 2) + 1024 * 1024
+
+
+def derive_key(password: str, salt: bytes, n: int, r: int = DEFAULT_R, p: int = DEFAULT_P) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=_maxmem(n, r, p), dklen=KEY_BYTES
+    )
+
+
+def time_params(n: int, r: int = DEFAULT_R, p: int = DEFAULT_P) -> float:
+    """Milliseconds one derivation takes with these parameters."""
+    start = time.perf_counter()
+    derive_key("calibration", b"\0" * SALT_BYTES, n, r, p)
+    return (time.perf_counter() - start) * 1000
+
+
+def calibrate(target_ms: float = DEFAULT_TARGET_MS, r: int = DEFAULT_R, p: int = DEFAULT_P) -> dict:
+    """
+    Pick the scrypt cost n (a power of two) whose derivation time on this
+    machine is closest to target_ms without going under it, capped at 2**MAX_LOG_N.
+    """
+    log_n = MIN_LOG_N
+    elapsed = time_params(1 << log_n, r, p)
+    while elapsed < target_ms and log_n < MAX_LOG_N:
+        log_n += 1
+        elapsed = time_params(1 << log_n, r, p)
+    return {"n": 1 << log_n, "r": r, "p": p, "ms": elapsed}
+
+
+# ================== Verifier records ==================
+#
+# master_password.txt holds a single line:
+#     scrypt$<n>$<r>$<p>$<salt base64>$<derived key base64>
+# Older files hold the Base64 of the password itself; they are upgraded
+# to a verifier the first time the right password is entered.
+
+def make_verifier(password: str, params: dict) -> tuple[str, bytes]:
+    """Return (verifier line, derived key) for password."""
+    salt = os.urandom(SALT_BYTES)
+    key = derive_key(password, salt, params["n"], params["r"], params["p"])
+    record = "$".join([
+        SCHEME, str(params["n"]), str(params["r"]), str(params["p"]),
+        base64.b64encode(salt).decode(), base64.b64encode(key).decode(),
+    ])
+    return record, key
+
+
+def parse_verifier(record: str) -> dict | None:
+    """Split a verifier line into its parameters; None for a legacy file."""
+    parts = record.strip().split("$")
+    if len(parts) != 6 or parts[0] != SCHEME:
+        return None
+    return {
+        "n": int(parts[1]),
+        "r": int(parts[2]),
+        "p": int(parts[3]),
+        "salt": base64.b64decode(parts[4]),
+        "key": base64.b64decode(parts[5]),
+    }
+
+
+def write_verifier(record: str, path: str = MASTER_FILE) -> None:
+    with open(path + ".tmp", "w") as f:
+        f.write(record)
+    os.replace(path + ".tmp", path)
+
+
+def create_master_password(password: str, path: str = MASTER_FILE,
+                           target_ms: float = DEFAULT_TARGET_MS) -> bytes:
+    """Calibrate scrypt for this machine, store the verifier and return the key."""
+    record, key = make_verifier(password, calibrate(target_ms))
+    write_verifier(record, path)
+    return key
+
+
+def verify_master_password(password: str, path: str = MASTER_FILE,
+                           target_ms: float = DEFAULT_TARGET_MS) -> bytes | None:
+    """
+    Check password against the stored verifier.
+    Returns the derived key on success and None otherwise.
+    """
+    with open(path, "r") as f:
+        stored = f.read().strip()
+
+    params = parse_verifier(stored)
+    if params is None:
+        # Legacy file: Base64 of the password. Upgrade it on success.
+        encoded = base64.b64encode(password.encode()).decode()
+        if not hmac.compare_digest(encoded.encode(), stored.encode()):
+            return None
+        return create_master_password(password, path, target_ms)
+
+    key = derive_key(password, params["salt"], params["n"], params["r"], params["p"])
+    if hmac.compare_digest(key, params["key"]):
+        return key
+    return None
+
+
+# ================== Session key cache ==================
+
+class SessionKeyCache:
+    """
+    Remembers the derived key after a successful login, so re-authenticating
+    in the same session costs one HMAC instead of another scrypt run.
+
+    Only an HMAC of the password under a random per-session secret is kept,
+    never the password itself.
+    """
+
+    def __init__(self) -> None:
+        self._secret = os.urandom(32)
+        self._tag = None
+        self.key = None
+
+    def _mac(self, password: str) -> bytes:
+        return hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+
+    def remember(self, password: str, key: bytes) -> None:
+        self._tag = self._mac(password)
+        self.key = key
+
+    def check(self, password: str) -> bytes | None:
+        if self._tag is not None and hmac.compare_digest(self._mac(password), self._tag):
+            return self.key
+        return None
+
+    def clear(self) -> None:
+        self._tag = None
+        self.key = None
+
+
+def authenticate(password: str, cache: SessionKeyCache | None = None,
+                 path: str = MASTER_FILE) -> bytes | None:
+    """verify_master_password, answered from cache when it already knows password."""
+    if cache is not None:
+        key = cache.check(password)
+        if key is not None:
+            return key
+    key = verify_master_password(password, path)
+    if key is not None and cache is not None:
+        cache.remember(password, key)
+    return key
+
+
+# ================== Command line ==================
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Master password KDF tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cal = sub.add_parser("calibrate", help="pick scrypt parameters for a target login time")
+    cal.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS)
+
+    bench = sub.add_parser("bench", help="report derivation time against parameters")
+    bench.add_argument("--max-log-n", type=int, default=18)
+    bench.add_argument("--r", type=int, nargs="+", default=[8, 16])
+
+    args = parser.parse_args(argv)
+
+    if args.command == "calibrate":
+        params = calibrate(args.target_ms)
+        print(f"n=2**{params['n'].bit_length() - 1} r={params['r']} p={params['p']}: "
+              f"{params['ms']:.0f} ms (target {args.target_ms:.0f} ms)")
+        return 0
+
+    print(f"{'n':>8} {'r':>4} {'memory':>10} {'time':>10}")
+    for log_n in range(MIN_LOG_N, args.max_log_n + 1):
+        for r in args.r:
+            n = 1 << log_n
+            print(f"{'2**' + str(log_n):>8} {r:>4} {128 * r * n // 1024 // 1024:>7} MiB "
+                  f"{time_params(n, r):>7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
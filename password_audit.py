@@ -0,0 +1,164 @@
+import base64
+import json
+import sys
+
+from breach_check import default_corpus
+from reuse_index import reuse_index_for
+from strength_estimator import estimate_strength
+from vault_engine import SYMBOLS, evaluate_password
+
+# ================== Character classes ==================
+
+BATCH_SIZE = 4096
+
+UPPER, LOWER, DIGIT, SYMBOL, OTHER = b"U", b"L", b"D", b"S", b"."
+
+
+def _class_table() -> bytes:
+    """256-byte translation table mapping every ASCII byte to its class code."""
+    table = bytearray(OTHER * 256)
+    for chars, code in (
+        ("ABCDEFGHIJKLMNOPQRSTUVWXYZ", UPPER),
+        ("abcdefghijklmnopqrstuvwxyz", LOWER),
+        ("0123456789", DIGIT),
+        (SYMBOLS, SYMBOL),
+    ):
+        for char in chars.encode("ascii"):
+            table[char] = code[0]
+    return bytes(table)
+
+
+CLASS_TABLE = _class_table()
+
+STRENGTH_ORDER = ("Weak", "Medium", "Strong")
+
+
+def _result_templates() -> list[dict]:
+    """
+    The 32 possible character-class parts of an evaluate_password result,
+    indexed by a 5-bit mask of (length_ok, has_upper, has_lower, has_digit,
+    has_symbol). The strength estimate is added per password.
+    """
+    keys = ("length_ok", "has_upper", "has_lower", "has_digit", "has_symbol")
+    templates = []
+    for mask in range(32):
+        result = {key: bool(mask & (1 << bit)) for bit, key in enumerate(keys)}
+        result["breached"] = False
+        templates.append(result)
+    return templates
+
+
+RESULT_TEMPLATES = _result_templates()
+
+
+# ================== Bulk audit ==================
+
+def _audit_batch(batch: list[str]) -> list[dict]:
+    """
+    Classify a batch of passwords at once.
+
+    ASCII passwords are packed into one buffer and mapped to class codes with
+    a single bytes.translate() call; each password then needs four substring
+    checks on its slice. Non-ASCII passwords (where str.isupper() and friends
+    have Unicode rules) go through evaluate_password itself. The strength
+    estimate is memoized, so passwords repeated across the vault are only
+    estimated once.
+    """
+    ascii_pws = [pw for pw in batch if pw.isascii()]
+    classes = "".join(ascii_pws).encode("ascii").translate(CLASS_TABLE)
+
+    templates = RESULT_TEMPLATES
+    results = []
+    append = results.append
+    pos = 0
+    for pw in batch:
+        if not pw.isascii():
+            append(evaluate_password(pw))
+            continue
+        end = pos + len(pw)
+        seg = classes[pos:end]
+        pos = end
+        mask = (
+            (len(seg) >= 8)
+            | (UPPER in seg) << 1
+            | (LOWER in seg) << 2
+            | (DIGIT in seg) << 3
+            | (SYMBOL in seg) << 4
+        )
+        result = templates[mask].copy()
+        result.update(estimate_strength(pw))
+        append(result)
+
+    corpus = default_corpus()
+    if corpus is not None:
+        for pw, result in zip(batch, results):
+            if corpus.breach_count(pw):
+                result["breached"] = True
+    return results
+
+
+def audit_passwords(passwords) -> tuple[list[dict], dict]:
+    """
+    Evaluate an iterable of plaintext passwords in batches.
+
+    Returns (per-password results, counts of Weak/Medium/Strong/Breached).
+    Every result is identical to what evaluate_password would return for
+    that password.
+    """
+    results = []
+    batch = []
+    for pw in passwords:
+        batch.append(pw)
+        if len(batch) == BATCH_SIZE:
+            results.extend(_audit_batch(batch))
+            batch = []
+    if batch:
+        results.extend(_audit_batch(batch))
+
+    counts = dict.fromkeys(STRENGTH_ORDER, 0)
+    counts["Breached"] = 0
+    for result in results:
+        counts[result["strength"]] += 1
+        counts["Breached"] += result["breached"]
+    return results, counts
+
+
+def audit_vault(storage) -> tuple[dict, dict]:
+    """Audit every stored account. Returns ({account: result}, counts)."""
+    accounts = list(storage)
+    passwords = (base64.b64decode(storage[acc].encode()).decode() for acc in accounts)
+    results, counts = audit_passwords(passwords)
+    return dict(zip(accounts, results)), counts
+
+
+def main(argv: list[str]) -> int:
+    from vault_engine import load_passwords
+
+    as_json = "--json" in argv
+    weak_only = "--weak" in argv
+
+    storage = load_passwords()
+    by_account, counts = audit_vault(storage)
+    reused = reuse_index_for(storage).reuse_report()
+
+    if as_json:
+        print(json.dumps({"counts": counts, "accounts": by_account, "reused": reused}, indent=2))
+        return 0
+
+    for account in sorted(by_account):
+        result = by_account[account]
+        if weak_only and result["strength"] != "Weak" and not result["breached"]:
+            continue
+        print(f"{account} : {result['strength']}" + (" (breached)" if result["breached"] else ""))
+    if reused:
+        print("=========================")
+        print("Reused passwords:")
+        for group in reused:
+            print("  " + ", ".join(group))
+    print("=========================")
+    print(f"Total: {len(by_account)}  " + "  ".join(f"{k}: {v}" for k, v in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
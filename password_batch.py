@@ -0,0 +1,110 @@
+import os
+import string
+import sys
+from itertools import islice
+
+# ================== Alphabets ==================
+
+# Entropy is drawn from the OS CSPRNG this many candidate passwords at a time.
+REFILL_PASSWORDS = 256
+
+
+def _pools(preference: list[str]) -> list[str]:
+    """
+    Character pools selected by preference = [upper?, digits?, symbols?],
+    with the same "yes"/"no" values as password_generator. Lowercase letters
+    are always included.
+    """
+    pools = [string.ascii_lowercase]
+    if preference[0] == "yes":
+        pools.append(string.ascii_uppercase)
+    if preference[1] == "yes":
+        pools.append(string.digits)
+    if preference[2] == "yes":
+        pools.append(string.punctuation)
+    return pools
+
+
+def _sampling_tables(alphabet: str) -> tuple[bytes, bytes]:
+    """
+    Translation tables for unbiased rejection sampling of random bytes.
+
+    A byte b below the largest multiple of len(alphabet) that fits in 256 maps
+    to alphabet[b % len(alphabet)]; bytes above it are deleted. Every symbol
+    is therefore equally likely, with no modulo bias.
+    """
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    table = bytearray(256)
+    for b in range(limit):
+        table[b] = ord(alphabet[b % size])
+    return bytes(table), bytes(range(limit, 256))
+
+
+def _class_table(pools: list[str]) -> bytes:
+    """Translation table mapping each alphabet character to its pool number."""
+    table = bytearray(256)
+    for number, pool in enumerate(pools, start=1):
+        for char in pool.encode("ascii"):
+            table[char] = number
+    return bytes(table)
+
+
+# ================== Generation ==================
+
+def iter_passwords(length: int, preference: list[str]):
+    """
+    Endless generator of passwords of the given length.
+
+    Characters are drawn uniformly from the combined alphabet of the selected
+    pools, using os.urandom in bulk. Like the Streamlit generator, every
+    selected pool is guaranteed to appear (as far as the length allows):
+    candidates missing one are rejected, which keeps the result uniform over
+    all valid passwords.
+    """
+    if length < 1:
+        raise ValueError("Password length must be at least 1.")
+
+    pools = _pools(preference)
+    table, rejected = _sampling_tables("".join(pools))
+    classes = _class_table(pools)
+    required = [bytes([number]) for number in range(1, min(len(pools), length) + 1)]
+
+    refill = max(4096, length * REFILL_PASSWORDS * 2)
+    leftover = b""
+    while True:
+        chars = leftover + os.urandom(refill).translate(table, rejected)
+        usable = len(chars) - len(chars) % length
+        leftover = chars[usable:]
+        codes = chars[:usable].translate(classes)
+        for start in range(0, usable, length):
+            found = codes[start:start + length]
+            if all(code in found for code in required):
+                yield chars[start:start + length].decode("ascii")
+
+
+def generate_passwords(count: int, length: int, preference: list[str]) -> list[str]:
+    """Return count passwords of the given length (see iter_passwords)."""
+    return list(islice(iter_passwords(length, preference), count))
+
+
+def main(argv: list[str]) -> int:
+    usage = "usage: python password_batch.py <count> <length> [upper nums symbols (yes/no)]"
+    if len(argv) not in (2, 5):
+        print(usage)
+        return 2
+    count, length = int(argv[0]), int(argv[1])
+    if count < 0:
+        print(usage)
+        return 2
+    preference = [arg.lower() for arg in argv[2:]] or ["yes", "yes", "yes"]
+    for password in iter_passwords(length, preference):
+        if count == 0:
+            break
+        print(password)
+        count -= 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
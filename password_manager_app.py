@@ -1,126 +1,54 @@
 import os
-import base64
-import random
-import string
-
-
-#This function loads stored passwords from a file.
-def load_passwords():
-    storage = {}
-    if os.path.exists("app_passwords.txt"):
-        with open("app_passwords.txt", "r") as f:
-            #Read each line and split the account and encoded password.
-            for line in f:
-                if ":" in line:
-                    account, encoded_pw = line.strip().split(":")
-                    storage[account] = encoded_pw
-    return storage
-
-
-#This function saves passwords to the file.
-def save_passwords(storage):
-    with open("app_passwords.txt", "w") as f:
-        #Write each account and encoded password to the file.
-        for account, encoded_pw in storage.items():
-            f.write(account + ":" + encoded_pw + "\n")
-
-
-#This function evaluates the strength of the given password.
-def evaluate_password(pw):
-    score = 0
-    result = {
-        "length_ok": False,
-        "has_upper": False,
-        "has_lower": False,
-        "has_digit": False,
-        "has_symbol": False,
-        "strength": "Weak"
-    }
-
-    #Check if the password is at least 8 characters long.
-    if len(pw) >= 8:
-        result["length_ok"] = True
-        score += 20
-
-    #Check for the presence of an uppercase letter in the password.
-    if any(char.isupper() for char in pw):
-        result["has_upper"] = True
-        score += 20
-
-    #Check for the presence of a lowercase letter in the password.
-    if any(char.islower() for char in pw):
-        result["has_lower"] = True
-        score += 20
-
-    #Check for the presence of a digit in the password.
-    if any(char.isdigit() for char in pw):
-        result["has_digit"] = True
-        score += 20
-
-    #Check for the presence of a special symbol in the password.
-    symbols = "!@#$%^&*()-_=+[]{};:,.<>/"
-    if any(char in symbols for char in pw):
-        result["has_symbol"] = True
-        score += 20
-
-    #Determine the password strength based on the total score.
-    if score == 100:
-        result["strength"] = "Strong"
-    elif 80>= score >= 50:
-        result["strength"] = "Medium"
-    else:
-        result["strength"] = "Weak"
-
-    return result
-
-def password_generator(length, preference):
-    all_char = [string.ascii_lowercase]
-    if preference[0] == 'yes':
-        all_char.append(string.ascii_uppercase)
-    if preference[1] == 'yes':
-        all_char.append(string.digits)
-    if preference[2] == 'yes':
-        all_char.append(string.punctuation)
-
-    password = ""
-    while len(password) < length:
-        password += random.choice(random.choice(all_char))
-
-    eval_results = evaluate_password(password)
-    eval = eval_results["strength"]
-
-    return password, eval
+import sys
+
+from fuzzy_index import resolve_account
+from master_kdf import create_master_password, verify_master_password
+from reuse_index import reuse_warning
+from search_index import search_accounts
+from secret_cache import secret_cache_for
+from strength_estimator import clear_caches
+from vault_metrics import start_profile, timer
+from vault_engine import (
+    ConflictError,
+    compare_and_set,
+    encode_password,
+    evaluate_password,
+    load_passwords,
+    password_generator,
+    save_passwords,
+)
+
+#Loading, saving, evaluating and generating passwords live in the
+#vault_engine package, which the Streamlit app shares.
 
 """ Login() function to validate the master password entered by a user,
     and allow the user to create a new one if a master password doesn't exist.
-    A user has three attempts to enter a correct master password. """
+    A user has three attempts to enter a correct master password.
+    The master password is stored as a scrypt verifier whose cost is calibrated
+    to this machine when it is created. """
+#Only the work is timed, not the time spent typing at the prompts.
 def login():
-    master_password = None
-    
     if not os.path.exists('master_password.txt'):
         password = input('Create a master password: ')
 
-        evaluation = evaluate_password(password)
+        with timer("login.evaluate_password"):
+            evaluation = evaluate_password(password)
         print(f"Password strength: {evaluation['strength']}")
 
-        encoded_password = base64.b64encode(password.encode()).decode()
-        with open('master_password.txt', mode='w') as f:
-            f.write(encoded_password)
-        master_password = encoded_password
+        with timer("login.create_master_password"):
+            create_master_password(password, 'master_password.txt')
         print('Succuessfully Created a Master Password.')
         return True
-    else:
-        with open('master_password.txt', mode='r') as r:
-            master_password = r.read()
 
     attempts = 0
     max_attempts = 3
 
     while attempts < max_attempts:
         user_password = input('Enter Password: ')
-        encoded_user_password = base64.b64encode(user_password.encode()).decode()
 
-        if master_password == encoded_user_password:
+        with timer("login.verify_master_password"):
+            verified = verify_master_password(user_password, 'master_password.txt')
+        if verified is not None:
             return True
         else:
             print('Wrong Password. Try Again!')
@@ -136,29 +64,72 @@ def add_password(storage):
     password = input('Password:')
 
 
-    evaluation = evaluate_password(password)
+    with timer("menu.add_password.evaluate"):
+        evaluation = evaluate_password(password)
     print(f"Password strength: {evaluation['strength']}")
-
-    encoded_password = base64.b64encode(password.encode()).decode()
-    storage[account] = encoded_password
+    if evaluation["feedback"]:
+        print(evaluation["feedback"])
+    if evaluation["breached"]:
+        print("Warning: this password appears in a known data breach.")
+
+    #Warn if another stored account already uses the same password.
+    with timer("menu.add_password.reuse_check"):
+        warning = reuse_warning(storage, account, password)
+    if warning:
+        print(f"Warning: {warning}")
+
+    with timer("menu.add_password.store"):
+        encoded_password = encode_password(password)
+        storage[account] = encoded_password
     print("Password added successfully.")
 
 
-#This function updates the password for a specified account.
-def update_password(storage):
+#Find the account the user means. A name typed in any case is used as is;
+#otherwise the closest names are offered, instead of listing every account.
+def choose_account(storage, prompt):
+    name = input(prompt)
+    with timer("menu.choose_account"):
+        account, suggestions = resolve_account(storage, name)
+    if account is not None:
+        return account
 
-    for i,a in enumerate(storage.keys(), start=1):
-        print(f'{i}: {a}')
+    if not suggestions:
+        print("Account not found.")
+        return None
 
-    account = input("Enter the account to update: ").title()
+    print("Account not found. Did you mean:")
+    for i, suggestion in enumerate(suggestions, start=1):
+        print(f'{i}: {suggestion}')
+    choice = input("Choose a number (or press Enter to cancel): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(suggestions):
+        return suggestions[int(choice) - 1]
+    return None
 
-    if account not in storage:
-        print("Account not found.")
+
+#This function updates the password for a specified account.
+def update_password(storage):
+
+    account = choose_account(storage, "Enter the account to update: ")
+    if account is None:
         return
 
+    #Remember the current value, in case another session changes it meanwhile.
+    expected = storage[account]
+
     new_pw = input("Enter the new password: ")
-    evaluation = evaluate_password(new_pw)
+    with timer("menu.update_password.evaluate"):
+        evaluation = evaluate_password(new_pw)
     print(f"Password strength: {evaluation['strength']}")
+    if evaluation["feedback"]:
+        print(evaluation["feedback"])
+    if evaluation["breached"]:
+        print("Warning: this password appears in a known data breach.")
+
+    #Warn if another stored account already uses the same password.
+    with timer("menu.update_password.reuse_check"):
+        warning = reuse_warning(storage, account, new_pw)
+    if warning:
+        print(f"Warning: {warning}")
 
     #Check if the new password is strong enough.
     if evaluation["strength"] == "Weak":
@@ -166,25 +137,30 @@ def update_password(storage):
         return
 
     #Encode the new password and update the storage.
-    encoded = base64.b64encode(new_pw.encode()).decode()
-    storage[account] = encoded
+    encoded = encode_password(new_pw)
+    try:
+        with timer("menu.update_password.store"):
+            compare_and_set(storage, account, expected, encoded)
+    except ConflictError:
+        print("This account was changed in another session — update cancelled.")
+        return
     print("Password updated successfully.")
 
 
 #This function deletes a specified account's password.
 def delete_password(storage):
 
-    for i,a in enumerate(storage.keys(), start=1):
-        print(f'{i}: {a}')
-
-    account = input("Enter the account to delete: ")
-
-    if account.title() not in storage:
-        print("Account not found.")
+    account = choose_account(storage, "Enter the account to delete: ")
+    if account is None:
         return
 
     #Remove the account from storage.
-    del storage[account.title()]
+    try:
+        with timer("menu.delete_password.store"):
+            del storage[account]
+    except KeyError:
+        print("Account not found.")
+        return
     print("Password deleted.")
 
 def view_passwords(storage):
@@ -197,7 +173,8 @@ def view_passwords(storage):
     - Provides the option to show passwords decoded from Base64 OR show only account names.
     
     Parameters:
-    storage (dict): A dictionary where keys are account names and values are Base64-encoded passwords.
+    storage (dict): A dictionary (or any mapping, e.g. a BinaryVault) where keys are account names
+                    and values are Base64-encoded passwords.
     
     Returns:
     str: A formatted string containing either a list of accounts or accounts with their decoded passwords.
@@ -210,8 +187,10 @@ def view_passwords(storage):
     # Default: use all accounts before filtering
     filtered_storage = storage
 
-    # Sort accounts alphabetically (A → Z)
-    sorted_accounts = sorted(filtered_storage.items(), key=lambda x: x[0])
+    # Sort account names alphabetically (A → Z).
+    # Only names are touched here; passwords are read when they are shown.
+    with timer("menu.view_passwords.sort"):
+        sorted_accounts = sorted(filtered_storage)
 
     result = ""
     result += f"Total passwords: {len(sorted_accounts)}\n"
@@ -225,13 +204,11 @@ def view_passwords(storage):
         # The account name (or part of it) to search for
         search = input('What account are you looking for:\n')
 
-        # Filter only accounts that contain the search term (case-insensitive)
-        filtered_storage = {
-            acc: pw for acc, pw in storage.items() if search.lower() in acc.lower()
-        }
-
-        # Sort the filtered accounts alphabetically
-        sorted_accounts = sorted(filtered_storage.items(), key=lambda x: x[0])
+        # Filter only accounts that contain the search term (case-insensitive).
+        # The trigram index returns them already sorted alphabetically.
+        with timer("menu.view_passwords.search"):
+            filtered_storage = search_accounts(storage, search)
+        sorted_accounts = filtered_storage
 
         # If search found nothing
         if not filtered_storage:
@@ -242,18 +219,22 @@ def view_passwords(storage):
 
     if show_passwords.lower() == 'yes':
         result += "Stored Passwords:\n"
-        for i, (acc, pw) in enumerate(sorted_accounts, start=1):
 
-            # Decode Base64-encoded password before showing it
-            password_display = base64.b64decode(pw.encode()).decode()
+        #Decoded passwords are cached, so showing the list again is cheap.
+        cache = secret_cache_for(storage)
+        with timer("menu.view_passwords.decode"):
+            for i, acc in enumerate(sorted_accounts, start=1):
+
+                # Decode Base64-encoded password before showing it
+                password_display = cache.get(acc)
 
-            result += f"{i}) {acc} : {password_display}\n"
+                result += f"{i}) {acc} : {password_display}\n"
         return result
 
     else:
         # If not showing passwords → show only account names
         result += "Accounts List:\n"
-        for i, (acc, _) in enumerate(sorted_accounts, start=1):
+        for i, acc in enumerate(sorted_accounts, start=1):
             result += f"{i}) {acc}\n"
         return result
 
@@ -272,6 +253,13 @@ def menu(storage):
 
         choice = input("Choose an option: ")
 
+        #Pick up changes other sessions made since the last action.
+        if hasattr(storage, "refresh"):
+            with timer("menu.refresh"):
+                storage.refresh()
+        #Wipe decoded passwords whose time in the cache is up.
+        secret_cache_for(storage).purge_expired()
+
         if choice == "1":
             add_password(storage)
 
@@ -287,13 +275,17 @@ def menu(storage):
             nums = input("Include numbers? (yes/no): ").lower()
             symbols = input("Include symbols? (yes/no): ").lower()
 
-            pw, strength = password_generator(length, [upper, nums, symbols])
+            with timer("menu.generate_password"):
+                pw, strength = password_generator(length, [upper, nums, symbols])
             print(f"Generated password: {pw} (Strength: {strength})")
 
         elif choice == "5":
             print(view_passwords(storage))
 
         elif choice == "6":
+            #Wipe the decoded passwords and memoized estimates before leaving.
+            secret_cache_for(storage).clear()
+            clear_caches()
             save_passwords(storage)
             print("Saved. Goodbye!")
             break
@@ -302,10 +294,28 @@ def menu(storage):
             print("Invalid choice. Try again.")
 
 
-if __name__ == "__main__":
-
+def session():
     if login():
         storage = load_passwords()
         menu(storage)
     else:
         print("Access denied.")
+
+
+if __name__ == "__main__":
+
+    #--profile runs the session under cProfile and tracemalloc and writes
+    #pm_profile.pstats, pm_profile.txt and pm_profile.prom on exit.
+    if "--profile" in sys.argv:
+        sys.argv.remove("--profile")
+        profile = start_profile()
+        profile.run(session)
+        sys.exit(0)
+
+    #With arguments, run one scripted command instead of the menu
+    #(see password_manager_cli.py).
+    if len(sys.argv) > 1:
+        from password_manager_cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    session()
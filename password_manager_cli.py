@@ -0,0 +1,329 @@
+"""
+Non-interactive command line for scripts and provisioning.
+
+    python password_manager_cli.py generate --length 32
+    python password_manager_cli.py evaluate < password.txt
+    PM_MASTER_PASSWORD=... python password_manager_cli.py add Github --password-stdin < pw.txt
+    PM_MASTER_PASSWORD=... python password_manager_cli.py get Github
+    PM_MASTER_PASSWORD=... python password_manager_cli.py batch operations.jsonl
+
+Every command prints JSON. Vault modules are imported only by the commands
+that need them, so generate/evaluate start fast and never read the vault.
+Vault commands need the master password in $PM_MASTER_PASSWORD (or are
+prompted for it on a terminal).
+"""
+import argparse
+import json
+import os
+import sys
+
+MASTER_FILE = "master_password.txt"
+MASTER_PASSWORD_ENV = "PM_MASTER_PASSWORD"
+
+
+class CliError(Exception):
+    """An operation failed; reported as {"ok": false, "error": ...}."""
+
+
+class NotFoundError(CliError):
+    """The named account does not exist."""
+
+
+class ExistsError(CliError):
+    """The account to add already exists."""
+
+
+# ================== Helpers ==================
+
+def _preference(args) -> list[str]:
+    return [
+        "no" if args.no_upper else "yes",
+        "no" if args.no_digits else "yes",
+        "no" if args.no_symbols else "yes",
+    ]
+
+
+def _read_secret(args) -> str:
+    if getattr(args, "password", None) is not None:
+        return args.password
+    line = sys.stdin.readline()
+    if not line:
+        raise CliError("Expected the password on stdin.")
+    return line.rstrip("\n")
+
+
+def _authenticate() -> None:
+    from master_kdf import verify_master_password
+
+    if not os.path.exists(MASTER_FILE):
+        raise CliError("No master password set; run password_manager_app.py once to create it.")
+    password = os.environ.get(MASTER_PASSWORD_ENV)
+    if password is None:
+        if not sys.stdin.isatty():
+            raise CliError(f"Set {MASTER_PASSWORD_ENV} to use vault commands non-interactively.")
+        import getpass
+        password = getpass.getpass("Master password: ")
+    if verify_master_password(password, MASTER_FILE) is None:
+        raise CliError("Wrong master password.")
+
+
+def _evaluation(password: str) -> dict:
+    from vault_engine import evaluate_password
+    return evaluate_password(password)
+
+
+def _encode(password: str) -> str:
+    from vault_engine import encode_password
+    return encode_password(password)
+
+
+def _decode(encoded: str) -> str:
+    from vault_engine import decode_password
+    return decode_password(encoded)
+
+
+def _not_found(storage, account: str) -> NotFoundError:
+    from fuzzy_index import suggest_accounts
+
+    message = f"Account '{account}' not found."
+    suggestions = suggest_accounts(storage, account)
+    if suggestions:
+        message += " Did you mean: " + ", ".join(suggestions) + "?"
+    return NotFoundError(message)
+
+
+# ================== Vault operations ==================
+#
+# Shared by the single commands and batch mode. Each takes the loaded
+# storage plus the operation's fields and returns a JSON-able dict.
+
+def op_add(storage, account: str, password: str, overwrite: bool = False) -> dict:
+    from reuse_index import reuse_index_for
+    from vault_transfer import CONTROL_CHARS
+
+    # Same rule as the bulk import: these would split the vault's records.
+    if CONTROL_CHARS.search(account):
+        raise CliError("Account names cannot contain control characters.")
+    account = account.title()
+    if account in storage and not overwrite:
+        raise ExistsError(f"Account '{account}' already exists.")
+    evaluation = _evaluation(password)
+    reused = sorted(reuse_index_for(storage).accounts_sharing(password) - {account})
+    storage[account] = _encode(password)
+    return {"account": account, "strength": evaluation["strength"],
+            "breached": evaluation["breached"], "reused_with": reused}
+
+
+def op_get(storage, account: str) -> dict:
+    account = account.title()
+    if account not in storage:
+        raise _not_found(storage, account)
+    return {"account": account, "password": _decode(storage[account])}
+
+
+def op_update(storage, account: str, password: str, force: bool = False) -> dict:
+    account = account.title()
+    if account not in storage:
+        raise _not_found(storage, account)
+    evaluation = _evaluation(password)
+    # Same rule as the interactive update_password.
+    if evaluation["strength"] == "Weak" and not force:
+        raise CliError("Password too weak — update denied.")
+    storage[account] = _encode(password)
+    return {"account": account, "strength": evaluation["strength"], "breached": evaluation["breached"]}
+
+
+def op_delete(storage, account: str) -> dict:
+    account = account.title()
+    if account not in storage:
+        raise _not_found(storage, account)
+    del storage[account]
+    return {"account": account}
+
+
+def op_list(storage, search: str = "") -> dict:
+    from search_index import search_accounts
+    accounts = search_accounts(storage, search)
+    return {"count": len(accounts), "accounts": accounts}
+
+
+def op_audit(storage) -> dict:
+    from password_audit import audit_vault
+    from reuse_index import reuse_index_for
+
+    by_account, counts = audit_vault(storage)
+    weak = sorted(acc for acc, result in by_account.items() if result["strength"] == "Weak")
+    breached = sorted(acc for acc, result in by_account.items() if result["breached"])
+    return {"counts": counts, "weak": weak, "breached": breached,
+            "reused": reuse_index_for(storage).reuse_report()}
+
+
+def op_generate(length: int = 12, preference: list[str] = ("yes", "yes", "yes"), count: int = 1) -> dict:
+    from password_batch import generate_passwords
+    return {"passwords": generate_passwords(count, length, list(preference))}
+
+
+def op_evaluate(password: str) -> dict:
+    return _evaluation(password)
+
+
+VAULT_OPS = {
+    "add": op_add,
+    "get": op_get,
+    "update": op_update,
+    "delete": op_delete,
+    "list": op_list,
+    "audit": op_audit,
+}
+MUTATING_OPS = {"add", "update", "delete"}
+
+# JSON types of the fields a batch operation may carry.
+FIELD_TYPES = {
+    "account": str, "password": str, "search": str,
+    "overwrite": bool, "force": bool,
+    "length": int, "count": int, "preference": list,
+}
+TYPE_NAMES = {str: "a string", bool: "true or false", int: "an integer", list: "a list"}
+
+
+def _check_fields(request: dict) -> None:
+    for field, value in request.items():
+        expected = FIELD_TYPES.get(field)
+        if expected is None:
+            continue  # Reported by the operation itself as an unexpected argument.
+        # bool is an int subclass, but true is not a length.
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise CliError(f"Bad request: '{field}' must be {TYPE_NAMES[expected]}.")
+
+
+def run_batch(lines) -> list[dict]:
+    """
+    Run JSON Lines operations, e.g. {"op": "add", "account": "X", "password": "..."},
+    against one load of the vault, saving once at the end if anything changed.
+    """
+    from vault_engine import load_passwords, save_passwords
+
+    storage = None
+    changed = False
+    results = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise CliError("Bad request: each line must be a JSON object.")
+            op = request.pop("op")
+            _check_fields(request)
+            if op == "generate":
+                result = op_generate(**request)
+            elif op == "evaluate":
+                result = op_evaluate(**request)
+            elif op in VAULT_OPS:
+                if storage is None:
+                    storage = load_passwords()
+                result = VAULT_OPS[op](storage, **request)
+                changed = changed or op in MUTATING_OPS
+            else:
+                raise CliError(f"Unknown op '{op}'.")
+            results.append({"line": number, "ok": True, **result})
+        except (CliError, KeyError, TypeError, ValueError) as error:
+            message = str(error) if isinstance(error, CliError) else f"Bad request: {error!r}"
+            results.append({"line": number, "ok": False, "error": message})
+
+    if changed:
+        save_passwords(storage)
+    return results
+
+
+# ================== Command line ==================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Password manager (non-interactive).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("add", "update"):
+        cmd = sub.add_parser(name, help=f"{name} an account (password on stdin by default)")
+        cmd.add_argument("account")
+        cmd.add_argument("--password", help="password value (visible to other processes; prefer stdin)")
+        cmd.add_argument("--password-stdin", action="store_true", help="read the password from stdin (default)")
+        if name == "add":
+            cmd.add_argument("--overwrite", action="store_true")
+        else:
+            cmd.add_argument("--force", action="store_true", help="accept a weak password")
+
+    for name in ("get", "delete"):
+        sub.add_parser(name, help=f"{name} an account").add_argument("account")
+
+    lst = sub.add_parser("list", help="list account names")
+    lst.add_argument("--search", default="")
+
+    sub.add_parser("audit", help="strength, breach and reuse report for the vault")
+
+    gen = sub.add_parser("generate", help="generate passwords (does not open the vault)")
+    gen.add_argument("--length", type=int, default=12)
+    gen.add_argument("--count", type=int, default=1)
+    gen.add_argument("--no-upper", action="store_true")
+    gen.add_argument("--no-digits", action="store_true")
+    gen.add_argument("--no-symbols", action="store_true")
+
+    evl = sub.add_parser("evaluate", help="evaluate a password read from stdin (does not open the vault)")
+    evl.add_argument("--password")
+
+    bat = sub.add_parser("batch", help="run JSON Lines operations from a file ('-' for stdin)")
+    bat.add_argument("file")
+
+    return parser
+
+
+def run(args) -> dict | list:
+    if args.command == "generate":
+        return op_generate(args.length, _preference(args), args.count)
+    if args.command == "evaluate":
+        return op_evaluate(_read_secret(args))
+
+    _authenticate()
+
+    if args.command == "batch":
+        if args.file == "-":
+            return run_batch(sys.stdin)
+        with open(args.file, "r", encoding="utf-8") as f:
+            return run_batch(f)
+
+    from vault_engine import load_passwords, save_passwords
+
+    storage = load_passwords()
+    if args.command == "add":
+        result = op_add(storage, args.account, _read_secret(args), args.overwrite)
+    elif args.command == "update":
+        result = op_update(storage, args.account, _read_secret(args), args.force)
+    elif args.command in ("get", "delete"):
+        result = VAULT_OPS[args.command](storage, args.account)
+    elif args.command == "list":
+        result = op_list(storage, args.search)
+    else:
+        result = op_audit(storage)
+
+    if args.command in MUTATING_OPS:
+        save_passwords(storage)
+    return result
+
+
+def main(argv: list[str]) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        result = run(args)
+    except (CliError, ValueError) as error:
+        print(json.dumps({"ok": False, "error": str(error)}))
+        return 1
+
+    if isinstance(result, list):
+        for row in result:
+            print(json.dumps(row))
+        return 0 if all(row["ok"] for row in result) else 1
+    print(json.dumps({"ok": True, **result}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import hmac
+import os
+
+# ================== Password reuse index ==================
+
+# Truncated HMAC-SHA256; 128 bits is plenty to tell passwords apart.
+DIGEST_BYTES = 16
+
+
+class ReuseIndex:
+    """
+    Maps a keyed hash of each stored password to the accounts using it.
+
+    Plaintexts are never kept: each password is reduced to an HMAC under a
+    random per-process key, so the index reveals nothing if it is dumped.
+    Subscribed to a storage, it is updated on every add, update and delete,
+    making "which accounts share this password" an O(1) lookup and the full
+    reuse report a single pass over the groups.
+    """
+
+    def __init__(self, storage=None, key: bytes | None = None) -> None:
+        self._key = key or os.urandom(32)
+        self._accounts_by_digest: dict[bytes, set[str]] = {}
+        self._digest_by_account: dict[str, bytes] = {}
+        if storage is not None:
+            for account in storage:
+                self._add(account, storage[account])
+
+    def digest(self, password: str) -> bytes:
+        return hmac.new(self._key, password.encode(), hashlib.sha256).digest()[:DIGEST_BYTES]
+
+    def _digest_encoded(self, encoded_pw: str) -> bytes:
+        plaintext = base64.b64decode(encoded_pw.encode())
+        return hmac.new(self._key, plaintext, hashlib.sha256).digest()[:DIGEST_BYTES]
+
+    # ----- maintenance -----
+
+    def _add(self, account: str, encoded_pw: str) -> None:
+        digest = self._digest_encoded(encoded_pw)
+        self._digest_by_account[account] = digest
+        accounts = self._accounts_by_digest.get(digest)
+        if accounts is None:
+            self._accounts_by_digest[digest] = {account}
+        else:
+            accounts.add(account)
+
+    def _remove(self, account: str) -> None:
+        digest = self._digest_by_account.pop(account, None)
+        if digest is None:
+            return
+        accounts = self._accounts_by_digest[digest]
+        accounts.discard(account)
+        if not accounts:
+            del self._accounts_by_digest[digest]
+
+    # Storage listener hooks (see vault_events).
+
+    def on_set(self, account: str, old: str | None, new: str) -> None:
+        self._remove(account)
+        self._add(account, new)
+
+    def on_delete(self, account: str, old: str) -> None:
+        self._remove(account)
+
+    # ----- queries -----
+
+    def accounts_sharing(self, password: str) -> set[str]:
+        """Accounts whose password is exactly password."""
+        return set(self._accounts_by_digest.get(self.digest(password), ()))
+
+    def shared_with(self, account: str) -> set[str]:
+        """Other accounts using the same password as account."""
+        digest = self._digest_by_account.get(account)
+        if digest is None:
+            return set()
+        return self._accounts_by_digest[digest] - {account}
+
+    def reuse_report(self) -> list[list[str]]:
+        """Every group of two or more accounts sharing a password, largest first."""
+        groups = [sorted(accounts) for accounts in self._accounts_by_digest.values() if len(accounts) > 1]
+        groups.sort(key=lambda group: (-len(group), group[0]))
+        return groups
+
+
+def reuse_index_for(storage) -> ReuseIndex:
+    """
+    Return the reuse index of storage, building it on first use.
+    Storages that publish change events keep it up to date incrementally.
+    """
+    index = getattr(storage, "reuse_index", None)
+    if index is None:
+        index = ReuseIndex(storage)
+        if hasattr(storage, "subscribe"):
+            storage.reuse_index = index
+            storage.subscribe(index)
+    return index
+
+
+def reuse_warning(storage, account: str, password: str) -> str | None:
+    """Message naming the other accounts that already use password, if any."""
+    others = sorted(reuse_index_for(storage).accounts_sharing(password) - {account})
+    if not others:
+        return None
+    shown = ", ".join(others[:5]) + (f" and {len(others) - 5} more" if len(others) > 5 else "")
+    return f"This password is already used by: {shown}."
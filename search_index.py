@@ -0,0 +1,172 @@
+from bisect import bisect_left, insort
+from contextlib import nullcontext
+
+# ================== Trigram search index ==================
+
+GRAM = 3
+
+
+def trigrams(text: str) -> set[str]:
+    """All distinct 3-character substrings of an (already lowercased) string."""
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class TrigramIndex:
+    """
+    Case-insensitive substring index over account names.
+
+    Every lowercased account name is split into trigrams, and each trigram
+    maps to the set of accounts containing it. A substring query intersects
+    the posting sets of its own trigrams (smallest first) and only verifies
+    the surviving candidates, instead of scanning every account.
+
+    A sorted list of (lowercased name, account) pairs gives prefix and exact
+    lookups by binary search. The index is kept up to date incrementally,
+    either by subscribing it to an ObservableStorage or by calling add(),
+    remove() and rename() directly.
+    """
+
+    def __init__(self, accounts=()) -> None:
+        self._postings: dict[str, set[str]] = {}
+        self._lower: dict[str, str] = {}
+        self._sorted: list[tuple[str, str]] = []
+
+        for account in accounts:
+            self._index(account)
+        self._sorted.sort()
+
+    def __len__(self) -> int:
+        return len(self._lower)
+
+    def __contains__(self, account) -> bool:
+        return account in self._lower
+
+    # ----- maintenance -----
+
+    def _index(self, account: str) -> str:
+        lowered = account.lower()
+        self._lower[account] = lowered
+        self._sorted.append((lowered, account))
+        postings = self._postings
+        for gram in trigrams(lowered):
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = {account}
+            else:
+                bucket.add(account)
+        return lowered
+
+    def add(self, account: str) -> None:
+        if account in self._lower:
+            return
+        lowered = self._index(account)
+        # _index appended at the end; move the pair into sorted position.
+        self._sorted.pop()
+        insort(self._sorted, (lowered, account))
+
+    def remove(self, account: str) -> None:
+        lowered = self._lower.pop(account, None)
+        if lowered is None:
+            return
+        for gram in trigrams(lowered):
+            bucket = self._postings[gram]
+            bucket.discard(account)
+            if not bucket:
+                del self._postings[gram]
+        i = bisect_left(self._sorted, (lowered, account))
+        del self._sorted[i]
+
+    def rename(self, old: str, new: str) -> None:
+        self.remove(old)
+        self.add(new)
+
+    # Storage listener hooks (see vault_events).
+
+    def on_set(self, account: str, old: str | None, new: str) -> None:
+        if old is None:
+            self.add(account)
+
+    def on_delete(self, account: str, old: str) -> None:
+        self.remove(account)
+
+    # ----- queries -----
+
+    def search(self, query: str) -> list[str]:
+        """Accounts containing query (case-insensitive), sorted by name."""
+        needle = query.lower()
+        if not needle:
+            return self.all()
+
+        if len(needle) < GRAM:
+            # Too short to have a trigram; scan the lowercased names.
+            return sorted(acc for acc, lowered in self._lower.items() if needle in lowered)
+
+        buckets = []
+        for gram in trigrams(needle):
+            bucket = self._postings.get(gram)
+            if bucket is None:
+                return []
+            buckets.append(bucket)
+        buckets.sort(key=len)
+
+        candidates = buckets[0].intersection(*buckets[1:])
+        if len(buckets) > 1 or len(needle) > GRAM:
+            lower = self._lower
+            candidates = [acc for acc in candidates if needle in lower[acc]]
+        return sorted(candidates)
+
+    def _scan_from(self, needle: str, keep, limit: int | None = None) -> list[str]:
+        """Walk the sorted pairs from needle's position while keep() holds."""
+        pairs = self._sorted
+        i = bisect_left(pairs, (needle, ""))
+        end = len(pairs) if limit is None else min(len(pairs), i + limit)
+        matches = []
+        while i < end and keep(pairs[i][0]):
+            matches.append(pairs[i][1])
+            i += 1
+        return sorted(matches)
+
+    def prefix(self, query: str, limit: int | None = None) -> list[str]:
+        """
+        Accounts whose name starts with query (case-insensitive). With limit,
+        only the first limit names in lowercase order, for autocompletion.
+        """
+        needle = query.lower()
+        return self._scan_from(needle, lambda lowered: lowered.startswith(needle), limit)
+
+    def exact(self, query: str) -> list[str]:
+        """Accounts whose name equals query (case-insensitive)."""
+        needle = query.lower()
+        return self._scan_from(needle, lambda lowered: lowered == needle)
+
+    def all(self) -> list[str]:
+        return sorted(self._lower)
+
+
+def index_for(storage) -> TrigramIndex:
+    """
+    Return the search index of storage, building it on first use.
+    Storages that publish change events keep their index and update it in
+    place; for anything else a throwaway index is built.
+    """
+    index = getattr(storage, "search_index", None)
+    if index is not None:
+        return index
+    if not hasattr(storage, "subscribe"):
+        return TrigramIndex(storage)
+    # Build from a snapshot and subscribe under the storage's lock, so that
+    # no change is missed in between and another thread changing the vault
+    # cannot break the iteration. (list() of a plain dict is atomic.)
+    with getattr(storage, "_lock", None) or nullcontext():
+        index = TrigramIndex(list(storage))
+        storage.search_index = index
+        storage.subscribe(index)
+    return index
+
+
+def search_accounts(storage, query: str) -> list[str]:
+    """Sorted accounts of storage whose name contains query (case-insensitive)."""
+    if hasattr(storage, "subscribe"):
+        return index_for(storage).search(query)
+    needle = query.lower()
+    return sorted(acc for acc in storage if needle in acc.lower())
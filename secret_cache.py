@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+
+from vault_engine import decode_password
+
+# ================== Constants ==================
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_TTL_SECONDS = 120.0
+
+
+def _zero(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
+
+# ================== Decoded-secret cache ==================
+
+class SecretCache:
+    """
+    LRU cache of decoded passwords, so re-rendering a page of the vault does
+    not decode every entry again.
+
+    Plaintexts are kept as UTF-8 in bytearrays, which are overwritten with
+    zeros when an entry is evicted, expires (every get() purges expired
+    entries, and the front-ends call purge_expired() on each menu loop or
+    rerun), is invalidated by an update or delete of its account (the cache
+    is a storage listener), or when clear() runs at logout. The str handed
+    back by get() for display is an ordinary immutable copy; only the cached
+    copy can be wiped.
+    """
+
+    def __init__(self, storage, capacity: int = DEFAULT_CAPACITY,
+                 ttl: float = DEFAULT_TTL_SECONDS, decode=decode_password) -> None:
+        self.storage = storage
+        self.capacity = capacity
+        self.ttl = ttl
+        self._decode = decode
+        self._entries = OrderedDict()  # account -> (plaintext bytearray, expires at)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a decode that raced with an
+        # update is not cached.
+        self._generation = 0
+        # Earliest expiry among the cached entries: purging is a no-op before.
+        self._next_expiry = float("inf")
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    # ----- lookups -----
+
+    def get(self, account: str) -> str:
+        """Decoded password of account (KeyError if it is not in storage)."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(account)
+            if entry is not None:
+                self._entries.move_to_end(account)
+                self.stats["hits"] += 1
+                return entry[0].decode("utf-8")
+            self.stats["misses"] += 1
+            generation = self._generation
+
+        plaintext = bytearray(self._decode(self.storage[account]).encode("utf-8"))
+        with self._lock:
+            if generation != self._generation:
+                value = plaintext.decode("utf-8")
+                _zero(plaintext)
+                return value
+            if account in self._entries:
+                self._drop(account, None)
+            self._entries[account] = (plaintext, now + self.ttl)
+            self._next_expiry = min(self._next_expiry, now + self.ttl)
+            while len(self._entries) > self.capacity:
+                self._drop(next(iter(self._entries)), "evictions")
+            return plaintext.decode("utf-8")
+
+    def _drop(self, account: str, counter: str | None) -> None:
+        _zero(self._entries.pop(account)[0])
+        if counter is not None:
+            self.stats[counter] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    # ----- storage listener -----
+
+    def on_set(self, account: str, old: str | None, new: str) -> None:
+        self.invalidate(account)
+
+    def on_delete(self, account: str, old: str) -> None:
+        self.invalidate(account)
+
+    def invalidate(self, account: str) -> None:
+        with self._lock:
+            self._generation += 1
+            if account in self._entries:
+                self._drop(account, "invalidations")
+
+    # ----- housekeeping -----
+
+    def purge_expired(self) -> int:
+        """Zero and drop expired entries. Returns how many there were."""
+        with self._lock:
+            return self._purge(time.monotonic())
+
+    def _purge(self, now: float) -> int:
+        if now < self._next_expiry:
+            return 0
+        expired = [account for account, (_, expires) in self._entries.items() if expires <= now]
+        for account in expired:
+            self._drop(account, "expirations")
+        self._next_expiry = min((expires for _, expires in self._entries.values()), default=float("inf"))
+        return len(expired)
+
+    def clear(self) -> None:
+        """Zero and drop every cached plaintext (logout)."""
+        with self._lock:
+            self._generation += 1
+            for plaintext, _ in self._entries.values():
+                _zero(plaintext)
+            self._entries.clear()
+            self._next_expiry = float("inf")
+
+
+def secret_cache_for(storage, **options) -> SecretCache:
+    """
+    Return the secret cache of storage, creating it on first use.
+    Storages that publish change events invalidate it on update and delete.
+    """
+    cache = getattr(storage, "secret_cache", None)
+    if cache is None:
+        cache = SecretCache(storage, **options)
+        if hasattr(storage, "subscribe"):
+            storage.secret_cache = cache
+            storage.subscribe(cache)
+    return cache
@@ -0,0 +1,780 @@
+import hashlib
+import marshal
+import math
+import os
+import re
+import time
+from functools import lru_cache
+
+# ================== Constants ==================
+
+WORDLIST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "strength_words.txt")
+CACHE_SUFFIX = ".cache"
+CACHE_FORMAT = 2
+MIN_WORD_LENGTH = 3
+
+# Longer passwords are analysed in chunks of this many characters whose
+# guesses multiply, which keeps the search cheap for very long inputs.
+# Text a later chunk repeats from earlier on counts as a copy from there
+# when it is at least MIN_COPY characters long.
+MAX_ANALYSED = 64
+MIN_COPY = 4
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10_000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+
+REFERENCE_YEAR = time.localtime().tm_year
+MIN_YEAR_SPACE = 20
+DATE_MIN_YEAR = 1000
+DATE_MAX_YEAR = 2050
+MAX_SEQUENCE_DELTA = 5
+
+# Scores 1..4 need more guesses than these (zxcvbn's thresholds).
+SCORE_THRESHOLDS = (1e3 + 5, 1e6 + 5, 1e8 + 5, 1e10 + 5)
+STRENGTH_BY_SCORE = ("Weak", "Weak", "Medium", "Medium", "Strong")
+
+LOG2_10 = math.log2(10)
+FACTORIALS = [float(math.factorial(n)) for n in range(MAX_ANALYSED + 2)]
+
+# The common substitutions, and the second reading of the ambiguous ones.
+L33T_TABLE = str.maketrans({
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "[": "c", "<": "c",
+    "3": "e", "6": "g", "9": "g", "1": "i", "!": "i", "|": "i", "0": "o",
+    "$": "s", "5": "s", "+": "t", "7": "t", "%": "x", "2": "z",
+})
+L33T_ALTERNATE_TABLE = str.maketrans({"1": "l", "|": "l", "7": "l"})
+L33T_CHARS = frozenset("4@8({[<3691!|0$5+7%2")
+L33T_AMBIGUOUS = frozenset("1|7")
+
+START_UPPER = re.compile(r"^[A-Z][^A-Z]+$")
+END_UPPER = re.compile(r"^[^A-Z]+[A-Z]$")
+ALL_UPPER = re.compile(r"^[^a-z]+$")
+
+REPEAT_GREEDY = re.compile(r"(.+)\1+")
+REPEAT_LAZY = re.compile(r"(.+?)\1+")
+REPEAT_LAZY_ANCHORED = re.compile(r"^(.+?)\1+$")
+
+RECENT_YEAR = re.compile(r"19\d\d|20\d\d")
+DIGIT_RUN = re.compile(r"\d{4,}")
+DATE_WITH_SEPARATOR = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+DATE_SEPARATORS = frozenset(" /\\_.-")
+
+# Ways to cut a run of digits into day, month and year, by run length.
+DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+
+FEEDBACK = {
+    "passwords": "This is a commonly used password.",
+    "english": "A common word by itself is easy to guess.",
+    "names": "Names by themselves are easy to guess.",
+    "l33t": "Predictable substitutions like '@' instead of 'a' don't help much.",
+    "spatial": "Keyboard patterns like qwerty or asdf are easy to guess.",
+    "repeat": "Repeated characters or words are easy to guess.",
+    "sequence": "Sequences like abc or 6543 are easy to guess.",
+    "date": "Dates and years are easy to guess.",
+    "bruteforce": "Add another word or two; uncommon words are better.",
+}
+
+
+# ================== Keyboard layouts ==================
+
+# Neighbour slots, clockwise from the left.
+DIRECTIONS = ((0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1))
+
+# (horizontal offset of the row, keys as "unshifted+shifted" tokens).
+QWERTY_ROWS = (
+    (0.0, ("`~", "1!", "2@", "3#", "4$", "5%", "6^", "7&", "8*", "9(", "0)", "-_", "=+")),
+    (1.5, ("qQ", "wW", "eE", "rR", "tT", "yY", "uU", "iI", "oO", "pP", "[{", "]}", "\\|")),
+    (1.75, ("aA", "sS", "dD", "fF", "gG", "hH", "jJ", "kK", "lL", ";:", "'\"")),
+    (2.25, ("zZ", "xX", "cC", "vV", "bB", "nN", "mM", ",<", ".>", "/?")),
+)
+KEYPAD_ROWS = (
+    (1.0, ("/", "*", "-")),
+    (0.0, ("7", "8", "9", "+")),
+    (0.0, ("4", "5", "6")),
+    (0.0, ("1", "2", "3")),
+    (0.0, ("0", None, ".")),
+)
+
+
+def _keyboard_graph(rows, slanted: bool) -> dict:
+    """
+    Map every character to its key's neighbours, one slot per direction.
+    On a slanted keyboard the rows are offset, so keys above and below are
+    neighbours when they overlap; on a keypad the grid is aligned.
+    """
+    keys = [(y, offset + x, token)
+            for y, (offset, tokens) in enumerate(rows)
+            for x, token in enumerate(tokens) if token]
+    graph = {}
+    for y, x, token in keys:
+        slots = [None] * len(DIRECTIONS)
+        for other_y, other_x, other in keys:
+            dy, dx = other_y - y, other_x - x
+            if other == token or abs(dy) > 1:
+                continue
+            if dy == 0 and abs(dx) != 1:
+                continue
+            if dy != 0 and (abs(dx) >= 1 if slanted else abs(dx) > 1):
+                continue
+            slots[DIRECTIONS.index((dy, (dx > 0) - (dx < 0)))] = other
+        for char in token:
+            graph[char] = tuple(slots)
+    return graph
+
+
+def _graph_stats(graph: dict) -> tuple[int, float]:
+    """(starting positions, average degree), as zxcvbn counts them."""
+    degrees = [sum(slot is not None for slot in slots) for slots in graph.values()]
+    return len(graph), sum(degrees) / len(degrees)
+
+
+KEYBOARDS = {
+    "qwerty": _keyboard_graph(QWERTY_ROWS, slanted=True),
+    "keypad": _keyboard_graph(KEYPAD_ROWS, slanted=False),
+}
+KEYBOARD_STATS = {name: _graph_stats(graph) for name, graph in KEYBOARDS.items()}
+SHIFTED_CHARS = frozenset(token[1] for _, tokens in QWERTY_ROWS for token in tokens)
+
+
+# ================== Dictionary automaton ==================
+
+def read_wordlists(path: str = WORDLIST_FILE) -> dict[str, list[str]]:
+    """{section: words, most common first} from the word list file."""
+    sections = {}
+    words = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().lower()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                words = sections.setdefault(line[1:-1], [])
+            elif words is not None:
+                words.append(line)
+    return sections
+
+
+def compile_automaton(sections: dict[str, list[str]]) -> tuple:
+    """
+    Build an Aho-Corasick automaton over every word of every section.
+
+    Returns (names, edges, first, fail, out), with states numbered
+    breadth-first so that the children of a state are consecutive: the
+    transition on char is first[state] + edges[state].find(char). fail[state]
+    is the state of the longest proper suffix that is also a trie path, and
+    out maps a state to (length, rank, section index) of every word ending
+    there, including those reached through fail links. This flat form is
+    what the cache stores, and it unmarshals far faster than a dict per state.
+    A word listed in several sections keeps its best (lowest) rank.
+    """
+    names = list(sections)
+    best = {}
+    for index, name in enumerate(names):
+        for rank, word in enumerate(sections[name], start=1):
+            if len(word) >= MIN_WORD_LENGTH and (word not in best or rank < best[word][0]):
+                best[word] = (rank, index)
+
+    goto = [{}]
+    out = [[]]
+    for word, (rank, index) in best.items():
+        state = 0
+        for char in word:
+            nxt = goto[state].get(char)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][char] = nxt
+                goto.append({})
+                out.append([])
+            state = nxt
+        out[state].append((len(word), rank, index))
+
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        for char, nxt in goto[state].items():
+            queue.append(nxt)
+            link = fail[state]
+            while link and char not in goto[link]:
+                link = fail[link]
+            fail[nxt] = goto[link].get(char, 0)
+            out[nxt].extend(out[fail[nxt]])
+
+    order = [0]
+    for state in order:
+        order.extend(goto[state][char] for char in sorted(goto[state]))
+    number = {state: i for i, state in enumerate(order)}
+    edges, first = [], []
+    for state in order:
+        chars = "".join(sorted(goto[state]))
+        edges.append(chars)
+        first.append(number[goto[state][chars[0]]] if chars else 0)
+    return (names, edges, first, [number[fail[state]] for state in order],
+            {number[state]: tuple(out[state]) for state in order if out[state]})
+
+
+def load_automaton(path: str = WORDLIST_FILE, cache_path: str | None = None) -> tuple:
+    """
+    The compiled automaton for path, read from its serialized cache when the
+    cache was built from the same word list, otherwise compiled and cached.
+    """
+    cache_path = cache_path or path + CACHE_SUFFIX
+    with open(path, "rb") as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached = marshal.loads(f.read())
+        if cached[0] == CACHE_FORMAT and cached[1] == digest:
+            return cached[2]
+    except (OSError, EOFError, ValueError, TypeError, IndexError):
+        pass
+
+    automaton = compile_automaton(read_wordlists(path))
+    try:
+        with open(cache_path + ".tmp", "wb") as f:
+            f.write(marshal.dumps((CACHE_FORMAT, digest, automaton)))
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        pass  # read-only install: compile again next time
+    return automaton
+
+
+_automaton = None
+
+
+def get_automaton() -> tuple:
+    global _automaton
+    if _automaton is None:
+        _automaton = load_automaton()
+    return _automaton
+
+
+def _scan(text: str, edges: list, first: list, fail: list, out: dict) -> list[tuple[int, int, int, int]]:
+    """Every (i, j, rank, section) with text[i:j+1] a listed word."""
+    found = []
+    state = 0
+    for j, char in enumerate(text):
+        while True:
+            k = edges[state].find(char)
+            if k >= 0:
+                state = first[state] + k
+                break
+            if not state:
+                break
+            state = fail[state]
+        entries = out.get(state)
+        if entries:
+            for length, rank, index in entries:
+                found.append((j - length + 1, j, rank, index))
+    return found
+
+
+# ================== Guess estimates per pattern ==================
+#
+# Memoized on the pattern's parameters, so words and walks shared by many
+# passwords in a bulk audit are only estimated once. A dictionary token that
+# spans the whole password is never memoized, so the caches only ever hold
+# fragments of passwords (see _dictionary_matches).
+
+def _variations(a: int, b: int) -> int:
+    """Ways to choose which of a + b characters took the rarer form."""
+    return sum(math.comb(a + b, i) for i in range(1, min(a, b) + 1))
+
+
+def _uppercase_variations(token: str) -> int:
+    if token.islower() or token.lower() == token:
+        return 1
+    if START_UPPER.match(token) or END_UPPER.match(token) or ALL_UPPER.match(token):
+        return 2
+    upper = sum(char.isupper() for char in token)
+    lower = sum(char.islower() for char in token)
+    return _variations(upper, lower)
+
+
+def _l33t_variations(token: str, subs: tuple) -> int:
+    lowered = token.lower()
+    variations = 1
+    for subbed, unsubbed in subs:
+        s, u = lowered.count(subbed), lowered.count(unsubbed)
+        variations *= 2 if s == 0 or u == 0 else _variations(s, u)
+    return variations
+
+
+def _dictionary_guesses(token: str, rank: int, reversed_: bool, subs: tuple) -> float:
+    guesses = rank * _uppercase_variations(token) * _l33t_variations(token, subs)
+    return float(guesses * 2 if reversed_ else guesses)
+
+
+_cached_dictionary_guesses = lru_cache(maxsize=65536)(_dictionary_guesses)
+
+
+@lru_cache(maxsize=4096)
+def _spatial_guesses(keyboard: str, length: int, turns: int, shifted: int) -> float:
+    starts, degree = KEYBOARD_STATS[keyboard]
+    guesses = 0.0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * starts * degree ** j
+    if shifted:
+        unshifted = length - shifted
+        guesses *= 2 if unshifted == 0 else _variations(shifted, unshifted)
+    return guesses
+
+
+def _sequence_guesses(token: str, ascending: bool) -> float:
+    first = token[0]
+    if first in "aAzZ019":
+        base = 4
+    elif first.isdigit():
+        base = 10
+    else:
+        base = 26
+    return float(base * len(token) * (1 if ascending else 2))
+
+
+def _year_guesses(year: int, separator: bool = False) -> float:
+    space = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+    return float(space * 365 * (4 if separator else 1))
+
+
+# ================== Matchers ==================
+#
+# A match is (i, j, pattern, token, guesses, detail): token = password[i:j+1],
+# detail names the dictionary or keyboard, or "l33t" / "year" where relevant.
+
+def _dictionary_matches(password: str, lowered: str, automaton: tuple) -> list:
+    names, *tables = automaton
+    matches = []
+    n = len(password)
+
+    def guesses(i: int, j: int, rank: int, reversed_: bool, subs: tuple) -> float:
+        # A token that is the whole password is the plaintext: keep it out of the cache.
+        estimate = _cached_dictionary_guesses if j - i + 1 < n else _dictionary_guesses
+        return estimate(password[i:j + 1], rank, reversed_, subs)
+
+    for i, j, rank, index in _scan(lowered, *tables):
+        token = password[i:j + 1]
+        matches.append((i, j, "dictionary", token, guesses(i, j, rank, False, ()), names[index]))
+
+    # Reversed words: scan the reversed password and map positions back.
+    last = len(lowered) - 1
+    for i, j, rank, index in _scan(lowered[::-1], *tables):
+        i, j = last - j, last - i
+        token = password[i:j + 1]
+        if token.lower() != token.lower()[::-1]:
+            matches.append((i, j, "dictionary", token, guesses(i, j, rank, True, ()), names[index]))
+
+    # l33t: scan each readable variant, keeping words that used a substitution.
+    if not L33T_CHARS.isdisjoint(lowered):
+        variants = [lowered.translate(L33T_TABLE)]
+        if not L33T_AMBIGUOUS.isdisjoint(lowered):
+            variants.append(lowered.translate(L33T_ALTERNATE_TABLE).translate(L33T_TABLE))
+        seen = set()
+        for variant in variants:
+            for i, j, rank, index in _scan(variant, *tables):
+                original = lowered[i:j + 1]
+                plain = variant[i:j + 1]
+                if original == plain or (i, j, index) in seen:
+                    continue
+                seen.add((i, j, index))
+                subs = tuple(sorted({(a, b) for a, b in zip(original, plain) if a != b}))
+                token = password[i:j + 1]
+                matches.append((i, j, "dictionary", token,
+                                guesses(i, j, rank, False, subs), "l33t"))
+    return matches
+
+
+def _spatial_matches(password: str) -> list:
+    matches = []
+    n = len(password)
+    for keyboard, graph in KEYBOARDS.items():
+        i = 0
+        while i < n - 1:
+            j = i + 1
+            last_direction = None
+            turns = 0
+            shifted = 1 if keyboard == "qwerty" and password[i] in SHIFTED_CHARS else 0
+            while True:
+                found = False
+                if j < n:
+                    slots = graph.get(password[j - 1], ())
+                    current = password[j]
+                    for direction, neighbour in enumerate(slots):
+                        if neighbour and current in neighbour:
+                            found = True
+                            if neighbour.index(current) == 1:
+                                shifted += 1
+                            if direction != last_direction:
+                                turns += 1
+                                last_direction = direction
+                            break
+                if found:
+                    j += 1
+                    continue
+                if j - i > 2:
+                    matches.append((i, j - 1, "spatial", password[i:j],
+                                    _spatial_guesses(keyboard, j - i, turns, shifted), keyboard))
+                i = j
+                break
+    return matches
+
+
+def _repeat_matches(password: str) -> list:
+    matches = []
+    last = 0
+    while last < len(password):
+        greedy = REPEAT_GREEDY.search(password, last)
+        if greedy is None:
+            break
+        lazy = REPEAT_LAZY.search(password, last)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            match = greedy
+            base = REPEAT_LAZY_ANCHORED.match(match.group(0)).group(1)
+        else:
+            match = lazy
+            base = match.group(1)
+        i, j = match.start(), match.end() - 1
+        count = len(match.group(0)) // len(base)
+        matches.append((i, j, "repeat", match.group(0), _estimate(base)[0] * count, base))
+        last = j + 1
+    return matches
+
+
+def _sequence_matches(password: str) -> list:
+    matches = []
+    n = len(password)
+    if n < 2:
+        return matches
+
+    def add(i: int, j: int, delta: int) -> None:
+        if (j - i > 1 or abs(delta) == 1) and 0 < abs(delta) <= MAX_SEQUENCE_DELTA:
+            token = password[i:j + 1]
+            matches.append((i, j, "sequence", token, _sequence_guesses(token, delta > 0), ""))
+
+    i = 0
+    last_delta = None
+    for k in range(1, n):
+        delta = ord(password[k]) - ord(password[k - 1])
+        if last_delta is None:
+            last_delta = delta
+        if delta == last_delta:
+            continue
+        add(i, k - 1, last_delta)
+        i = k - 1
+        last_delta = delta
+    add(i, n - 1, last_delta)
+    return matches
+
+
+def _two_to_four_digit_year(year: int) -> int:
+    if year > 99:
+        return year
+    return 1900 + year if year > 50 else 2000 + year
+
+
+def _day_month(first: int, second: int) -> bool:
+    return (1 <= first <= 31 and 1 <= second <= 12) or (1 <= second <= 31 and 1 <= first <= 12)
+
+
+def _date_year(a: int, b: int, c: int) -> int | None:
+    """The year of day/month/year read from three ints in either order, if plausible."""
+    if b > 31 or b <= 0:
+        return None
+    over_12 = over_31 = under_1 = 0
+    for value in (a, b, c):
+        if 99 < value < DATE_MIN_YEAR or value > DATE_MAX_YEAR:
+            return None
+        over_31 += value > 31
+        over_12 += value > 12
+        under_1 += value <= 0
+    if over_31 >= 2 or over_12 == 3 or under_1 >= 2:
+        return None
+
+    splits = ((c, a, b), (a, b, c))
+    for year, first, second in splits:
+        if DATE_MIN_YEAR <= year <= DATE_MAX_YEAR:
+            return year if _day_month(first, second) else None
+    for year, first, second in splits:
+        if _day_month(first, second):
+            return _two_to_four_digit_year(year)
+    return None
+
+
+def _date_matches(password: str) -> list:
+    matches = []
+    for found in RECENT_YEAR.finditer(password):
+        year = int(found.group(0))
+        matches.append((found.start(), found.end() - 1, "date", found.group(0), _year_guesses(year), "year"))
+
+    for run in DIGIT_RUN.finditer(password):
+        start, digits = run.start(), run.group(0)
+        for i in range(len(digits) - 3):
+            for j in range(i + 4, min(i + 8, len(digits)) + 1):
+                token = digits[i:j]
+                years = [
+                    year for k, l in DATE_SPLITS[len(token)]
+                    if (year := _date_year(int(token[:k]), int(token[k:l]), int(token[l:]))) is not None
+                ]
+                if years:
+                    year = min(years, key=lambda y: abs(y - REFERENCE_YEAR))
+                    matches.append((start + i, start + j - 1, "date", token, _year_guesses(year), ""))
+
+    if not DATE_SEPARATORS.isdisjoint(password):
+        n = len(password)
+        for i in range(n - 5):
+            for j in range(i + 6, min(i + 10, n) + 1):
+                found = DATE_WITH_SEPARATOR.fullmatch(password, i, j)
+                if found is None:
+                    continue
+                year = _date_year(int(found.group(1)), int(found.group(3)), int(found.group(4)))
+                if year is not None:
+                    matches.append((i, j - 1, "date", found.group(0), _year_guesses(year, True), ""))
+
+    # Drop dates found inside longer dates (e.g. "1990" within "01011990").
+    dates = [(m[0], m[1]) for m in matches if m[5] != "year"]
+    return [m for m in matches
+            if not any(i <= m[0] and m[1] <= j and (i, j) != (m[0], m[1]) for i, j in dates)]
+
+
+def _omnimatch(password: str) -> list:
+    lowered = password.lower()
+    return (_dictionary_matches(password, lowered, get_automaton())
+            + _spatial_matches(password)
+            + _repeat_matches(password)
+            + _sequence_matches(password)
+            + _date_matches(password))
+
+
+# ================== Search for the likeliest decomposition ==================
+
+def _bruteforce_guesses(length: int) -> float:
+    guesses = float(BRUTEFORCE_CARDINALITY) ** length
+    return max(guesses, MIN_SUBMATCH_GUESSES_SINGLE_CHAR + 1 if length == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR + 1)
+
+
+BRUTEFORCE_GUESSES = [_bruteforce_guesses(length) for length in range(MAX_ANALYSED + 1)]
+
+
+def _most_guessable(password: str, matches: list) -> tuple[float, list]:
+    """
+    The sequence of non-overlapping matches (gaps filled with brute force)
+    that an attacker would need the fewest guesses for, following zxcvbn:
+    l! * product(match guesses) + D^(l-1) for a sequence of l matches.
+    Returns (guesses, matches in order).
+    """
+    n = len(password)
+    by_end = [[] for _ in range(n)]
+    for match in matches:
+        by_end[match[1]].append(match)
+
+    # Per end position and sequence length: best product, total and last match.
+    products = [{} for _ in range(n)]
+    totals = [{} for _ in range(n)]
+    lasts = [{} for _ in range(n)]
+    match_ends = []
+
+    def update(match: tuple, length: int) -> None:
+        k = match[1]
+        product = match[4]
+        if length > 1:
+            product *= products[match[0] - 1][length - 1]
+        total = FACTORIALS[min(length, MAX_ANALYSED + 1)] * product
+        total += MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (length - 1)
+        for other_length, other_total in totals[k].items():
+            if other_length <= length and other_total <= total:
+                return
+        products[k][length] = product
+        totals[k][length] = total
+        lasts[k][length] = match
+
+    for k in range(n):
+        for match in by_end[k]:
+            i = match[0]
+            if i > 0:
+                for length in list(products[i - 1]):
+                    update(match, length + 1)
+            else:
+                update(match, 1)
+
+        # Brute force from the start, or right after a sequence that ends in
+        # a match (two brute-force runs in a row would just be one longer run).
+        # Their tokens are sliced only for the sequence that wins.
+        update((0, k, "bruteforce", None, BRUTEFORCE_GUESSES[k + 1], ""), 1)
+        for end in match_ends:
+            bruteforce = (end + 1, k, "bruteforce", None, BRUTEFORCE_GUESSES[k - end], "")
+            for length, last in list(lasts[end].items()):
+                if last[2] != "bruteforce":
+                    update(bruteforce, length + 1)
+        if any(last[2] != "bruteforce" for last in lasts[k].values()):
+            match_ends.append(k)
+
+    length, guesses = min(totals[n - 1].items(), key=lambda item: item[1])
+    sequence = []
+    k = n - 1
+    while k >= 0:
+        match = lasts[k][length]
+        sequence.append(match)
+        k = match[0] - 1
+        length -= 1
+    sequence.reverse()
+    return guesses, sequence
+
+
+def _estimate(password: str) -> tuple[float, tuple]:
+    """
+    (guesses, ((pattern, token, detail), ...)) for password. Not memoized as
+    a whole, and a dictionary word that makes up the whole password bypasses
+    the word cache, so no cache ever holds a complete password (the master
+    password is estimated too), only fragments of longer ones.
+    """
+    if not password:
+        return 1.0, ()
+    n = len(password)
+    matches = []
+    for match in _omnimatch(password):
+        minimum = 1 if match[1] - match[0] + 1 == n else (
+            MIN_SUBMATCH_GUESSES_SINGLE_CHAR if match[0] == match[1] else MIN_SUBMATCH_GUESSES_MULTI_CHAR)
+        if match[4] < minimum:
+            match = (*match[:4], float(minimum), match[5])
+        matches.append(match)
+    guesses, sequence = _most_guessable(password, matches)
+    return guesses, tuple((m[2], password[m[0]:m[1] + 1], m[5]) for m in sequence)
+
+
+# ================== Public API ==================
+
+def _feedback(score: int, sequence: tuple) -> str:
+    if score >= 3:
+        return ""
+    patterns = [part for part in sequence if part[0] != "bruteforce"]
+    if not patterns:
+        return FEEDBACK["bruteforce"]
+    pattern, _, detail = max(patterns, key=lambda part: len(part[1]))
+    if pattern == "dictionary":
+        return FEEDBACK.get(detail, FEEDBACK["english"])
+    return FEEDBACK[pattern]
+
+
+def _repeated_prefix(password: str) -> tuple[int, int]:
+    """
+    (period, length) of the longest prefix of password that repeats a
+    shorter string at least twice (the last copy may be partial), or (0, 0).
+    """
+    # Knuth-Morris-Pratt failure function: a prefix of length i + 1 whose
+    # longest border is fail[i] has period i + 1 - fail[i].
+    fail = [0] * len(password)
+    k = 0
+    for i in range(1, len(password)):
+        while k and password[i] != password[k]:
+            k = fail[k - 1]
+        if password[i] == password[k]:
+            k += 1
+        fail[i] = k
+    for i in range(len(password) - 1, 0, -1):
+        if 2 * (i + 1 - fail[i]) <= i + 1:
+            return i + 1 - fail[i], i + 1
+    return 0, 0
+
+
+def _copied_prefix(password: str, start: int) -> int:
+    """Length of the longest prefix of password[start:] that also begins before start."""
+    lo, hi = 0, len(password) - start
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if password.find(password[start:start + mid], 0, start - 1 + mid) >= 0:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _analyse(password: str) -> tuple[float, tuple]:
+    """(log10 of guesses, sequence) for a password of any length."""
+    if len(password) <= MAX_ANALYSED:
+        guesses, sequence = _estimate(password)
+        return math.log10(guesses), sequence
+
+    # Chunks on their own would not see repeats that cross their borders:
+    # "Password1!" * 7 would be a repeat plus "word1!" from scratch. So a
+    # leading repeat is guessed as its base times the count, like the
+    # repeat pattern, and text that a later chunk copies from earlier on
+    # costs only where the copy comes from and its length.
+    guesses_log10 = 0.0
+    sequence = ()
+    start = 0
+    period, length = _repeated_prefix(password)
+    if length > MAX_ANALYSED:
+        base_log10, _ = _analyse(password[:period])
+        guesses_log10 = base_log10 + math.log10(-(-length // period))
+        sequence = (("repeat", password[:length], password[:period]),)
+        start = length
+    while start < len(password):
+        if start:
+            copied = _copied_prefix(password, start)
+            if copied >= MIN_COPY:
+                guesses_log10 += math.log10(start * copied)
+                sequence += (("repeat", password[start:start + copied], ""),)
+                start += copied
+                continue
+        guesses, parts = _estimate(password[start:start + MAX_ANALYSED])
+        guesses_log10 += math.log10(guesses)
+        sequence += parts
+        start += MAX_ANALYSED
+    return guesses_log10, sequence
+
+
+def estimate_strength(password: str) -> dict:
+    """
+    zxcvbn-style estimate of how many guesses an attacker needs, looking for
+    common passwords, words and names (also reversed or with l33t
+    substitutions), keyboard walks, repeats, sequences and dates.
+
+    Returns strength (Weak/Medium/Strong), score (0-4), guesses_log10,
+    entropy_bits, the patterns found and a one-line feedback.
+    """
+    guesses_log10, sequence = _analyse(password)
+
+    score = sum(guesses_log10 >= math.log10(threshold) for threshold in SCORE_THRESHOLDS)
+    return {
+        "strength": STRENGTH_BY_SCORE[score],
+        "score": score,
+        "guesses_log10": round(guesses_log10, 2),
+        "entropy_bits": round(guesses_log10 * LOG2_10, 1),
+        "patterns": [part[0] for part in sequence],
+        "feedback": _feedback(score, sequence),
+    }
+
+
+def clear_caches() -> None:
+    """Forget memoized results, which hold password fragments (logout, exit)."""
+    _cached_dictionary_guesses.cache_clear()
+
+
+def main(argv: list[str]) -> int:
+    import getpass
+
+    if argv[:1] == ["--rebuild-cache"]:
+        cache = WORDLIST_FILE + CACHE_SUFFIX
+        if os.path.exists(cache):
+            os.remove(cache)
+        names, edges, *_ = load_automaton()
+        print(f"Compiled {len(edges)} states from {', '.join(names)} into {cache}")
+        return 0
+
+    password = argv[0] if argv else getpass.getpass("Password: ")
+    for key, value in estimate_strength(password).items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
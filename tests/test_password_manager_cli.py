@@ -0,0 +1,32 @@
+import json
+
+from password_manager_cli import main, run_batch
+
+
+def test_batch_add_rejects_names_with_control_characters(tmp_path, monkeypatch):
+    monkeypatch.setenv("PM_VAULT", str(tmp_path / "vault.txt"))
+    lines = [
+        json.dumps({"op": "add", "account": "Evil\n+Injected", "password": "Secret-1"}),
+        json.dumps({"op": "add", "account": "Bell\x07", "password": "Secret-2"}),
+        json.dumps({"op": "add", "account": "github", "password": "Secret-3"}),
+    ]
+    results = run_batch(lines)
+    assert [row["ok"] for row in results] == [False, False, True]
+    assert "control characters" in results[0]["error"]
+    assert results[2]["account"] == "Github"
+
+
+def test_batch_rejects_fields_of_the_wrong_type(tmp_path, monkeypatch):
+    monkeypatch.setenv("PM_VAULT", str(tmp_path / "vault.txt"))
+    lines = [
+        json.dumps({"op": "add", "account": 42, "password": "Secret-1"}),
+        json.dumps({"op": "generate", "length": True}),
+    ]
+    results = run_batch(lines)
+    assert results[0] == {"line": 1, "ok": False, "error": "Bad request: 'account' must be a string."}
+    assert results[1] == {"line": 2, "ok": False, "error": "Bad request: 'length' must be an integer."}
+
+
+def test_invalid_value_is_reported_as_json(capsys):
+    assert main(["generate", "--length", "0"]) == 1
+    assert json.loads(capsys.readouterr().out)["ok"] is False
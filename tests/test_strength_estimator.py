@@ -0,0 +1,43 @@
+import pytest
+
+from strength_estimator import estimate_strength
+
+
+@pytest.mark.parametrize("password", [
+    "Password1!" * 6,
+    "Password1!" * 7,
+    "Password1!" * 7 + "Pass",
+    "123456" * 50,
+    "a" * 260,
+    "x" * 1000,
+])
+def test_long_repeats_are_not_strong(password):
+    result = estimate_strength(password)
+    assert result["strength"] != "Strong"
+    assert "repeat" in result["patterns"]
+
+
+def test_repeat_across_chunks_counts_once():
+    assert estimate_strength("Password1!" * 20)["guesses_log10"] < 8
+
+
+def test_long_random_password_stays_strong():
+    password = "kq7#Vb2!Lw9zR^m4Tn8&Hc1@Yp6*Xs3$Gd5%Jf0+Ue8=Oa2~Bi7?Zr4;Ql9]Wx1&Ke3"
+    assert len(password) > 64
+    assert estimate_strength(password)["strength"] == "Strong"
+
+
+def test_whole_password_is_not_memoized(monkeypatch):
+    import strength_estimator
+
+    cached_tokens = []
+    cached = strength_estimator._cached_dictionary_guesses
+
+    def recording(token, *args):
+        cached_tokens.append(token)
+        return cached(token, *args)
+
+    monkeypatch.setattr(strength_estimator, "_cached_dictionary_guesses", recording)
+    for password in ("sunshine", "Sunshine", "enihsnus", "5unsh1ne"):
+        estimate_strength(password)
+        assert password not in cached_tokens
@@ -0,0 +1,22 @@
+import json
+
+from vault_api import VaultApi
+from vault_events import ObservableStorage
+
+HEADERS = {"authorization": "Bearer secret-token"}
+
+
+def post_account(api, account):
+    body = json.dumps({"account": account, "password": "Secret-1"}).encode()
+    return api.respond("POST", "/accounts", HEADERS, body)
+
+
+def test_post_rejects_names_with_control_characters():
+    storage = ObservableStorage()
+    api = VaultApi(storage, "secret-token")
+    status, payload = post_account(api, "Evil\n+Injected")
+    assert status == 400
+    assert payload["ok"] is False
+    assert "control characters" in payload["error"]
+    assert post_account(api, "github")[0] == 201
+    assert list(storage) == ["Github"]
@@ -0,0 +1,40 @@
+import pytest
+
+from vault_journal import JournaledStorage
+
+
+def test_append_after_torn_record(tmp_path):
+    path = str(tmp_path / "v.txt")
+    with open(path + ".journal", "w") as f:
+        f.write("+Torn:YWJj")  # a writer crashed before the newline
+
+    storage = JournaledStorage(path)
+    storage["New"] = "TmV3"
+    storage.close()
+
+    with open(path + ".journal") as f:
+        assert f.read() == "+New:TmV3\n"
+    reloaded = JournaledStorage(path)
+    assert dict(reloaded) == {"New": "TmV3"}
+    reloaded.close()
+
+
+def test_names_with_line_breaks_are_refused(tmp_path):
+    storage = JournaledStorage(str(tmp_path / "v.txt"))
+    for account in ("Evil\nx", "Evil\r-Name"):
+        with pytest.raises(ValueError):
+            storage[account] = "YWJj"
+    with pytest.raises(ValueError):
+        storage.set_many([("Fine", "YWJj"), ("Evil\nx", "YWJj")])
+    assert dict(storage) == {}
+    storage.close()
+
+
+def test_unparsable_record_is_skipped(tmp_path):
+    path = str(tmp_path / "v.txt")
+    with open(path + ".journal", "w") as f:
+        f.write("+Good:R29vZA==\n+NoSeparator\n+Other:T3RoZXI=\n")
+
+    storage = JournaledStorage(path)
+    assert dict(storage) == {"Good": "R29vZA==", "Other": "T3RoZXI="}
+    storage.close()
@@ -0,0 +1,36 @@
+import io
+
+from vault_transfer import import_file
+
+
+def test_import_rejects_names_with_control_characters():
+    export = io.StringIO(
+        'name,password\n'
+        'GitHub,Secret-1\n'
+        '"Evil\n+Injected",Secret-2\n'
+        '"Tab\tName",Secret-3\n'
+        'Plain Name,Secret-4\n'
+    )
+    storage = {}
+    stats = import_file(export, storage)
+    assert sorted(storage) == ["Github", "Plain Name"]
+    assert stats["read"] == 4
+    assert stats["written"] == 2
+    assert stats["control_chars"] == 2
+    assert stats["invalid"] == 2
+
+
+def test_malformed_json_lines_are_skipped_with_their_line_number():
+    export = io.StringIO(
+        '{"name": "GitHub", "password": "Secret-1"}\n'
+        '{"name": "Broken", \n'
+        '\n'
+        '["not", "an", "object"]\n'
+        '{"name": "Plain Name", "password": "Secret-4"}\n'
+    )
+    storage = {}
+    stats = import_file(export, storage, fmt="jsonl")
+    assert sorted(storage) == ["Github", "Plain Name"]
+    assert stats["read"] == 4
+    assert stats["invalid"] == 2
+    assert stats["malformed_lines"] == [2, 4]
@@ -0,0 +1,348 @@
+"""
+Local HTTP/JSON API for the vault, for tools that need many requests a second.
+
+    PM_MASTER_PASSWORD=... python vault_api.py [--port 8765]
+    PM_MASTER_PASSWORD=... python vault_api.py --unix /tmp/vault.sock
+
+Routes (every request needs "Authorization: Bearer <token>"; the token is
+written to vault_api.token, readable only by its owner):
+
+    GET    /accounts?search=&offset=0&limit=100&reveal=0   list (view_passwords)
+    GET    /accounts/<name>                                 one decoded password
+    POST   /accounts            {"account", "password", "overwrite"}   add
+    PUT    /accounts/<name>     {"password", "force"}       update
+    DELETE /accounts/<name>                                 delete
+    POST   /generate            {"length", "count", "upper", "digits", "symbols"}
+    POST   /evaluate            {"password"}
+    GET    /health
+
+The server keeps one vault in memory and serves connections with HTTP/1.1
+keep-alive. Changes are written by the autosave thread in debounced batches
+rather than one flush per request.
+"""
+import asyncio
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import signal
+import sys
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from password_manager_cli import (
+    CliError,
+    ExistsError,
+    NotFoundError,
+    op_add,
+    op_delete,
+    op_evaluate,
+    op_generate,
+    op_get,
+    op_list,
+    op_update,
+)
+
+# ================== Constants ==================
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+TOKEN_FILE = "vault_api.token"
+TOKEN_ENV = "PM_API_TOKEN"
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_LIMIT = 100
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized",
+    404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+    413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# ================== HTTP framing ==================
+
+async def read_request(reader: asyncio.StreamReader):
+    """
+    Read one request from a keep-alive connection.
+    Returns (method, target, version, headers, body), or None once the
+    client has closed the connection.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if error.partial.strip():
+            raise HttpError(400, "Truncated request.")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "Request headers too large.")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(400, "Malformed request line.")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "Malformed Content-Length.")
+    if length < 0:
+        raise HttpError(400, "Malformed Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+def render_response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "Cache-Control: no-store\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def wants_keep_alive(version: str, headers: dict) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+# ================== API ==================
+
+class VaultApi:
+    """Routes requests to the same operations as the scripted CLI."""
+
+    def __init__(self, storage, token: str) -> None:
+        self.storage = storage
+        self._token = token.encode()
+        self.served = 0
+
+    def authorized(self, headers: dict) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), self._token)
+
+    def dispatch(self, method: str, target: str, body: bytes) -> tuple[int, dict]:
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        fields = json.loads(body) if body else {}
+        if not isinstance(fields, dict):
+            raise HttpError(400, "Expected a JSON object.")
+        for name in ("account", "password"):
+            if name in fields and not isinstance(fields[name], str):
+                raise HttpError(400, f"'{name}' must be a string.")
+
+        if parts == ["health"] and method == "GET":
+            return 200, {"accounts": len(self.storage), "served": self.served}
+
+        if parts == ["accounts"]:
+            if method == "GET":
+                return 200, self.list_accounts(query)
+            if method == "POST":
+                # op_add refuses control characters in the name (a 400).
+                return 201, op_add(self.storage, fields["account"], fields["password"],
+                                   bool(fields.get("overwrite", False)))
+            raise HttpError(405, "Use GET or POST.")
+
+        if len(parts) == 2 and parts[0] == "accounts":
+            account = parts[1]
+            if method == "GET":
+                return 200, op_get(self.storage, account)
+            if method == "PUT":
+                return 200, op_update(self.storage, account, fields["password"],
+                                      bool(fields.get("force", False)))
+            if method == "DELETE":
+                return 200, op_delete(self.storage, account)
+            raise HttpError(405, "Use GET, PUT or DELETE.")
+
+        if parts == ["generate"] and method == "POST":
+            preference = ["yes" if fields.get(name, True) else "no"
+                          for name in ("upper", "digits", "symbols")]
+            return 200, op_generate(int(fields.get("length", 12)), preference,
+                                    int(fields.get("count", 1)))
+
+        if parts == ["evaluate"] and method == "POST":
+            return 200, op_evaluate(fields["password"])
+
+        raise HttpError(404, f"No route for {method} {url.path}.")
+
+    def list_accounts(self, query: dict) -> dict:
+        """Search result page, optionally with decoded passwords (view_passwords)."""
+        from secret_cache import secret_cache_for
+
+        listing = op_list(self.storage, query.get("search", ""))
+        offset = max(0, int(query.get("offset", 0)))
+        limit = max(0, int(query.get("limit", DEFAULT_LIMIT)))
+        page = listing["accounts"][offset:offset + limit]
+        result = {"count": listing["count"], "offset": offset, "accounts": page}
+        if query.get("reveal") in ("1", "true", "yes"):
+            reveal = secret_cache_for(self.storage).get
+            result["passwords"] = {account: reveal(account)
+                                   for account in page if account in self.storage}
+        return result
+
+    def respond(self, method: str, target: str, headers: dict, body: bytes) -> tuple[int, dict]:
+        if not self.authorized(headers):
+            return 401, {"ok": False, "error": "Missing or wrong API token."}
+        try:
+            status, result = self.dispatch(method, target, body)
+        except HttpError as error:
+            return error.status, {"ok": False, "error": str(error)}
+        except NotFoundError as error:
+            return 404, {"ok": False, "error": str(error)}
+        except ExistsError as error:
+            return 409, {"ok": False, "error": str(error)}
+        except CliError as error:
+            return 400, {"ok": False, "error": str(error)}
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {"ok": False, "error": f"Bad request: {error!r}"}
+        self.served += 1
+        return status, {"ok": True, **result}
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as error:
+                    writer.write(render_response(error.status, {"ok": False, "error": str(error)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                # The operations run inline on the event loop. Reads are
+                # in-memory work; a mutation also writes to the backend
+                # synchronously (a journal append under its file lock, or a
+                # SQLite commit), which is short next to a network round
+                # trip. The autosave thread only flushes and compacts.
+                status, payload = self.respond(method, target, headers, body)
+                keep_alive = wants_keep_alive(version, headers)
+                writer.write(render_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # idle keep-alive connection at shutdown
+        finally:
+            writer.close()
+
+
+# ================== Server ==================
+
+def load_token(path: str = TOKEN_FILE) -> str:
+    """$PM_API_TOKEN, or a new random token written to path (mode 0600)."""
+    token = os.environ.get(TOKEN_ENV)
+    if token:
+        return token
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token + "\n")
+    os.replace(path + ".tmp", path)
+    return token
+
+
+def check_loopback(host: str) -> None:
+    if host == "localhost":
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(f"Refusing to listen on {host}: only localhost is allowed.")
+
+
+async def serve(api: VaultApi, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix_path: str | None = None, ready=None) -> None:
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        server = await asyncio.start_unix_server(api.handle_connection, unix_path,
+                                                 limit=MAX_HEADER_BYTES)
+        os.chmod(unix_path, 0o600)
+    else:
+        check_loopback(host)
+        server = await asyncio.start_server(api.handle_connection, host, port,
+                                            limit=MAX_HEADER_BYTES)
+    if ready is not None:
+        ready(server)
+
+    # Stop cleanly on SIGTERM/SIGINT, so pending changes are still saved.
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    async with server:
+        await stop.wait()
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    from password_manager_cli import _authenticate
+    from secret_cache import secret_cache_for
+    from strength_estimator import clear_caches
+    from vault_autosave import autosave_for
+    from vault_engine import get_vault, save_passwords
+
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON API for the vault.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--token-file", default=TOKEN_FILE)
+    args = parser.parse_args(argv)
+
+    try:
+        _authenticate()
+        if not args.unix:
+            check_loopback(args.host)
+    except (CliError, ValueError) as error:
+        print(error)
+        return 1
+
+    storage = get_vault()
+    writer = autosave_for(storage, save=save_passwords)
+    api = VaultApi(storage, load_token(args.token_file))
+    token_source = TOKEN_ENV if os.environ.get(TOKEN_ENV) else args.token_file
+
+    def ready(server) -> None:
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"Serving {len(storage)} accounts on {where} (token in {token_source}).", flush=True)
+
+    try:
+        asyncio.run(serve(api, args.host, args.port, args.unix, ready))
+    finally:
+        writer.close()
+        # Wipe the passwords decoded for ?reveal=1 listings and the
+        # fragments memoized by strength estimates.
+        secret_cache_for(storage).clear()
+        clear_caches()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
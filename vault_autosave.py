@@ -0,0 +1,191 @@
+import atexit
+import threading
+import time
+
+from vault_journal import save_vault
+
+# ================== Constants ==================
+
+# Write once no change arrived for DEBOUNCE_SECONDS, but never later than
+# MAX_DELAY_SECONDS after the first unsaved change.
+DEBOUNCE_SECONDS = 1.0
+MAX_DELAY_SECONDS = 5.0
+
+
+# ================== Background writer ==================
+
+class AutosaveWriter:
+    """
+    Background thread that persists a vault shortly after it changes.
+
+    The writer subscribes to the storage's change events; a mutation only
+    bumps a counter and wakes the thread, so the caller (a Streamlit rerun)
+    never waits on disk. Bursts of changes are coalesced into one save once
+    the storage has been quiet for `debounce` seconds. Pending changes are
+    flushed by close(), which also runs at interpreter exit.
+    """
+
+    def __init__(self, storage, save=save_vault, debounce: float = DEBOUNCE_SECONDS,
+                 max_delay: float = MAX_DELAY_SECONDS) -> None:
+        self.storage = storage
+        self._save = save
+        self.debounce = debounce
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._flush_requested = False
+        self._writing = False
+        self._closing = False
+
+        self.metrics = {
+            "mutations": 0,
+            "batches": 0,
+            "largest_batch": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+            "last_flushed_at": None,
+            "errors": 0,
+            "last_error": None,
+        }
+
+        storage.subscribe(self)
+        self._thread = threading.Thread(target=self._run, name="vault-autosave", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ----- storage listener -----
+
+    def on_set(self, account: str, old: str | None, new: str) -> None:
+        self._mark()
+
+    def on_delete(self, account: str, old: str) -> None:
+        self._mark()
+
+    def _mark(self) -> None:
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_change = now
+            self._pending += 1
+            self._last_change = now
+            self.metrics["mutations"] += 1
+            self._cond.notify_all()
+
+    # ----- state -----
+
+    @property
+    def dirty(self) -> bool:
+        """True while some change has not reached the disk yet."""
+        return self._pending > 0 or self._writing
+
+    @property
+    def last_flushed_at(self) -> float | None:
+        """Wall-clock time of the last successful save."""
+        return self.metrics["last_flushed_at"]
+
+    def snapshot_metrics(self) -> dict:
+        with self._cond:
+            metrics = dict(self.metrics)
+            metrics["pending"] = self._pending
+        batches = metrics["batches"]
+        metrics["mutations_per_batch"] = (metrics["mutations"] - metrics["pending"]) / batches if batches else 0.0
+        return metrics
+
+    # ----- writer thread -----
+
+    def _deadline(self) -> float:
+        return min(self._last_change + self.debounce, self._first_change + self.max_delay)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                # Debounce: wait for a quiet period, a flush request or close().
+                while not (self._flush_requested or self._closing):
+                    remaining = self._deadline() - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._pending
+                self._pending = 0
+                self._flush_requested = False
+                self._writing = True
+
+            self._write(batch)
+
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _write(self, batch: int) -> None:
+        start = time.perf_counter()
+        try:
+            self._save(self.storage)
+        except Exception as error:
+            with self._cond:
+                # Keep the changes pending so the next round retries them
+                # (but do not spin on a failing disk while closing).
+                if not self._closing:
+                    self._pending += batch
+                    self._first_change = self._last_change = time.monotonic()
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = repr(error)
+            return
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._cond:
+            metrics = self.metrics
+            metrics["batches"] += 1
+            metrics["last_batch_size"] = batch
+            metrics["largest_batch"] = max(metrics["largest_batch"], batch)
+            metrics["last_flush_ms"] = elapsed_ms
+            metrics["total_flush_ms"] += elapsed_ms
+            metrics["last_flushed_at"] = time.time()
+
+    # ----- control -----
+
+    def request_flush(self) -> None:
+        """Ask for an immediate save without waiting for it."""
+        with self._cond:
+            # With nothing pending the flag would outlive this request and
+            # let the next change skip the debounce.
+            if self._pending:
+                self._flush_requested = True
+                self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Save now and wait until every pending change is on disk."""
+        with self._cond:
+            if not self.dirty:
+                return True
+            if self._pending:
+                self._flush_requested = True
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self.dirty or not self._thread.is_alive(), timeout)
+
+    def close(self) -> None:
+        """Flush pending changes and stop the thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.storage.unsubscribe(self)
+        atexit.unregister(self.close)
+
+
+def autosave_for(storage, **options) -> AutosaveWriter:
+    """Return the background writer of storage, starting one on first use."""
+    writer = getattr(storage, "autosave", None)
+    if writer is None or not writer._thread.is_alive():
+        writer = AutosaveWriter(storage, **options)
+        storage.autosave = writer
+    return writer
@@ -0,0 +1,322 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import Mapping, MutableMapping
+
+from vault_events import StorageEvents, check_account
+from vault_journal import JOURNAL_SUFFIX, ROTATED_SUFFIX, read_snapshot, replay_journal, write_snapshot
+
+# ================== Constants ==================
+
+BINARY_FILE = "app_passwords.vault"
+
+MAGIC = b"PMVB"
+VERSION = 1
+
+# magic, version, reserved, entry count, names offset, records offset
+HEADER = struct.Struct("<4sHHIQQ")
+# name offset (in names blob), name length, record offset (in records blob)
+INDEX_ENTRY = struct.Struct("<IHQ")
+RECORD_LEN = struct.Struct("<I")
+
+
+# ================== Writing ==================
+
+def write_binary_entries(entries, path: str = BINARY_FILE) -> None:
+    """
+    Write (account, encoded) pairs, in account order, as a binary vault:
+
+        header | sorted index | account names | length-prefixed payloads
+
+    The index sits at the head of the file so accounts can be listed and
+    looked up without reading any payload bytes.
+    """
+    names = bytearray()
+    records = bytearray()
+    index = bytearray()
+    count = 0
+
+    for account, encoded_pw in entries:
+        name = account.encode("utf-8")
+        payload = encoded_pw.encode("ascii")
+        index += INDEX_ENTRY.pack(len(names), len(name), len(records))
+        names += name
+        records += RECORD_LEN.pack(len(payload))
+        records += payload
+        count += 1
+
+    names_offset = HEADER.size + len(index)
+    records_offset = names_offset + len(names)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, count, names_offset, records_offset))
+        f.write(index)
+        f.write(names)
+        f.write(records)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_binary_vault(storage: Mapping, path: str = BINARY_FILE) -> None:
+    """Write a mapping as a binary vault."""
+    write_binary_entries(((account, storage[account]) for account in sorted(storage)), path)
+
+
+# ================== Reading ==================
+
+class BinaryVault(Mapping):
+    """
+    Read-only, mmap-backed view of a binary vault.
+
+    Opening the file only parses the header. Iteration walks the index and the
+    names blob; payloads are read (still Base64-encoded) only when an account
+    is looked up, so listing accounts never touches password data.
+    """
+
+    def __init__(self, path: str = BINARY_FILE) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count, names_offset, records_offset = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary vault.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary vault version {version}.")
+
+        self._count = count
+        self._names_offset = names_offset
+        self._records_offset = records_offset
+
+    def _entry(self, i: int) -> tuple[int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._mmap, HEADER.size + i * INDEX_ENTRY.size)
+
+    def _name(self, i: int) -> bytes:
+        name_off, name_len, _ = self._entry(i)
+        start = self._names_offset + name_off
+        return self._mmap[start:start + name_len]
+
+    def _find(self, account: str) -> int:
+        """Binary search the sorted index. Returns -1 when missing."""
+        target = account.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._name(lo) == target:
+            return lo
+        return -1
+
+    def __getitem__(self, account: str) -> str:
+        i = self._find(account) if isinstance(account, str) else -1
+        if i < 0:
+            raise KeyError(account)
+        _, _, record_off = self._entry(i)
+        start = self._records_offset + record_off
+        (length,) = RECORD_LEN.unpack_from(self._mmap, start)
+        start += RECORD_LEN.size
+        return self._mmap[start:start + length].decode("ascii")
+
+    def __contains__(self, account) -> bool:
+        return isinstance(account, str) and self._find(account) >= 0
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._name(i).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def iter_items(self):
+        """(account, encoded) pairs in account order, walking the index once."""
+        for i in range(self._count):
+            name_off, name_len, record_off = self._entry(i)
+            start = self._names_offset + name_off
+            account = self._mmap[start:start + name_len].decode("utf-8")
+            start = self._records_offset + record_off
+            (length,) = RECORD_LEN.unpack_from(self._mmap, start)
+            start += RECORD_LEN.size
+            yield account, self._mmap[start:start + length].decode("ascii")
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "BinaryVault":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ================== Binary storage ==================
+
+def _merge_changes(items, changes: dict):
+    """Apply sorted {account: encoded, or None if deleted} changes to sorted items."""
+    changes = iter(sorted(changes.items()))
+    pending = next(changes, None)
+    for account, encoded_pw in items:
+        while pending is not None and pending[0] < account:
+            if pending[1] is not None:
+                yield pending
+            pending = next(changes, None)
+        if pending is not None and pending[0] == account:
+            if pending[1] is not None:
+                yield pending
+            pending = next(changes, None)
+        else:
+            yield account, encoded_pw
+    while pending is not None:
+        if pending[1] is not None:
+            yield pending
+        pending = next(changes, None)
+
+
+class BinaryStorage(StorageEvents, MutableMapping):
+    """
+    Accounts kept in a binary vault (app_passwords.vault), the backend
+    load_passwords() picks for .vault files.
+
+    Opening it only maps the file and parses the header, so startup does not
+    depend on the size of the vault. Changes are kept in memory on top of the
+    mapped file until save() rewrites it, which it skips when nothing
+    changed. Like the compressed vault it has no journal and no
+    cross-process locking: it is meant for large vaults with a single writer.
+    """
+
+    def __init__(self, path: str = BINARY_FILE) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._base = BinaryVault(path) if os.path.exists(path) else {}
+        self._changes = {}  # account -> encoded, or None once deleted
+        self._count = len(self._base)
+
+    def _get(self, account):
+        if account in self._changes:
+            return self._changes[account]
+        return self._base.get(account)
+
+    def __getitem__(self, account: str) -> str:
+        with self._lock:
+            encoded_pw = self._get(account)
+        if encoded_pw is None:
+            raise KeyError(account)
+        return encoded_pw
+
+    def __contains__(self, account) -> bool:
+        with self._lock:
+            return isinstance(account, str) and self._get(account) is not None
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        check_account(account)
+        with self._lock:
+            old = self._get(account)
+            self._changes[account] = encoded_pw
+            if old is None:
+                self._count += 1
+            self._notify_set(account, old, encoded_pw)
+
+    def __delitem__(self, account: str) -> None:
+        with self._lock:
+            old = self._get(account)
+            if old is None:
+                raise KeyError(account)
+            self._changes[account] = None
+            self._count -= 1
+            self._notify_delete(account, old)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _iter_items(self):
+        # The changes are copied and the mapped file is the one of this
+        # moment, so a save() meanwhile does not disturb the iteration.
+        with self._lock:
+            base, changes = self._base, dict(self._changes)
+        items = base.iter_items() if isinstance(base, BinaryVault) else iter(())
+        return _merge_changes(items, changes)
+
+    def __iter__(self):
+        for account, _ in self._iter_items():
+            yield account
+
+    def save(self) -> bool:
+        """Rewrite the file if anything changed. Returns whether it did."""
+        with self._lock:
+            if not self._changes:
+                return False
+            changes = dict(self._changes)
+            items = self._iter_items()
+        write_binary_entries(items, self.path)
+        with self._lock:
+            # Changes made while writing stay pending for the next save.
+            for account, encoded_pw in changes.items():
+                if account in self._changes and self._changes[account] == encoded_pw:
+                    del self._changes[account]
+            # The previous mapping is left to iterations still reading it.
+            self._base = BinaryVault(self.path)
+        return True
+
+    def close(self) -> None:
+        if isinstance(self._base, BinaryVault):
+            self._base.close()
+
+
+# ================== Conversion ==================
+
+def text_to_binary(text_path: str, binary_path: str = BINARY_FILE) -> int:
+    """Convert a text vault (and its journal) to the binary format."""
+    storage = {}
+    read_snapshot(text_path, storage)
+    replay_journal(text_path + ROTATED_SUFFIX, storage)
+    replay_journal(text_path + JOURNAL_SUFFIX, storage)
+    write_binary_vault(storage, binary_path)
+    return len(storage)
+
+
+def binary_to_text(binary_path: str, text_path: str) -> int:
+    """Convert a binary vault back to the "account:encoded" text format."""
+    with BinaryVault(binary_path) as vault:
+        write_snapshot(text_path, vault)
+        count = len(vault)
+    # Journals left next to the text file would be replayed on top of it.
+    for suffix in (ROTATED_SUFFIX, JOURNAL_SUFFIX):
+        if os.path.exists(text_path + suffix):
+            os.remove(text_path + suffix)
+    return count
+
+
+def main(argv: list[str]) -> int:
+    usage = (
+        "usage: python vault_binary.py to-binary <text file> <vault file>\n"
+        "       python vault_binary.py to-text <vault file> <text file>\n"
+        "       python vault_binary.py list <vault file>"
+    )
+    if len(argv) < 2:
+        print(usage)
+        return 2
+
+    command, args = argv[0], argv[1:]
+    if command == "to-binary" and len(args) == 2:
+        print(f"Converted {text_to_binary(*args)} accounts.")
+    elif command == "to-text" and len(args) == 2:
+        print(f"Converted {binary_to_text(*args)} accounts.")
+    elif command == "list" and len(args) == 1:
+        with BinaryVault(args[0]) as vault:
+            for i, account in enumerate(vault, start=1):
+                print(f"{i}) {account}")
+    else:
+        print(usage)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
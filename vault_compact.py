@@ -0,0 +1,343 @@
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from heapq import merge as merge_sorted
+from itertools import islice
+
+from vault_events import StorageEvents, check_account
+
+# ================== Constants ==================
+
+# Offsets into the packed names and payloads (8 bytes each, so blobs past
+# 4 GiB still work).
+OFFSET_TYPECODE = "Q"
+
+# Fold the overflow into the packed arrays once it holds this share of the
+# packed entries (and at least MERGE_MIN_ENTRIES); likewise for deletions.
+MERGE_RATIO = 0.125
+MERGE_MIN_ENTRIES = 4096
+
+# Every SAMPLE_EVERY-th packed name is also kept as bytes in a list, which
+# bisect searches in C before the final steps run over the packed names.
+SAMPLE_EVERY = 32
+
+# load() takes its input a batch at a time, so it never holds more than one
+# batch as Python objects. Sorted input (a mapping, whose keys load() sorts,
+# or a compressed container) is appended in small batches; unsorted input
+# switches to large ones, since each of its batches rebuilds the buffers.
+SORTED_BATCH = 1 << 16
+LOAD_BATCH = 1 << 20
+
+
+# ================== Compact storage ==================
+
+class CompactStorage(StorageEvents, MutableMapping):
+    """
+    Accounts mapping packed into a few flat buffers instead of a dict.
+
+    Sorted account names are stored once each, UTF-8 encoded, back to back
+    in one bytearray, and the Base64 payloads in another; two arrays of
+    offsets delimit them, and a bytearray flags deleted entries. That costs
+    about the bytes of the name and the payload plus 17 per entry, against
+    well over 100 bytes of object overhead for a dict of str. Lookups binary
+    search the names, narrowed first by a sample of every SAMPLE_EVERY-th one.
+
+    The packed part is only rebuilt in bulk. New accounts and updates that
+    change a payload's length go to a small overflow dict, deletions and
+    replaced entries are flagged, and merge() folds both into new buffers
+    once either passes MERGE_RATIO of the packed entries. Listeners are
+    notified like ObservableStorage's.
+
+    Every operation holds a lock, so threads can share the storage (e.g. a
+    background save). Iteration is in account order and sees the entries as
+    of its first step, whatever changes meanwhile: it keeps the buffers it
+    started with and a copy of the deletion flags and the overflow, and
+    updates are not written in place while any iteration is running.
+    """
+
+    def __init__(self, items=()) -> None:
+        self._lock = threading.RLock()
+        self._iterating = 0
+        self._reset()
+        self.load(items)
+
+    def _reset(self) -> None:
+        self._names = bytearray()
+        self._name_offsets = array(OFFSET_TYPECODE, [0])
+        self._payloads = bytearray()
+        self._payload_offsets = array(OFFSET_TYPECODE, [0])
+        self._dead = bytearray()  # one flag per packed entry
+        self._dead_count = 0
+        self._sample: list[bytes] = []
+        self._overflow: dict[str, str] = {}
+
+    # ----- packed entries -----
+
+    def _name(self, i: int) -> bytes:
+        return self._names[self._name_offsets[i]:self._name_offsets[i + 1]]
+
+    def _payload(self, i: int) -> str:
+        return self._payloads[self._payload_offsets[i]:self._payload_offsets[i + 1]].decode("ascii")
+
+    def _bisect(self, name: bytes, lo: int = 0) -> int:
+        """Index of the first packed name >= name, at or after lo."""
+        names, offsets = self._names, self._name_offsets
+        # sample[k - 1] <= name < sample[k], so the answer is in that stretch.
+        k = bisect_right(self._sample, name)
+        if not k:
+            return lo
+        lo = max(lo, (k - 1) * SAMPLE_EVERY)
+        hi = max(lo, min(len(self._dead), k * SAMPLE_EVERY))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if names[offsets[mid]:offsets[mid + 1]] < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, account) -> int:
+        """Index of the live packed entry for account, or -1."""
+        if not isinstance(account, str):
+            return -1
+        name = account.encode("utf-8")
+        i = self._bisect(name)
+        if i < len(self._dead) and not self._dead[i] and self._name(i) == name:
+            return i
+        return -1
+
+    def _kill(self, i: int) -> None:
+        self._dead[i] = 1
+        self._dead_count += 1
+
+    # ----- mapping -----
+
+    def __getitem__(self, account: str) -> str:
+        with self._lock:
+            encoded_pw = self._overflow.get(account)
+            if encoded_pw is not None:
+                return encoded_pw
+            i = self._find(account)
+            if i < 0:
+                raise KeyError(account)
+            return self._payload(i)
+
+    def __contains__(self, account) -> bool:
+        with self._lock:
+            return account in self._overflow or self._find(account) >= 0
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        check_account(account)
+        with self._lock:
+            old = self._overflow.get(account)
+            i = -1 if old is not None else self._find(account)
+            if i >= 0:
+                old = self._payload(i)
+                start, end = self._payload_offsets[i], self._payload_offsets[i + 1]
+                if len(encoded_pw) == end - start and not self._iterating:
+                    # Same length (e.g. a new password of the same length): in place.
+                    self._payloads[start:end] = encoded_pw.encode("ascii")
+                    self._notify_set(account, old, encoded_pw)
+                    return
+                self._kill(i)
+            self._overflow[account] = encoded_pw
+            self._notify_set(account, old, encoded_pw)
+            self._maybe_merge()
+
+    def __delitem__(self, account: str) -> None:
+        with self._lock:
+            old = self._overflow.pop(account, None)
+            if old is None:
+                i = self._find(account)
+                if i < 0:
+                    raise KeyError(account)
+                old = self._payload(i)
+                self._kill(i)
+            self._notify_delete(account, old)
+            self._maybe_merge()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._dead) - self._dead_count + len(self._overflow)
+
+    def _iter_items(self):
+        with self._lock:
+            # A merge() meanwhile swaps in new buffers and leaves these
+            # intact, and a deletion only flags the live copy of _dead.
+            names, name_offsets = self._names, self._name_offsets
+            payloads, payload_offsets = self._payloads, self._payload_offsets
+            dead = bytes(self._dead)
+            overflow = sorted(self._overflow.items())
+            self._iterating += 1
+        try:
+            yield from merge_sorted(
+                _packed_items(names, name_offsets, payloads, payload_offsets, dead), overflow)
+        finally:
+            with self._lock:
+                self._iterating -= 1
+
+    def __iter__(self):
+        for account, _ in self._iter_items():
+            yield account
+
+    def items(self) -> ItemsView:
+        return _Items(self)
+
+    def values(self) -> ValuesView:
+        return _Values(self)
+
+    def snapshot(self) -> dict:
+        return dict(self._iter_items())
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._listeners:
+                for account in list(self):
+                    del self[account]
+            self._reset()
+
+    # ----- bulk loading & merging -----
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the packed buffers (the overflow dict not included)."""
+        return (len(self._names) + len(self._payloads) + len(self._dead)
+                + (len(self._name_offsets) + len(self._payload_offsets)) * self._name_offsets.itemsize
+                + sum(map(len, self._sample)))
+
+    def load(self, items) -> None:
+        """
+        Add many (account, encoded) pairs (or a mapping's entries) without
+        notifying listeners: a batch at a time is sorted and merged into the
+        packed buffers. Input that is already sorted, e.g. a compressed
+        container, is appended without copying what is packed.
+        """
+        with self._lock:
+            if self._overflow:
+                self.merge()
+            if hasattr(items, "keys"):
+                mapping = items
+                items = ((account, mapping[account]) for account in sorted(mapping))
+            items = iter(items)
+            batch_size = SORTED_BATCH
+            while True:
+                batch = dict(islice(items, batch_size))
+                if not batch:
+                    break
+                pending = sorted((account.encode("utf-8"), encoded_pw.encode("ascii"))
+                                 for account, encoded_pw in batch.items())
+                del batch
+                if not self._appends(pending):
+                    batch_size = LOAD_BATCH
+                self._rebuild(pending)
+            # The sampled names appended above are the batches' own bytes
+            # objects, which would keep the allocator's arenas of every batch
+            # alive.
+            self._resample()
+
+    def _maybe_merge(self) -> None:
+        threshold = max(MERGE_MIN_ENTRIES, MERGE_RATIO * len(self._dead))
+        if len(self._overflow) > threshold or self._dead_count > threshold:
+            self.merge()
+
+    def merge(self) -> None:
+        """Fold the overflow and the deletions into new packed buffers."""
+        with self._lock:
+            overflow, self._overflow = self._overflow, {}
+            try:
+                self._rebuild(sorted((account.encode("utf-8"), encoded_pw.encode("ascii"))
+                                     for account, encoded_pw in overflow.items()))
+            except BaseException:
+                self._overflow = {**overflow, **self._overflow}
+                raise
+
+    def _appends(self, pending: list[tuple[bytes, bytes]]) -> bool:
+        """Whether pending can go after the packed entries as they are."""
+        count = len(self._dead)
+        return not self._dead_count and (not count or not pending or pending[0][0] > self._name(count - 1))
+
+    def _rebuild(self, pending: list[tuple[bytes, bytes]]) -> None:
+        """
+        Merge sorted (name, payload) pairs into the packed entries, dropping
+        dead ones. A pending name that is already packed replaces it.
+        """
+        count = len(self._dead)
+        if self._appends(pending):
+            self._append(pending)
+            return
+
+        names, payloads = bytearray(), bytearray()
+        name_offsets = array(OFFSET_TYPECODE, [0])
+        payload_offsets = array(OFFSET_TYPECODE, [0])
+        position = 0
+        for name, payload in pending:
+            at = self._bisect(name, position)
+            self._copy_live(position, at, names, name_offsets, payloads, payload_offsets)
+            if at < count and self._name(at) == name:
+                at += 1
+            names += name
+            name_offsets.append(len(names))
+            payloads += payload
+            payload_offsets.append(len(payloads))
+            position = at
+        self._copy_live(position, count, names, name_offsets, payloads, payload_offsets)
+
+        self._names, self._name_offsets = names, name_offsets
+        self._payloads, self._payload_offsets = payloads, payload_offsets
+        self._dead = bytearray(len(name_offsets) - 1)
+        self._dead_count = 0
+        self._resample()
+
+    def _resample(self) -> None:
+        self._sample = [bytes(self._name(i)) for i in range(0, len(self._dead), SAMPLE_EVERY)]
+
+    def _append(self, pending: list[tuple[bytes, bytes]]) -> None:
+        names, name_offsets = self._names, self._name_offsets
+        payloads, payload_offsets = self._payloads, self._payload_offsets
+        sample = self._sample
+        i = len(self._dead)
+        for name, payload in pending:
+            if not i % SAMPLE_EVERY:
+                sample.append(name)
+            names += name
+            name_offsets.append(len(names))
+            payloads += payload
+            payload_offsets.append(len(payloads))
+            i += 1
+        self._dead.extend(bytes(len(pending)))
+
+    def _copy_live(self, start: int, end: int, names, name_offsets, payloads, payload_offsets) -> None:
+        """Copy the live packed entries in [start, end), a run between deletions at a time."""
+        while start < end:
+            stop = self._dead.find(1, start, end)
+            if stop < 0:
+                stop = end
+            if start < stop:
+                for src, src_offsets, dst, dst_offsets in (
+                    (self._names, self._name_offsets, names, name_offsets),
+                    (self._payloads, self._payload_offsets, payloads, payload_offsets),
+                ):
+                    first, last = src_offsets[start], src_offsets[stop]
+                    shift = len(dst) - first
+                    dst += src[first:last]
+                    dst_offsets.extend(map(shift.__add__, src_offsets[start + 1:stop + 1]))
+            start = stop + 1
+
+
+def _packed_items(names, name_offsets, payloads, payload_offsets, dead):
+    for i in range(len(dead)):
+        if not dead[i]:
+            yield (names[name_offsets[i]:name_offsets[i + 1]].decode("utf-8"),
+                   payloads[payload_offsets[i]:payload_offsets[i + 1]].decode("ascii"))
+
+
+class _Items(ItemsView):
+    # Decode the packed entries in one pass instead of a lookup per key.
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _Values(ValuesView):
+    def __iter__(self):
+        for _, encoded_pw in self._mapping._iter_items():
+            yield encoded_pw
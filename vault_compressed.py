@@ -0,0 +1,322 @@
+import os
+import struct
+import sys
+import zlib
+from itertools import islice
+
+from vault_compact import CompactStorage
+from vault_journal import JOURNAL_SUFFIX, ROTATED_SUFFIX, read_snapshot, replay_journal, write_snapshot
+
+# ================== Constants ==================
+
+COMPRESSED_FILE = "app_passwords.pmz"
+
+MAGIC = b"PMVZ"
+VERSION = 1
+
+CODECS = ("zlib", "lzma")
+DEFAULT_CODEC = "zlib"
+# After front coding, level 6 only saves about 2% more than level 1 and
+# takes 2.5 times as long; save() rewrites the whole container.
+ZLIB_LEVEL = 1
+LZMA_PRESET = 6
+
+# Entries per block: enough context for the compressor, while a reader only
+# ever holds one block.
+BLOCK_ENTRIES = 8192
+# Front coding stores the shared prefix length in one byte.
+MAX_SHARED_PREFIX = 255
+
+# magic, version, codec, reserved, entry count, block count
+HEADER = struct.Struct("<4sHBBQI")
+# compressed length, raw length, crc32 of the raw block
+BLOCK_FRAME = struct.Struct("<III")
+# entries, suffix bytes, payload bytes
+BLOCK_HEADER = struct.Struct("<III")
+
+
+# ================== Blocks ==================
+#
+# A block holds a run of entries in account order, stored column by column
+# so that names compress against names and payloads against payloads:
+#
+#     BLOCK_HEADER | shared prefix lengths (1 byte each)
+#                  | name suffixes, "\n"-separated | payloads, "\n"-separated
+#
+# Each name is front-coded against the previous one in the block, so
+# "Aws-Prod-Svc-0000042" after "Aws-Prod-Svc-0000041" costs one byte of
+# suffix. Every block starts afresh and can be decoded on its own.
+
+def _shared_prefix(a: str, b: str) -> int:
+    # Binary search with slice comparisons, which run in C.
+    lo, hi = 0, min(len(a), len(b), MAX_SHARED_PREFIX)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def encode_block(entries: list[tuple[str, str]]) -> bytes:
+    prefixes = bytearray()
+    suffixes = []
+    payloads = []
+    previous = ""
+    shared = 0
+    for account, encoded_pw in entries:
+        # Neighbouring names tend to share about as much as the previous
+        # pair did: check that much at once and extend it a character at a
+        # time, falling back to the binary search when it does not hold.
+        limit = min(len(previous), len(account), MAX_SHARED_PREFIX)
+        if shared <= limit and previous[:shared] == account[:shared]:
+            while shared < limit and previous[shared] == account[shared]:
+                shared += 1
+        else:
+            shared = _shared_prefix(previous, account)
+        prefixes.append(shared)
+        suffixes.append(account[shared:])
+        payloads.append(encoded_pw)
+        previous = account
+    names = "\n".join(suffixes).encode("utf-8")
+    payloads = "\n".join(payloads).encode("ascii")
+    return b"".join((BLOCK_HEADER.pack(len(entries), len(names), len(payloads)),
+                     prefixes, names, payloads))
+
+
+def decode_block(raw: bytes) -> list[tuple[str, str]]:
+    count, names_len, payloads_len = BLOCK_HEADER.unpack_from(raw, 0)
+    start = BLOCK_HEADER.size
+    prefixes = raw[start:start + count]
+    start += count
+    suffixes = raw[start:start + names_len].decode("utf-8").split("\n")
+    start += names_len
+    payloads = raw[start:start + payloads_len].decode("ascii").split("\n")
+
+    names = []
+    previous = ""
+    for shared, suffix in zip(prefixes, suffixes):
+        previous = previous[:shared] + suffix
+        names.append(previous)
+    return list(zip(names, payloads))
+
+
+# lzma is imported only when used: Python can be built without it.
+
+def _compress(raw: bytes, codec: str) -> bytes:
+    if codec == "lzma":
+        import lzma
+        return lzma.compress(raw, preset=LZMA_PRESET)
+    return zlib.compress(raw, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "lzma":
+        import lzma
+        return lzma.decompress(data)
+    return zlib.decompress(data)
+
+
+# ================== Container ==================
+
+def write_compressed_entries(entries, path: str = COMPRESSED_FILE, codec: str = DEFAULT_CODEC) -> int:
+    """
+    Atomically write (account, encoded) pairs, in account order, as a
+    compressed container:
+
+        HEADER | (BLOCK_FRAME | compressed block) ...
+
+    entries is consumed a block at a time. Returns the size of the file in bytes.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}'.")
+    entries = iter(entries)
+    count = blocks = 0
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, CODECS.index(codec), 0, 0, 0))
+        while True:
+            block = list(islice(entries, BLOCK_ENTRIES))
+            if not block:
+                break
+            raw = encode_block(block)
+            data = _compress(raw, codec)
+            f.write(BLOCK_FRAME.pack(len(data), len(raw), zlib.crc32(raw)))
+            f.write(data)
+            count += len(block)
+            blocks += 1
+        size = f.tell()
+        # The counts are only known at the end.
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, CODECS.index(codec), 0, count, blocks))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return size
+
+
+def write_compressed_vault(storage, path: str = COMPRESSED_FILE, codec: str = DEFAULT_CODEC) -> int:
+    """Atomically write a mapping as a compressed container. Returns its size."""
+    return write_compressed_entries(((account, storage[account]) for account in sorted(storage)),
+                                    path, codec)
+
+
+def read_header(f) -> tuple[str, int, int]:
+    """(codec, entry count, block count) of the container open as f."""
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{f.name} is not a compressed vault.")
+    magic, version, codec, _, count, blocks = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{f.name} is not a compressed vault.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported compressed vault version {version}.")
+    if codec >= len(CODECS):
+        raise ValueError(f"Unknown codec {codec} in {f.name}.")
+    return CODECS[codec], count, blocks
+
+
+def iter_blocks(path: str):
+    """
+    Yield the entries of the container one block at a time. Only one
+    compressed and one decompressed block are in memory at any point.
+    """
+    with open(path, "rb") as f:
+        codec, count, blocks = read_header(f)
+        seen = 0
+        for _ in range(blocks):
+            frame = f.read(BLOCK_FRAME.size)
+            if len(frame) < BLOCK_FRAME.size:
+                break
+            compressed_len, raw_len, crc = BLOCK_FRAME.unpack(frame)
+            data = f.read(compressed_len)
+            if len(data) < compressed_len:
+                break
+            raw = _decompress(data, codec)
+            if len(raw) != raw_len or zlib.crc32(raw) != crc:
+                raise ValueError(f"Corrupt block in {path}.")
+            entries = decode_block(raw)
+            seen += len(entries)
+            yield entries
+        if seen != count:
+            raise ValueError(f"{path} is truncated: {seen} of {count} entries.")
+
+
+def read_compressed_vault(path: str, storage: dict) -> None:
+    """Fill storage with the entries of a compressed container."""
+    for entries in iter_blocks(path):
+        storage.update(entries)
+
+
+# ================== Compressed storage ==================
+
+class CompressedStorage(CompactStorage):
+    """
+    Accounts kept in a compressed container (app_passwords.pmz), and in
+    memory in the packed form of CompactStorage.
+
+    Loading streams the file block by block into the packed buffers; the
+    blocks are already sorted, so they are appended as they come. Changes
+    stay in memory until save() rewrites the container, which it skips when
+    nothing changed. Unlike the journaled text vault there is no journal and
+    no cross-process locking: this backend is meant for large vaults with a
+    single writer, where memory, disk space and load time matter most.
+    """
+
+    def __init__(self, path: str = COMPRESSED_FILE, codec: str | None = None) -> None:
+        super().__init__()
+        self.path = path
+        self.codec = codec or DEFAULT_CODEC
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                file_codec, _, _ = read_header(f)
+            self.codec = codec or file_codec
+            self.load(entry for entries in iter_blocks(path) for entry in entries)
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        super().__setitem__(account, encoded_pw)
+        self._dirty = True
+
+    def __delitem__(self, account: str) -> None:
+        super().__delitem__(account)
+        self._dirty = True
+
+    def clear(self) -> None:
+        super().clear()
+        self._dirty = True
+
+    def save(self) -> bool:
+        """Rewrite the container if anything changed. Returns whether it did."""
+        if not self._dirty:
+            return False
+        # Cleared first: a change made while writing marks it dirty again.
+        # items() streams the entries as of its first step, so such a change
+        # is left for the next save instead of tearing this one.
+        self._dirty = False
+        try:
+            write_compressed_entries(self.items(), self.path, self.codec)
+        except BaseException:
+            self._dirty = True
+            raise
+        return True
+
+
+# ================== Conversion ==================
+
+def text_to_compressed(text_path: str, path: str = COMPRESSED_FILE, codec: str = DEFAULT_CODEC) -> int:
+    """Convert a text vault (and its journals) to a compressed container."""
+    storage = {}
+    read_snapshot(text_path, storage)
+    replay_journal(text_path + ROTATED_SUFFIX, storage)
+    replay_journal(text_path + JOURNAL_SUFFIX, storage)
+    write_compressed_vault(storage, path, codec)
+    return len(storage)
+
+
+def compressed_to_text(path: str, text_path: str) -> int:
+    """Convert a compressed container back to the "account:encoded" text format."""
+    storage = {}
+    read_compressed_vault(path, storage)
+    write_snapshot(text_path, storage)
+    # Journals left next to the text file would be replayed on top of it.
+    for suffix in (ROTATED_SUFFIX, JOURNAL_SUFFIX):
+        if os.path.exists(text_path + suffix):
+            os.remove(text_path + suffix)
+    return len(storage)
+
+
+def main(argv: list[str]) -> int:
+    usage = (
+        "usage: python vault_compressed.py to-compressed <text file> <vault file> [zlib|lzma]\n"
+        "       python vault_compressed.py to-text <vault file> <text file>\n"
+        "       python vault_compressed.py info <vault file>"
+    )
+    if len(argv) < 2:
+        print(usage)
+        return 2
+
+    command, args = argv[0], argv[1:]
+    if command == "to-compressed" and len(args) in (2, 3) and (len(args) == 2 or args[2] in CODECS):
+        count = text_to_compressed(*args)
+        print(f"Converted {count} accounts ({os.path.getsize(args[1]):,} bytes).")
+    elif command == "to-text" and len(args) == 2:
+        print(f"Converted {compressed_to_text(*args)} accounts.")
+    elif command == "info" and len(args) == 1:
+        with open(args[0], "rb") as f:
+            codec, count, blocks = read_header(f)
+        raw = sum(len(account) + len(encoded) + 2 for entries in iter_blocks(args[0])
+                  for account, encoded in entries)
+        size = os.path.getsize(args[0])
+        print(f"{count} accounts in {blocks} {codec} blocks: {size:,} bytes, "
+              f"{raw:,} as text ({raw / max(size, 1):.1f}x)")
+    else:
+        print(usage)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
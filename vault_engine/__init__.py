@@ -0,0 +1,43 @@
+"""
+Vault engine shared by the command-line and Streamlit front-ends.
+
+Importing it has no side effects: no files are opened until a function is
+called.
+"""
+from vault_engine.core import (
+    PASSWORDS_FILE,
+    SYMBOLS,
+    VAULT_ENV,
+    ConflictError,
+    compare_and_set,
+    decode_password,
+    encode_password,
+    evaluate_password,
+    load_passwords,
+    password_generator,
+    save_passwords,
+    vault_path,
+)
+from vault_engine.handle import get_vault, release_vaults
+
+# Budget for `import vault_engine` in a fresh interpreter, checked by
+# benchmarks/bench_engine.py.
+IMPORT_BUDGET_MS = 10.0
+
+__all__ = [
+    "IMPORT_BUDGET_MS",
+    "PASSWORDS_FILE",
+    "SYMBOLS",
+    "VAULT_ENV",
+    "ConflictError",
+    "compare_and_set",
+    "decode_password",
+    "encode_password",
+    "evaluate_password",
+    "get_vault",
+    "load_passwords",
+    "password_generator",
+    "release_vaults",
+    "save_passwords",
+    "vault_path",
+]
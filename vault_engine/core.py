@@ -0,0 +1,135 @@
+import binascii
+import os
+from itertools import islice
+
+from vault_events import ConflictError
+from vault_metrics import timed
+
+# Only builtin modules are imported here (binascii rather than base64, which
+# pulls in re). Storage and the breach corpus are imported on first use, so
+# importing the engine stays within IMPORT_BUDGET_MS (see
+# benchmarks/bench_engine.py).
+
+PASSWORDS_FILE = "app_passwords.txt"
+# Set to e.g. app_passwords.db to keep the vault in SQLite instead.
+VAULT_ENV = "PM_VAULT"
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+COMPRESSED_SUFFIXES = (".pmz",)
+BINARY_SUFFIXES = (".vault",)
+SHARDED_SUFFIXES = (".d",)
+SYMBOLS = "!@#$%^&*()-_=+[]{};:,.<>/"
+
+
+# ================== Encoding ==================
+
+def encode_password(password: str) -> str:
+    """Base64-encode a password the way it is stored in the vault."""
+    return binascii.b2a_base64(password.encode(), newline=False).decode()
+
+
+def decode_password(encoded_pw: str) -> str:
+    return binascii.a2b_base64(encoded_pw.encode()).decode()
+
+
+# ================== Storage ==================
+
+def vault_path(path: str | None = None) -> str:
+    """path, else $PM_VAULT, else app_passwords.txt."""
+    if path is None:
+        path = os.environ.get(VAULT_ENV) or PASSWORDS_FILE
+    return path
+
+
+@timed("load_passwords")
+def load_passwords(path: str | None = None):
+    """
+    Open the vault at path: a SQLite database for .db/.sqlite files, a
+    compressed container for .pmz files, an mmap-backed binary vault for
+    .vault files, a directory of shards for .d paths, otherwise the
+    journaled text file (snapshot + journal).
+    """
+    path = vault_path(path)
+    if path.endswith(SQLITE_SUFFIXES):
+        from vault_sqlite import SqliteStorage
+        return SqliteStorage(path)
+    if path.endswith(COMPRESSED_SUFFIXES):
+        from vault_compressed import CompressedStorage
+        return CompressedStorage(path)
+    if path.endswith(BINARY_SUFFIXES):
+        from vault_binary import BinaryStorage
+        return BinaryStorage(path)
+    if path.rstrip(os.sep).endswith(SHARDED_SUFFIXES):
+        from vault_sharded import ShardedStorage
+        return ShardedStorage(path)
+    from vault_journal import load_vault
+    return load_vault(path)
+
+
+@timed("save_passwords")
+def save_passwords(storage, path: str | None = None) -> None:
+    """Make every change durable (journal flush, SQLite checkpoint, or container rewrite)."""
+    from vault_journal import save_vault
+    save_vault(storage, vault_path(path))
+
+
+def compare_and_set(storage, account: str, expected: str | None,
+                    encoded_pw: str | None) -> None:
+    """
+    Set account to encoded_pw (delete it for None) only if it still holds
+    expected, the value the caller showed the user. Raises ConflictError if
+    another session changed it. The journaled vault checks this under its
+    cross-process lock; other backends only within this process.
+    """
+    atomic = getattr(storage, "compare_and_set", None)
+    if atomic is not None:
+        atomic(account, expected, encoded_pw)
+        return
+    if storage.get(account) != expected:
+        raise ConflictError(account)
+    if encoded_pw is not None:
+        storage[account] = encoded_pw
+    elif expected is not None:
+        del storage[account]
+
+
+# ================== Evaluation ==================
+
+@timed("evaluate_password")
+def evaluate_password(pw: str) -> dict:
+    """
+    Evaluate password and return details + strength.
+    The character-class flags are informational; strength comes from the
+    guess estimate in strength_estimator, which also adds score,
+    guesses_log10, entropy_bits, patterns and feedback.
+    """
+    from breach_check import is_breached
+    from strength_estimator import estimate_strength
+
+    result = {
+        "length_ok": len(pw) >= 8,
+        "has_upper": any(char.isupper() for char in pw),
+        "has_lower": any(char.islower() for char in pw),
+        "has_digit": any(char.isdigit() for char in pw),
+        "has_symbol": any(char in SYMBOLS for char in pw),
+        "breached": is_breached(pw),
+    }
+    result.update(estimate_strength(pw))
+    return result
+
+
+# ================== Generation ==================
+
+def password_generator(length: int, preference: list[str]) -> tuple[str, str]:
+    """
+    Generate a password of given length from the OS CSPRNG.
+    preference = [upper?, digits?, symbols?] with values "yes"/"no".
+    Lowercase letters are always used, and every selected character class
+    appears at least once (as far as the length allows).
+    """
+    from password_batch import iter_passwords
+
+    if length < 1:
+        password = ""
+    else:
+        password = next(islice(iter_passwords(length, preference), 1))
+    return password, evaluate_password(password)["strength"]
@@ -0,0 +1,44 @@
+import _thread
+import os
+
+from vault_engine.core import load_passwords, vault_path
+
+# ================== Process-wide vault handle ==================
+#
+# Streamlit re-runs the app script for every interaction and every browser
+# session, but imported modules live for the whole server process. Keeping
+# the loaded vault here means it is read from disk once per process instead
+# of once per session, and all sessions edit the same in-memory vault.
+
+_vaults = {}
+# _thread rather than threading, which would add several ms to the import.
+_vaults_lock = _thread.allocate_lock()
+
+
+def get_vault(path: str | None = None):
+    """Return the shared vault for path, loading it on first use."""
+    path = vault_path(path)
+    key = os.path.abspath(path)
+    vault = _vaults.get(key)
+    if vault is None:
+        with _vaults_lock:
+            vault = _vaults.get(key)
+            if vault is None:
+                vault = load_passwords(path)
+                # Long-lived handles follow changes other processes (e.g.
+                # the CLI) make to a journaled vault.
+                watch = getattr(vault, "watch", None)
+                if watch is not None:
+                    watch()
+                _vaults[key] = vault
+    return vault
+
+
+def release_vaults() -> None:
+    """Close and forget every shared vault (the next get_vault reloads)."""
+    with _vaults_lock:
+        for vault in _vaults.values():
+            close = getattr(vault, "close", None)
+            if close is not None:
+                close()
+        _vaults.clear()
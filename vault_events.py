@@ -0,0 +1,95 @@
+# ================== Storage change notifications ==================
+#
+# Indexes and caches that sit next to the accounts dictionary subscribe to it
+# and are told about every change, instead of rebuilding from a full scan.
+# A listener implements:
+#
+#     on_set(account, old_encoded_or_None, new_encoded)
+#     on_delete(account, old_encoded)
+
+
+class ConflictError(Exception):
+    """The account was changed by another session since the caller read it."""
+
+    def __init__(self, account: str) -> None:
+        super().__init__(f"{account} was changed by another session.")
+        self.account = account
+
+
+def check_account(account: str) -> None:
+    """
+    Refuse account names that would break the line-based vault formats:
+    every file stores one entry or journal record per line.
+    """
+    if "\n" in account or "\r" in account:
+        raise ValueError(f"Account names cannot contain line breaks: {account!r}")
+
+
+class StorageEvents:
+    """Mixin that lets listeners subscribe to a storage mapping's changes."""
+
+    # A tuple so that notifying with no listeners costs next to nothing.
+    _listeners = ()
+
+    def subscribe(self, listener) -> None:
+        self._listeners = (*self._listeners, listener)
+
+    def unsubscribe(self, listener) -> None:
+        self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    def _notify_set(self, account: str, old: str | None, new: str) -> None:
+        for listener in self._listeners:
+            listener.on_set(account, old, new)
+
+    def _notify_delete(self, account: str, old: str) -> None:
+        for listener in self._listeners:
+            listener.on_delete(account, old)
+
+
+class ObservableStorage(StorageEvents, dict):
+    """Accounts dictionary that notifies its listeners of every change."""
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        check_account(account)
+        old = dict.get(self, account)
+        dict.__setitem__(self, account, encoded_pw)
+        self._notify_set(account, old, encoded_pw)
+
+    def __delitem__(self, account: str) -> None:
+        old = dict.pop(self, account)
+        self._notify_delete(account, old)
+
+    # Route the other mutators through __setitem__/__delitem__.
+
+    def pop(self, account, *default):
+        if account not in self:
+            return dict.pop(self, account, *default)
+        value = self[account]
+        del self[account]
+        return value
+
+    def setdefault(self, account, default=None):
+        if account not in self:
+            self[account] = default
+        return self[account]
+
+    def update(self, *args, **kwargs) -> None:
+        for account, encoded_pw in dict(*args, **kwargs).items():
+            self[account] = encoded_pw
+
+    def set_many(self, items) -> None:
+        """Set a batch of (account, encoded) pairs; backends may write them at once."""
+        for account, encoded_pw in items:
+            self[account] = encoded_pw
+
+    def clear(self) -> None:
+        for account in list(self):
+            del self[account]
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        account = next(reversed(self))
+        value = self[account]
+        del self[account]
+        return account, value
@@ -0,0 +1,481 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: the locks below then only cover this process.
+    fcntl = None
+
+from vault_events import ConflictError, ObservableStorage, check_account
+
+# ================== Constants ==================
+
+PASSWORDS_FILE = "app_passwords.txt"
+JOURNAL_SUFFIX = ".journal"
+ROTATED_SUFFIX = ".journal.old"
+LOCK_SUFFIX = ".lock"
+COMPACT_LOCK_SUFFIX = ".compact.lock"
+
+# Fold the journal into a new snapshot once it grows past this many bytes.
+COMPACT_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+SET_OP = "+"
+DELETE_OP = "-"
+
+
+# ================== Snapshot & journal files ==================
+
+def read_snapshot(path: str, storage: dict) -> None:
+    """Fill storage with the "account:encoded" lines of a snapshot file."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if ":" in line:
+                # Base64 never contains ":", so the last one splits the entry.
+                account, encoded_pw = line.rstrip("\n").rsplit(":", 1)
+                storage[account] = encoded_pw
+
+
+def write_snapshot(path: str, storage: dict) -> None:
+    """Atomically replace the snapshot file with the given entries."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(f"{account}:{encoded_pw}\n" for account, encoded_pw in storage.items())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def apply_records(lines, on_set, on_delete) -> int:
+    """
+    Call on_set(account, encoded) or on_delete(account) for every complete
+    journal record in lines. Returns the number applied. A torn last line
+    is ignored, and so is a record that cannot be parsed, so one bad line
+    never makes the whole vault unreadable.
+    """
+    replayed = 0
+    for line in lines:
+        if not line.endswith("\n"):
+            break
+        op, body = line[0], line[1:-1]
+        if "\r" in body:
+            continue  # written before names with line breaks were refused
+        if op == SET_OP:
+            if ":" not in body:
+                continue
+            account, encoded_pw = body.rsplit(":", 1)
+            on_set(account, encoded_pw)
+        elif op == DELETE_OP:
+            on_delete(body)
+        else:
+            continue
+        replayed += 1
+    return replayed
+
+
+def replay_journal(path: str, storage: dict) -> int:
+    """
+    Apply every complete journal record to storage.
+    Returns the number of records replayed. A torn last line is ignored.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        return apply_records(f, storage.__setitem__, lambda account: storage.pop(account, None))
+
+
+def read_new_records(fd: int, offset: int) -> tuple[list[str], int]:
+    """
+    Complete records in the journal open as fd past offset.
+    Returns (lines, bytes consumed); a record that is still being written
+    by another process is left for the next call.
+    """
+    chunks = []
+    position = offset
+    while True:
+        chunk = os.pread(fd, 1 << 20, position)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        position += len(chunk)
+    data = b"".join(chunks)
+    end = data.rfind(b"\n") + 1
+    # Split on "\n" only, as reading the file does: str.splitlines() would
+    # also break records at characters such as "\x0c" or "\u2028".
+    lines = data[:end].decode("utf-8").split("\n")[:-1]
+    return [line + "\n" for line in lines], end
+
+
+# ================== Cross-process locking ==================
+
+def _try_flock(lock_file, blocking: bool = True) -> bool:
+    if fcntl is None:
+        return True
+    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+    try:
+        fcntl.flock(lock_file.fileno(), flags)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unflock(lock_file) -> None:
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _inode(path: str) -> int | None:
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _file_id(path: str) -> tuple | None:
+    """Identity of a file that is replaced, never modified, e.g. the snapshot."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # An inode number can be reused once the old file is gone; the mtime tells them apart.
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def _flocked(lock_file):
+    _try_flock(lock_file)
+    try:
+        yield
+    finally:
+        _unflock(lock_file)
+
+
+# ================== Journaled storage ==================
+
+class JournaledStorage(ObservableStorage):
+    """
+    Accounts dictionary whose every change is appended to a journal file.
+
+    The snapshot (app_passwords.txt) keeps the usual "account:encoded" format.
+    Sets and deletes are appended to "<snapshot>.journal" as one record each,
+    so a mutation costs O(1) I/O instead of a full rewrite. Once the journal
+    passes compact_threshold bytes it is rotated and folded into a new
+    snapshot on a background thread.
+
+    Several processes may open the same vault. A writer holds an flock on
+    "<snapshot>.lock" just long enough to apply what other processes
+    appended since it last looked and to append its own change, so nobody
+    overwrites anybody else's updates; compare_and_set() adds an optimistic
+    check for read-modify-write edits. Reads come from the in-memory
+    dictionary and never wait for writers. refresh(), or the watch() poller,
+    picks up other processes' changes and tells the listeners.
+    """
+
+    def __init__(self, path: str = PASSWORDS_FILE,
+                 compact_threshold: int = COMPACT_THRESHOLD_BYTES) -> None:
+        super().__init__()
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.rotated_path = path + ROTATED_SUFFIX
+        self.compact_threshold = compact_threshold
+        # Re-entrant: mutations hold it across the dict change and the journal
+        # append, so threads sharing one vault journal changes in dict order.
+        self._lock = threading.RLock()
+        self._lock_file = open(path + LOCK_SUFFIX, "a")
+        self._compact_lock_file = open(path + COMPACT_LOCK_SUFFIX, "a")
+        self._compactor = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._fd = None
+
+        self._reload(notify=False)
+        if os.path.exists(self.rotated_path):
+            self._recover()
+
+    # ----- loading & refreshing -----
+
+    def _open_journal(self) -> int:
+        return os.open(self.journal_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _reload(self, notify: bool = True) -> None:
+        """
+        Rebuild the dictionary from the snapshot, the rotated journal and
+        the journal.
+
+        No lock is taken; a compaction in another process can run at the
+        same time. The journal is opened first: if it is rotated meanwhile,
+        the new snapshot holds all of its records, and replaying records onto
+        a state that already includes them changes nothing. If the snapshot
+        or the journal was replaced while they were read, it starts over.
+        """
+        while True:
+            fd = self._open_journal()
+            snapshot_id = _file_id(self.path)
+            # A plain dict, so the replay itself is not journaled again.
+            entries = {}
+            read_snapshot(self.path, entries)
+            replay_journal(self.rotated_path, entries)
+            lines, offset = read_new_records(fd, 0)
+            apply_records(lines, entries.__setitem__, lambda account: entries.pop(account, None))
+            inode = os.fstat(fd).st_ino
+            if _inode(self.journal_path) == inode and _file_id(self.path) == snapshot_id:
+                break
+            os.close(fd)
+
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd, self._inode, self._offset = fd, inode, offset
+
+        old = dict.copy(self) if notify and self._listeners else {}
+        dict.clear(self)
+        dict.update(self, entries)
+        if old:
+            for account, encoded_pw in entries.items():
+                if old.get(account) != encoded_pw:
+                    self._notify_set(account, old.get(account), encoded_pw)
+            for account, encoded_pw in old.items():
+                if account not in entries:
+                    self._notify_delete(account, encoded_pw)
+
+    def refresh(self) -> bool:
+        """
+        Apply the changes other processes made since the last call. Costs a
+        single stat() when there are none. Returns whether anything changed.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.journal_path)
+            except FileNotFoundError:
+                return False  # mid-rotation; the next call sees the new journal
+            if stat.st_ino != self._inode:
+                # Another process compacted: start again from its snapshot.
+                self._reload()
+                return True
+            if stat.st_size == self._offset:
+                return False
+            lines, consumed = read_new_records(self._fd, self._offset)
+            self._offset += consumed
+            return apply_records(lines, self._apply_set, self._apply_delete) > 0
+
+    def _apply_set(self, account: str, encoded_pw: str) -> None:
+        ObservableStorage.__setitem__(self, account, encoded_pw)
+
+    def _apply_delete(self, account: str) -> None:
+        if dict.__contains__(self, account):
+            ObservableStorage.__delitem__(self, account)
+
+    def watch(self, interval: float = 1.0) -> None:
+        """Refresh every interval seconds on a daemon thread until close()."""
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name="vault-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop_watching.wait(interval):
+            self.refresh()
+
+    def snapshot(self) -> dict:
+        """A consistent copy of the vault as of the last applied change."""
+        with self._lock:
+            return dict.copy(self)
+
+    # ----- dict mutations -----
+    # pop/update/clear are routed through these two by ObservableStorage.
+
+    @contextmanager
+    def _commit(self):
+        """Take both locks and catch up with other writers before appending."""
+        with self._lock, _flocked(self._lock_file):
+            self.refresh()
+            yield
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        with self._commit():
+            ObservableStorage.__setitem__(self, account, encoded_pw)
+            self._append(f"{SET_OP}{account}:{encoded_pw}\n")
+
+    def __delitem__(self, account: str) -> None:
+        with self._commit():
+            ObservableStorage.__delitem__(self, account)
+            self._append(f"{DELETE_OP}{account}\n")
+
+    def set_many(self, items) -> None:
+        """Set a batch of entries with a single journal write."""
+        items = list(items)
+        # Checked up front: a bad name halfway would leave the entries
+        # before it set but not journaled.
+        for account, _ in items:
+            check_account(account)
+        records = []
+        with self._commit():
+            for account, encoded_pw in items:
+                ObservableStorage.__setitem__(self, account, encoded_pw)
+                records.append(f"{SET_OP}{account}:{encoded_pw}\n")
+            if records:
+                self._append("".join(records))
+
+    def compare_and_set(self, account: str, expected: str | None,
+                        encoded_pw: str | None) -> None:
+        """
+        Set account to encoded_pw (or delete it, for None) only if its value
+        is still expected (None meaning absent), counting changes committed
+        by other processes. Raises ConflictError otherwise.
+        """
+        with self._commit():
+            if dict.get(self, account) != expected:
+                raise ConflictError(account)
+            if encoded_pw is not None:
+                ObservableStorage.__setitem__(self, account, encoded_pw)
+                self._append(f"{SET_OP}{account}:{encoded_pw}\n")
+            elif expected is not None:
+                ObservableStorage.__delitem__(self, account)
+                self._append(f"{DELETE_OP}{account}\n")
+
+    # ----- journal -----
+
+    def _append(self, record: str) -> None:
+        # Only called inside _commit(): every complete record has been read,
+        # so the journal ends at _offset unless a writer crashed halfway
+        # through a record. That torn tail is cut off; otherwise O_APPEND
+        # would glue this record onto it.
+        if os.fstat(self._fd).st_size > self._offset:
+            os.ftruncate(self._fd, self._offset)
+        data = memoryview(record.encode("utf-8"))
+        self._offset += len(data)
+        while data:
+            data = data[os.write(self._fd, data):]
+
+    @property
+    def journal_size(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        """Force the journal to stable storage."""
+        with self._lock:
+            os.fsync(self._fd)
+
+    def _start_new_journal(self) -> None:
+        """Switch to a new, empty journal file (other processes reload)."""
+        os.close(self._fd)
+        self._fd = self._open_journal()
+        self._inode = os.fstat(self._fd).st_ino
+        self._offset = 0
+
+    def _fold_rotated(self) -> None:
+        """
+        Write everything into the snapshot and drop both journals. Used for
+        a rotated journal left behind by a compaction that never finished.
+        Needs both locks.
+        """
+        write_snapshot(self.path, dict.copy(self))
+        # The rotated journal goes first: a reload must never replay it on
+        # top of the new snapshot without the journal that followed it.
+        os.remove(self.rotated_path)
+        with open(self.journal_path + ".tmp", "w"):
+            pass
+        os.replace(self.journal_path + ".tmp", self.journal_path)
+        self._start_new_journal()
+
+    def _recover(self) -> None:
+        """Finish a compaction that was interrupted before the last run ended."""
+        # A compaction running in another process holds the compact lock.
+        if not _try_flock(self._compact_lock_file, blocking=False):
+            return
+        try:
+            with self._commit():
+                if os.path.exists(self.rotated_path):
+                    self._fold_rotated()
+        finally:
+            _unflock(self._compact_lock_file)
+
+    # ----- compaction -----
+
+    def compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def maybe_compact(self) -> bool:
+        """Start a background compaction if the journal passed the threshold."""
+        if self._offset < self.compact_threshold:
+            return False
+        return self.compact()
+
+    def compact(self, wait: bool = False) -> bool:
+        """
+        Rotate the journal and write a fresh snapshot in the background.
+        Returns False if a compaction is already running in any process.
+        """
+        with self._lock:
+            if self.compacting() or not _try_flock(self._compact_lock_file, blocking=False):
+                return False
+            try:
+                with self._commit():
+                    if os.path.exists(self.rotated_path):
+                        self._fold_rotated()
+                        _unflock(self._compact_lock_file)
+                        return True
+
+                    # Freeze the current state and start an empty journal, so
+                    # new mutations keep appending while the snapshot is written.
+                    frozen = dict.copy(self)
+                    os.fsync(self._fd)
+                    os.replace(self.journal_path, self.rotated_path)
+                    self._start_new_journal()
+            except BaseException:
+                _unflock(self._compact_lock_file)
+                raise
+
+            # Non-daemon, so the interpreter waits for it before exiting.
+            # It holds the compact lock until the snapshot is in place.
+            self._compactor = threading.Thread(
+                target=self._write_compacted, args=(frozen,), name="vault-compactor"
+            )
+            self._compactor.start()
+
+        if wait:
+            self._compactor.join()
+        return True
+
+    def _write_compacted(self, frozen: dict) -> None:
+        try:
+            write_snapshot(self.path, frozen)
+            os.remove(self.rotated_path)
+        finally:
+            _unflock(self._compact_lock_file)
+
+    def close(self) -> None:
+        self._stop_watching.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+                self._lock_file.close()
+                self._compact_lock_file.close()
+
+
+def load_vault(path: str = PASSWORDS_FILE) -> JournaledStorage:
+    """Open the journaled vault stored at path."""
+    return JournaledStorage(path)
+
+
+def save_vault(storage: dict, path: str = PASSWORDS_FILE) -> None:
+    """
+    Persist storage. A JournaledStorage has already appended every change,
+    so it only needs a flush and, past the threshold, a compaction. Other
+    backends with their own save() (e.g. ShardedStorage) write themselves.
+    """
+    if isinstance(storage, JournaledStorage):
+        storage.flush()
+        storage.maybe_compact()
+    elif hasattr(storage, "save"):
+        storage.save()
+    else:
+        write_snapshot(path, storage)
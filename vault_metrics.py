@@ -0,0 +1,318 @@
+import _thread
+import atexit
+import os
+import time
+from bisect import bisect_left
+
+# Only builtin modules are imported at module level: the vault engine imports
+# this, and `import vault_engine` has a time budget. cProfile, tracemalloc
+# and json are imported when they are used.
+
+# ================== Constants ==================
+
+# Path of a metrics export written at exit (.json for a JSON snapshot,
+# anything else for the Prometheus text format). Setting it turns
+# collection on.
+METRICS_ENV = "PM_METRICS"
+PROFILE_PREFIX = "pm_profile"
+METRIC_PREFIX = "pm"
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+PROFILE_FRAMES = 25
+PROFILE_TOP = 40
+
+
+# ================== Registry ==================
+
+class Histogram:
+    """Counts of durations per bucket, plus their sum and maximum."""
+
+    __slots__ = ("buckets", "count", "sum", "max", "errors")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(bound, self.max)
+        return self.max
+
+
+_enabled = False
+_lock = _thread.allocate_lock()
+_histograms: dict[str, Histogram] = {}
+_counters: dict[str, int] = {}
+_export_paths: list[str] = []
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(export_path: str | None = None) -> None:
+    """Start collecting; with export_path, also write the metrics there at exit."""
+    global _enabled
+    _enabled = True
+    if export_path and export_path not in _export_paths:
+        if not _export_paths:
+            atexit.register(_export_at_exit)
+        _export_paths.append(export_path)
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(name: str, seconds: float, error: bool = False) -> None:
+    """Record one duration of the operation name."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+        histogram.errors += error
+
+
+def count(name: str, amount: int = 1) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+# ================== Instrumentation ==================
+#
+# When collection is off, a wrapped call costs one global check; no clock is
+# read and nothing is recorded.
+
+def timed(name: str):
+    """Decorator recording each call's duration (and whether it raised) under name."""
+    def decorate(fn):
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                observe(name, time.perf_counter() - start, error=True)
+                raise
+            observe(name, time.perf_counter() - start)
+            return result
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = fn.__qualname__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return decorate
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        observe(self.name, time.perf_counter() - self.start, error=exc_type is not None)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """Context manager timing a block, e.g. `with timer("menu.generate"):`."""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+# ================== Export ==================
+
+def snapshot() -> dict:
+    """JSON-able copy of every histogram and counter."""
+    with _lock:
+        operations = {
+            name: {
+                "count": h.count,
+                "errors": h.errors,
+                "sum_seconds": h.sum,
+                "mean_ms": h.sum / h.count * 1000 if h.count else 0.0,
+                "p50_ms": h.quantile(0.5) * 1000,
+                "p99_ms": h.quantile(0.99) * 1000,
+                "max_ms": h.max * 1000,
+                "buckets": {("+Inf" if bound == float("inf") else repr(bound)): n
+                            for bound, n in zip(BUCKETS, h.buckets)},
+            }
+            for name, h in sorted(_histograms.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"operations": operations, "counters": counters}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    """The metrics in the Prometheus text exposition format."""
+    family = f"{METRIC_PREFIX}_operation_duration_seconds"
+    lines = [
+        f"# HELP {family} Duration of password manager operations.",
+        f"# TYPE {family} histogram",
+    ]
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    for name, h in histograms:
+        op = _label(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h.buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{family}_bucket{{op="{op}",le="{le}"}} {cumulative}')
+        lines.append(f'{family}_sum{{op="{op}"}} {h.sum!r}')
+        lines.append(f'{family}_count{{op="{op}"}} {h.count}')
+
+    errors = f"{METRIC_PREFIX}_operation_errors_total"
+    lines.append(f"# HELP {errors} Operations that raised an exception.")
+    lines.append(f"# TYPE {errors} counter")
+    for name, h in histograms:
+        lines.append(f'{errors}{{op="{_label(name)}"}} {h.errors}')
+
+    if counters:
+        events = f"{METRIC_PREFIX}_events_total"
+        lines.append(f"# HELP {events} Counted events.")
+        lines.append(f"# TYPE {events} counter")
+        for name, value in counters:
+            lines.append(f'{events}{{event="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path: str) -> None:
+    """Write a JSON snapshot (.json) or a Prometheus text file (anything else)."""
+    if path.endswith(".json"):
+        import json
+        text = json.dumps(snapshot(), indent=2) + "\n"
+    else:
+        text = prometheus_text()
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+def _export_at_exit() -> None:
+    for path in _export_paths:
+        try:
+            export(path)
+        except OSError:
+            pass
+
+
+# ================== Profiling ==================
+
+class SessionProfile:
+    """
+    cProfile and tracemalloc over a whole session.
+
+    Calls made through run() are profiled (one at a time, since a profiler
+    follows a single thread); tracemalloc sees every thread. write_reports()
+    saves the raw profile (.pstats, for snakeviz or pstats) and a text
+    report with the top functions and allocation sites (.txt).
+    """
+
+    def __init__(self, prefix: str = PROFILE_PREFIX) -> None:
+        import cProfile
+        import tracemalloc
+
+        self.prefix = prefix
+        self._profiler = cProfile.Profile()
+        self._lock = _thread.allocate_lock()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_FRAMES)
+
+    def run(self, fn, *args, **kwargs):
+        with self._lock:
+            return self._profiler.runcall(fn, *args, **kwargs)
+
+    def write_reports(self) -> list[str]:
+        import io
+        import pstats
+        import tracemalloc
+
+        stats_path = self.prefix + ".pstats"
+        report_path = self.prefix + ".txt"
+        with self._lock:
+            self._profiler.dump_stats(stats_path)
+            out = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+        out.write("\n# ================== Memory (tracemalloc) ==================\n\n")
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            out.write(f"current {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB\n\n")
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP]:
+                out.write(f"{stat}\n")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        return [stats_path, report_path]
+
+
+_profile = None
+
+
+def start_profile(prefix: str = PROFILE_PREFIX) -> SessionProfile:
+    """
+    The process's session profile, started on first use (--profile).
+    Also turns metrics on; at exit the reports and prefix.prom are written.
+    """
+    global _profile
+    if _profile is None:
+        _profile = SessionProfile(prefix)
+        enable(prefix + ".prom")
+        atexit.register(_profile.write_reports)
+    return _profile
+
+
+if os.environ.get(METRICS_ENV):
+    enable(os.environ[METRICS_ENV])
@@ -0,0 +1,242 @@
+import os
+import shutil
+import sys
+import zlib
+from collections.abc import MutableMapping
+
+from vault_events import StorageEvents, check_account
+from vault_journal import JOURNAL_SUFFIX, ROTATED_SUFFIX, read_snapshot, replay_journal, write_snapshot
+
+# ================== Constants ==================
+
+VAULT_DIR = "app_passwords.d"
+META_FILE = "shards.meta"
+DEFAULT_SHARDS = 16
+
+
+# ================== Shard helpers ==================
+
+def shard_of(account: str, shard_count: int) -> int:
+    """Stable shard number for an account (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(account.encode("utf-8")) % shard_count
+
+
+def shard_path(vault_dir: str, shard: int) -> str:
+    return os.path.join(vault_dir, f"shard-{shard:04d}.txt")
+
+
+def read_shard_count(vault_dir: str) -> int | None:
+    meta = os.path.join(vault_dir, META_FILE)
+    if not os.path.exists(meta):
+        return None
+    with open(meta, "r") as f:
+        return int(f.read().strip())
+
+
+def _staging_dir(vault_dir: str) -> str:
+    return vault_dir.rstrip(os.sep) + ".reshard"
+
+
+def _retired_dir(vault_dir: str) -> str:
+    return vault_dir.rstrip(os.sep) + ".old"
+
+
+def recover_reshard(vault_dir: str) -> bool:
+    """
+    Undo a reshard that crashed between moving vault_dir aside and moving
+    the new layout in: the old layout is complete, so it goes back in place.
+    Returns whether there was anything to recover.
+    """
+    retired = _retired_dir(vault_dir)
+    if os.path.exists(vault_dir) or not os.path.exists(retired):
+        return False
+    os.replace(retired, vault_dir)
+    return True
+
+
+def write_shard_count(vault_dir: str, shard_count: int) -> None:
+    meta = os.path.join(vault_dir, META_FILE)
+    with open(meta + ".tmp", "w") as f:
+        f.write(f"{shard_count}\n")
+    os.replace(meta + ".tmp", meta)
+
+
+# ================== Sharded storage ==================
+
+class ShardedStorage(StorageEvents, MutableMapping):
+    """
+    Accounts hash-partitioned across shard files in a vault directory.
+
+    Each shard is an ordinary "account:encoded" text file that is loaded the
+    first time one of its accounts is touched and rewritten by save() only if
+    it changed. A lookup in update/delete therefore reads a single shard.
+    """
+
+    def __init__(self, vault_dir: str = VAULT_DIR, shard_count: int = DEFAULT_SHARDS) -> None:
+        self.vault_dir = vault_dir
+        # Before creating vault_dir, which would hide the retired layout.
+        recover_reshard(vault_dir)
+        os.makedirs(vault_dir, exist_ok=True)
+
+        existing = read_shard_count(vault_dir)
+        if existing is None:
+            write_shard_count(vault_dir, shard_count)
+            existing = shard_count
+        self.shard_count = existing
+
+        self._shards: dict[int, dict] = {}
+        self._dirty: set[int] = set()
+
+    def _shard(self, shard: int) -> dict:
+        entries = self._shards.get(shard)
+        if entries is None:
+            entries = {}
+            read_snapshot(shard_path(self.vault_dir, shard), entries)
+            self._shards[shard] = entries
+        return entries
+
+    def _shard_for(self, account: str) -> tuple[int, dict]:
+        shard = shard_of(account, self.shard_count)
+        return shard, self._shard(shard)
+
+    def __getitem__(self, account: str) -> str:
+        return self._shard_for(account)[1][account]
+
+    def __contains__(self, account) -> bool:
+        return isinstance(account, str) and account in self._shard_for(account)[1]
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        check_account(account)
+        shard, entries = self._shard_for(account)
+        old = entries.get(account)
+        entries[account] = encoded_pw
+        self._dirty.add(shard)
+        self._notify_set(account, old, encoded_pw)
+
+    def __delitem__(self, account: str) -> None:
+        shard, entries = self._shard_for(account)
+        old = entries.pop(account)
+        self._dirty.add(shard)
+        self._notify_delete(account, old)
+
+    def __iter__(self):
+        for shard in range(self.shard_count):
+            yield from list(self._shard(shard))
+
+    def __len__(self) -> int:
+        return sum(len(self._shard(shard)) for shard in range(self.shard_count))
+
+    def loaded_shards(self) -> int:
+        return len(self._shards)
+
+    def save(self) -> int:
+        """
+        Rewrite only the shards that changed. Returns how many were written.
+        Safe to call from a background writer while the vault keeps changing:
+        the dirty set is swapped out and each shard is copied before writing.
+        """
+        dirty, self._dirty = self._dirty, set()
+        for shard in sorted(dirty):
+            write_snapshot(shard_path(self.vault_dir, shard), dict(self._shards[shard]))
+        return len(dirty)
+
+    def unload(self) -> None:
+        """Drop clean shards from memory."""
+        for shard in list(self._shards):
+            if shard not in self._dirty:
+                del self._shards[shard]
+
+
+# ================== Resharding & import ==================
+
+def _stream_into_shards(lines, vault_dir: str, shard_count: int) -> int:
+    """Append "account:encoded" lines to the matching shard files of vault_dir."""
+    handles = [open(shard_path(vault_dir, s), "w", encoding="utf-8") for s in range(shard_count)]
+    moved = 0
+    try:
+        for line in lines:
+            if ":" not in line:
+                continue
+            account = line.rstrip("\n").rsplit(":", 1)[0]
+            handles[shard_of(account, shard_count)].write(line if line.endswith("\n") else line + "\n")
+            moved += 1
+    finally:
+        for handle in handles:
+            handle.close()
+    return moved
+
+
+def _iter_shard_lines(vault_dir: str, shard_count: int):
+    for shard in range(shard_count):
+        path = shard_path(vault_dir, shard)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                yield from f
+
+
+def reshard(vault_dir: str, new_count: int) -> int:
+    """
+    Rebalance vault_dir to new_count shards.
+
+    Entries are streamed line by line from the old shards into the new ones,
+    so memory use does not depend on vault size. The new layout is built in a
+    sibling directory and swapped in once complete.
+    """
+    recover_reshard(vault_dir)
+    old_count = read_shard_count(vault_dir)
+    if old_count is None:
+        raise FileNotFoundError(f"{vault_dir} is not a sharded vault.")
+
+    staging = _staging_dir(vault_dir)
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    moved = _stream_into_shards(_iter_shard_lines(vault_dir, old_count), staging, new_count)
+    write_shard_count(staging, new_count)
+
+    retired = _retired_dir(vault_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+    # A crash between these two leaves no vault_dir; opening the vault or
+    # the next reshard moves the retired layout back (recover_reshard).
+    os.replace(vault_dir, retired)
+    os.replace(staging, vault_dir)
+    shutil.rmtree(retired)
+    return moved
+
+
+def import_text_vault(text_path: str, vault_dir: str, shard_count: int = DEFAULT_SHARDS) -> int:
+    """
+    Split an app_passwords.txt snapshot into a new sharded vault, then apply
+    its journals on top. Returns the number of accounts imported.
+    """
+    os.makedirs(vault_dir, exist_ok=True)
+    with open(text_path, "r", encoding="utf-8") as f:
+        _stream_into_shards(f, vault_dir, shard_count)
+    write_shard_count(vault_dir, shard_count)
+
+    # Replayed into the shards they touch, so only those are loaded.
+    storage = ShardedStorage(vault_dir)
+    replay_journal(text_path + ROTATED_SUFFIX, storage)
+    replay_journal(text_path + JOURNAL_SUFFIX, storage)
+    storage.save()
+    return len(storage)
+
+
+def main(argv: list[str]) -> int:
+    usage = (
+        "usage: python vault_sharded.py import <text file> <vault dir> [shards]\n"
+        "       python vault_sharded.py reshard <vault dir> <shards>"
+    )
+    if len(argv) >= 3 and argv[0] == "import":
+        shards = int(argv[3]) if len(argv) > 3 else DEFAULT_SHARDS
+        print(f"Imported {import_text_vault(argv[1], argv[2], shards)} accounts.")
+    elif len(argv) == 3 and argv[0] == "reshard":
+        print(f"Moved {reshard(argv[1], int(argv[2]))} accounts.")
+    else:
+        print(usage)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
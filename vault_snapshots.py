@@ -0,0 +1,395 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store lock then only orders this process.
+    fcntl = None
+
+# ================== Constants ==================
+
+SNAPSHOTS_SUFFIX = ".snapshots"
+OBJECTS_DIR = "objects"
+MANIFESTS_DIR = "manifests"
+LOCK_FILE = "lock"
+MANIFEST_VERSION = 1
+
+# A leaf chunk ends after an account whose name hashes to 0 modulo
+# LEAF_ENTRIES, so leaves hold that many entries on average; an index chunk
+# ends likewise after about FANOUT children. MAX_CHUNK_ROWS bounds a run of
+# names that never hit a boundary.
+LEAF_ENTRIES = 16
+FANOUT = 16
+MAX_CHUNK_ROWS = 256
+
+
+# ================== Chunk tree ==================
+#
+# A snapshot is a tree of content-addressed chunks. Leaves are runs of the
+# vault's "account:encoded" lines in account order; index chunks list their
+# children as "<chunk id> <first account>" lines, level by level up to a
+# single root. Every boundary is decided by the account names around it, not
+# by positions or contents, so changing an entry only changes its leaf and
+# the index chunks above it, and adding or removing an account only touches
+# its neighbours: all other chunks come out byte for byte the same as in the
+# previous snapshot and are not written again.
+
+def chunk_id(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _boundary(account: str, level: int, every: int) -> bool:
+    # blake2b is stable across runs and machines, unlike hash(), and keyed
+    # by the level it gives each level an independent hash. A seeded crc32
+    # does not: CRC is affine in its seed, so for names of equal length
+    # every level would cut on the same bits, and with sequential names
+    # hardly any index chunk would end before MAX_CHUNK_ROWS.
+    digest = hashlib.blake2b(account.encode("utf-8"), digest_size=8, key=bytes((level,))).digest()
+    return int.from_bytes(digest, "little") % every == 0
+
+
+def leaf_chunks(entries: dict):
+    """Yield (first account, bytes) for the leaves of entries."""
+    lines = []
+    first = None
+    for account in sorted(entries):
+        if not lines:
+            first = account
+        lines.append(f"{account}:{entries[account]}\n")
+        if _boundary(account, 0, LEAF_ENTRIES) or len(lines) >= MAX_CHUNK_ROWS:
+            yield first, "".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        yield first, "".join(lines).encode("utf-8")
+
+
+def index_chunks(refs: list[tuple[str, str]], level: int):
+    """Yield (first account, bytes) for the index chunks over (id, first account) refs."""
+    lines = []
+    first = None
+    for cid, child_first in refs:
+        if not lines:
+            first = child_first
+        lines.append(f"{cid} {child_first}\n")
+        if _boundary(child_first, level, FANOUT) or len(lines) >= MAX_CHUNK_ROWS:
+            yield first, "".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        yield first, "".join(lines).encode("utf-8")
+
+
+# Chunks are split on "\n" only: str.splitlines() would also break lines at
+# characters such as "\x0c" or "\u2028", which account names may contain.
+
+def parse_leaf(data: bytes, entries: dict) -> None:
+    for line in data.decode("utf-8").split("\n")[:-1]:
+        # Base64 never contains ":", so the last one splits the entry.
+        account, encoded_pw = line.rsplit(":", 1)
+        entries[account] = encoded_pw
+
+
+def parse_index(data: bytes) -> list[tuple[str, str]]:
+    return [tuple(line.split(" ", 1)) for line in data.decode("utf-8").split("\n")[:-1]]
+
+
+# ================== Snapshot store ==================
+
+class SnapshotStore:
+    """
+    Content-addressed snapshots of a vault in a directory
+    (app_passwords.txt.snapshots by default).
+
+        objects/ab/ab12...   chunks, named by their BLAKE2b digest
+        manifests/<id>.json  one per snapshot: its root chunk and depth
+
+    A snapshot only writes the chunks that the store does not have yet, so
+    hourly history of a large vault costs about the leaves that changed each
+    hour plus the index chunks above them. Restoring walks the tree down from
+    the manifest's root (checking every digest); gc() drops the chunks that
+    no remaining snapshot reaches. Creating snapshots and collecting garbage
+    hold an flock on the store, so gc never removes the chunks of a snapshot
+    being written.
+    """
+
+    def __init__(self, store_dir: str) -> None:
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, OBJECTS_DIR)
+        self.manifests_dir = os.path.join(store_dir, MANIFESTS_DIR)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.store_dir, LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    # ----- chunks -----
+
+    def _chunk_path(self, cid: str) -> str:
+        return os.path.join(self.objects_dir, cid[:2], cid)
+
+    def _stored_chunks(self) -> dict[str, str]:
+        """Id -> path of every chunk in the store (one directory scan)."""
+        stored = {}
+        for bucket in os.scandir(self.objects_dir):
+            if bucket.is_dir():
+                for chunk in os.scandir(bucket.path):
+                    if not chunk.name.endswith(".tmp"):
+                        stored[chunk.name] = chunk.path
+        return stored
+
+    def _write_chunk(self, cid: str, data: bytes) -> None:
+        # Not fsynced one by one: create() syncs once before the manifest
+        # that makes them reachable is written.
+        path = self._chunk_path(cid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def read_chunk(self, cid: str) -> bytes:
+        with open(self._chunk_path(cid), "rb") as f:
+            data = f.read()
+        if chunk_id(data) != cid:
+            raise ValueError(f"Chunk {cid} is corrupt.")
+        return data
+
+    # ----- manifests -----
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.manifests_dir, snapshot_id + ".json")
+
+    def snapshots(self) -> list[str]:
+        """Snapshot ids, oldest first (ids sort by creation time)."""
+        return sorted(name[:-5] for name in os.listdir(self.manifests_dir) if name.endswith(".json"))
+
+    def manifest(self, snapshot_id: str) -> dict:
+        try:
+            with open(self._manifest_path(snapshot_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(snapshot_id) from None
+
+    def latest(self) -> str | None:
+        ids = self.snapshots()
+        return ids[-1] if ids else None
+
+    # ----- snapshots -----
+
+    def create(self, storage, source: str = "") -> dict:
+        """
+        Snapshot storage and return its manifest, plus "new_chunks" and
+        "new_bytes": how much this snapshot had to write.
+        """
+        entries = storage.snapshot() if hasattr(storage, "snapshot") else dict(storage)
+        with self._locked():
+            stored = self._stored_chunks()
+            stats = {"chunks": 0, "bytes": 0, "new_chunks": 0, "new_bytes": 0}
+
+            def store(chunks) -> list[tuple[str, str]]:
+                refs = []
+                for first, data in chunks:
+                    cid = chunk_id(data)
+                    if cid not in stored:
+                        self._write_chunk(cid, data)
+                        stored[cid] = self._chunk_path(cid)
+                        stats["new_chunks"] += 1
+                        stats["new_bytes"] += len(data)
+                    stats["chunks"] += 1
+                    stats["bytes"] += len(data)
+                    refs.append((cid, first))
+                return refs
+
+            refs = store(leaf_chunks(entries)) or store([("", b"")])
+            depth = 0
+            while len(refs) > 1:
+                depth += 1
+                refs = store(index_chunks(refs, depth))
+            if stats["new_chunks"] and hasattr(os, "sync"):
+                os.sync()
+
+            now = time.time()
+            snapshot_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f".{int(now % 1 * 1e6):06d}Z"
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "id": snapshot_id,
+                "created": now,
+                "source": source,
+                "accounts": len(entries),
+                "root": refs[0][0],
+                "depth": depth,
+                **stats,
+            }
+            path = self._manifest_path(snapshot_id)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+        return manifest
+
+    def _walk(self, cid: str, depth: int, on_leaf=None, seen: set | None = None) -> None:
+        """
+        Visit the tree under cid. Leaves are passed to on_leaf (their ids
+        are added to seen, without reading them, when there is none);
+        subtrees already in seen are skipped.
+        """
+        if seen is not None:
+            if cid in seen:
+                return
+            seen.add(cid)
+        if depth == 0:
+            if on_leaf is not None:
+                on_leaf(self.read_chunk(cid))
+            return
+        for child, _ in parse_index(self.read_chunk(cid)):
+            self._walk(child, depth - 1, on_leaf, seen)
+
+    def restore(self, snapshot_id: str) -> dict:
+        """The entries of a snapshot, read back by walking its tree."""
+        manifest = self.manifest(snapshot_id)
+        entries = {}
+        self._walk(manifest["root"], manifest["depth"], lambda data: parse_leaf(data, entries))
+        return entries
+
+    def restore_account(self, snapshot_id: str, account: str) -> str | None:
+        """One account's encoded password in a snapshot, reading one chunk per level."""
+        manifest = self.manifest(snapshot_id)
+        cid = manifest["root"]
+        for _ in range(manifest["depth"]):
+            children = parse_index(self.read_chunk(cid))
+            i = bisect_right([first for _, first in children], account) - 1
+            if i < 0:
+                return None
+            cid = children[i][0]
+        entries = {}
+        parse_leaf(self.read_chunk(cid), entries)
+        return entries.get(account)
+
+    def delete(self, snapshot_id: str) -> None:
+        """Forget a snapshot; its chunks go at the next gc()."""
+        try:
+            os.remove(self._manifest_path(snapshot_id))
+        except FileNotFoundError:
+            raise KeyError(snapshot_id) from None
+
+    def gc(self, keep: int | None = None) -> dict:
+        """
+        Delete all but the keep newest snapshots (all are kept for None),
+        then every chunk that no remaining snapshot reaches. Subtrees shared
+        by several snapshots are walked once, and leaves are never read.
+        """
+        with self._locked():
+            ids = self.snapshots()
+            dropped = [] if keep is None else ids[:max(len(ids) - keep, 0)]
+            for snapshot_id in dropped:
+                os.remove(self._manifest_path(snapshot_id))
+
+            live = set()
+            for snapshot_id in self.snapshots():
+                manifest = self.manifest(snapshot_id)
+                self._walk(manifest["root"], manifest["depth"], seen=live)
+
+            removed, freed = 0, 0
+            for cid, path in self._stored_chunks().items():
+                if cid not in live:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return {"snapshots_dropped": len(dropped), "chunks_removed": removed,
+                "bytes_freed": freed, "chunks_live": len(live)}
+
+
+def store_for(vault_path: str) -> SnapshotStore:
+    return SnapshotStore(vault_path + SNAPSHOTS_SUFFIX)
+
+
+# ================== Command line ==================
+
+def restore_into(storage, entries: dict) -> tuple[int, int]:
+    """
+    Make storage hold exactly entries, through its own mutators (so the
+    change is journaled and listeners hear of it). Returns (set, deleted).
+    """
+    gone = [account for account in storage if account not in entries]
+    changed = [(account, encoded_pw) for account, encoded_pw in entries.items()
+               if storage.get(account) != encoded_pw]
+    for account in gone:
+        del storage[account]
+    if hasattr(storage, "set_many"):
+        storage.set_many(changed)
+    else:
+        storage.update(changed)
+    return len(changed), len(gone)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Incremental snapshots of the password vault.")
+    parser.add_argument("--vault", help="vault file (default: $PM_VAULT or app_passwords.txt)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("create", help="snapshot the vault")
+    sub.add_parser("list", help="list snapshots")
+
+    res = sub.add_parser("restore", help="restore a snapshot (default: the latest)")
+    res.add_argument("snapshot", nargs="?")
+    res.add_argument("--to", metavar="FILE", help="write it to a new vault file instead of the live vault")
+
+    gc = sub.add_parser("gc", help="drop old snapshots and unreferenced chunks")
+    gc.add_argument("--keep", type=int, help="keep only the newest KEEP snapshots")
+
+    args = parser.parse_args(argv)
+
+    from vault_engine import load_passwords, save_passwords, vault_path
+    path = vault_path(args.vault)
+    store = store_for(path)
+
+    if args.command == "create":
+        storage = load_passwords(path)
+        manifest = store.create(storage, source=path)
+        print(f"Snapshot {manifest['id']}: {manifest['accounts']} accounts, "
+              f"{manifest['new_chunks']} of {manifest['chunks']} chunks written "
+              f"({manifest['new_bytes']:,} of {manifest['bytes']:,} bytes).")
+    elif args.command == "list":
+        for snapshot_id in store.snapshots():
+            manifest = store.manifest(snapshot_id)
+            print(f"{snapshot_id}  {manifest['accounts']:>9} accounts  {manifest['bytes']:>12,} bytes")
+    elif args.command == "restore":
+        snapshot_id = args.snapshot or store.latest()
+        if snapshot_id is None:
+            print("No snapshots.")
+            return 1
+        try:
+            entries = store.restore(snapshot_id)
+        except KeyError:
+            print(f"Snapshot {snapshot_id} not found.")
+            return 1
+        if args.to:
+            from vault_journal import write_snapshot
+            write_snapshot(args.to, entries)
+            print(f"Wrote {len(entries)} accounts from {snapshot_id} to {args.to}.")
+        else:
+            storage = load_passwords(path)
+            # Snapshot the current state first, so the restore can be undone.
+            undo = store.create(storage, source=path)
+            changed, deleted = restore_into(storage, entries)
+            save_passwords(storage, path)
+            print(f"Restored {snapshot_id}: {changed} accounts set, {deleted} deleted "
+                  f"(previous state saved as {undo['id']}).")
+    else:
+        stats = store.gc(args.keep)
+        print(f"Dropped {stats['snapshots_dropped']} snapshots and {stats['chunks_removed']} chunks "
+              f"({stats['bytes_freed']:,} bytes); {stats['chunks_live']} chunks in use.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
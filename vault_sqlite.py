@@ -0,0 +1,217 @@
+import os
+import sqlite3
+import sys
+import threading
+from collections.abc import MutableMapping
+
+from vault_events import StorageEvents, check_account
+from vault_journal import JOURNAL_SUFFIX, ROTATED_SUFFIX, read_snapshot, replay_journal
+
+# ================== Constants ==================
+
+DATABASE_FILE = "app_passwords.db"
+
+# Account names are stored .title()-normalized by every front-end, so the
+# key uses NOCASE: "github", "GITHUB" and "Github" are the same account, as
+# they are after .title() (for ASCII names). WITHOUT ROWID clusters the rows
+# on that key, so a point lookup is a single B-tree search.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT NOT NULL PRIMARY KEY COLLATE NOCASE,
+    encoded TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+# The statements are constants so sqlite3's per-connection statement cache
+# prepares each one once and reuses it.
+SELECT_ONE = "SELECT encoded FROM accounts WHERE account = ?"
+SELECT_ROW = "SELECT account, encoded FROM accounts WHERE account = ?"
+SELECT_ACCOUNTS = "SELECT account FROM accounts"
+SELECT_ITEMS = "SELECT account, encoded FROM accounts"
+COUNT = "SELECT count(*) FROM accounts"
+UPSERT = (
+    "INSERT INTO accounts (account, encoded) VALUES (?, ?) "
+    "ON CONFLICT (account) DO UPDATE SET encoded = excluded.encoded"
+)
+DELETE = "DELETE FROM accounts WHERE account = ?"
+DELETE_ALL = "DELETE FROM accounts"
+
+
+# ================== SQLite storage ==================
+
+class SqliteStorage(StorageEvents, MutableMapping):
+    """
+    Accounts kept in a SQLite database in WAL mode.
+
+    Every set or delete is its own small transaction, so a change costs a
+    point update instead of a rewrite of the vault; set_many() and clear()
+    run as a single transaction. Writes share one connection behind a lock,
+    while each reading thread gets its own connection: in WAL mode readers
+    see the last committed state and never wait for a writer.
+    """
+
+    def __init__(self, path: str = DATABASE_FILE) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._readers = threading.local()
+        self._conn = self._connect(check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Safe in WAL mode: a crash can lose the last commits but never
+        # corrupts the database. save() checkpoints to make them durable.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        # isolation_level=None: autocommit, transactions are opened explicitly.
+        return sqlite3.connect(self.path, isolation_level=None, **kwargs)
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._readers.conn = conn
+        return conn
+
+    # ----- reads -----
+
+    def __getitem__(self, account: str) -> str:
+        row = self._reader().execute(SELECT_ONE, (account,)).fetchone()
+        if row is None:
+            raise KeyError(account)
+        return row[0]
+
+    def get(self, account: str, default=None):
+        row = self._reader().execute(SELECT_ONE, (account,)).fetchone()
+        return default if row is None else row[0]
+
+    def __contains__(self, account) -> bool:
+        return isinstance(account, str) and self.get(account) is not None
+
+    def __iter__(self):
+        # Fetched up front, so the caller may change the vault while iterating.
+        rows = self._reader().execute(SELECT_ACCOUNTS).fetchall()
+        return (account for (account,) in rows)
+
+    def __len__(self) -> int:
+        return self._reader().execute(COUNT).fetchone()[0]
+
+    def items(self) -> list[tuple[str, str]]:
+        """All (account, encoded) pairs in one query."""
+        return self._reader().execute(SELECT_ITEMS).fetchall()
+
+    def values(self) -> list[str]:
+        return [encoded for _, encoded in self.items()]
+
+    # ----- writes -----
+
+    def __setitem__(self, account: str, encoded_pw: str) -> None:
+        check_account(account)
+        with self._lock:
+            account, old = self._stored(account)
+            self._conn.execute(UPSERT, (account, encoded_pw))
+        self._notify_set(account, old, encoded_pw)
+
+    def __delitem__(self, account: str) -> None:
+        with self._lock:
+            account, old = self._stored(account)
+            if old is None:
+                raise KeyError(account)
+            self._conn.execute(DELETE, (account,))
+        self._notify_delete(account, old)
+
+    def _stored(self, account: str) -> tuple[str, str | None]:
+        """
+        The stored spelling of account and its encoded password, or
+        (account, None). NOCASE makes "github" update the "GitHub" row, which
+        keeps its name, so listeners must be told about "GitHub".
+        """
+        row = self._conn.execute(SELECT_ROW, (account,)).fetchone()
+        return (account, None) if row is None else row
+
+    def set_many(self, items) -> None:
+        """Set a batch of (account, encoded) pairs in one transaction."""
+        items = list(items)
+        for account, _ in items:
+            check_account(account)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._listeners:
+                    changes = []
+                    for account, encoded_pw in items:
+                        account, old = self._stored(account)
+                        changes.append((account, old, encoded_pw))
+                        self._conn.execute(UPSERT, (account, encoded_pw))
+                else:
+                    changes = ()
+                    self._conn.executemany(UPSERT, items)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        for account, old, encoded_pw in changes:
+            self._notify_set(account, old, encoded_pw)
+
+    def clear(self) -> None:
+        with self._lock:
+            removed = self.items() if self._listeners else ()
+            self._conn.execute(DELETE_ALL)
+        for account, old in removed:
+            self._notify_delete(account, old)
+
+    # ----- persistence -----
+
+    def save(self) -> None:
+        """
+        Every change is already committed; checkpoint the WAL into the
+        database file so the committed changes are durable.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        reader = getattr(self._readers, "conn", None)
+        if reader is not None:
+            reader.close()
+            self._readers.conn = None
+
+
+# ================== Migration ==================
+
+def migrate_text_vault(text_path: str, db_path: str = DATABASE_FILE) -> int:
+    """
+    Copy an app_passwords.txt vault (snapshot plus journal) into a SQLite
+    database in one transaction. Returns the number of accounts copied.
+    """
+    entries = {}
+    read_snapshot(text_path, entries)
+    replay_journal(text_path + ROTATED_SUFFIX, entries)
+    replay_journal(text_path + JOURNAL_SUFFIX, entries)
+
+    storage = SqliteStorage(db_path)
+    try:
+        storage.set_many(entries.items())
+        storage.save()
+    finally:
+        storage.close()
+    return len(entries)
+
+
+def main(argv: list[str]) -> int:
+    usage = "usage: python vault_sqlite.py migrate <text file> [database]"
+    if len(argv) in (2, 3) and argv[0] == "migrate":
+        db_path = argv[2] if len(argv) == 3 else DATABASE_FILE
+        if not os.path.exists(argv[1]):
+            print(f"{argv[1]} not found.")
+            return 1
+        print(f"Migrated {migrate_text_vault(argv[1], db_path)} accounts into {db_path}.")
+    else:
+        print(usage)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
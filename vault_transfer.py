@@ -0,0 +1,260 @@
+import argparse
+import base64
+import csv
+import json
+import re
+import sys
+import time
+from itertools import islice
+from urllib.parse import urlsplit
+
+from vault_engine import evaluate_password
+
+# ================== Constants ==================
+
+BATCH_SIZE = 1000
+PROGRESS_EVERY = 10_000
+
+# Column names used by common password-manager and browser exports,
+# in order of preference.
+ACCOUNT_COLUMNS = ("account", "name", "title")
+URL_COLUMNS = ("url", "login_uri", "origin_url", "website")
+PASSWORD_COLUMNS = ("password", "login_password")
+
+DUPLICATE_POLICIES = ("skip", "overwrite", "rename")
+
+# Line breaks and other control characters in a name would split its record
+# in the line-based vault, journal and index formats.
+CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f-\x9f\u2028\u2029]")
+
+
+# ================== Import pipeline ==================
+#
+# Each stage is a generator, so only one batch of rows is held in memory
+# at a time whatever the size of the input file:
+#
+#   read_rows -> normalize -> evaluate (optional) -> encode -> write_batches
+
+def read_rows(f, fmt: str, stats: dict | None = None):
+    """
+    Yield one dict per CSV row or JSON Lines object. A JSON line that does not
+    parse to an object yields an empty row, so it is counted as invalid, and
+    its line number is added to stats["malformed_lines"].
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(f):
+            yield {(key or "").strip().lower(): value for key, value in row.items()}
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield {key.lower(): value for key, value in json.loads(line).items()}
+            except (ValueError, AttributeError):
+                if stats is not None:
+                    stats["malformed_lines"].append(line_no)
+                yield {}
+    else:
+        raise ValueError(f"Unknown format '{fmt}'.")
+
+
+def _first(row: dict, columns) -> str:
+    for column in columns:
+        value = row.get(column)
+        if value:
+            return str(value).strip()
+    return ""
+
+
+def normalize(rows, stats: dict):
+    """
+    Yield (account, password) pairs, with account names normalized by the
+    same .title() rule as add_password. Rows without a name fall back to the
+    host of their URL; rows without a password, or whose name contains
+    control characters, are dropped.
+    """
+    for row in rows:
+        stats["read"] += 1
+        account = _first(row, ACCOUNT_COLUMNS)
+        if not account:
+            url = _first(row, URL_COLUMNS)
+            account = urlsplit(url if "//" in url else "//" + url).hostname or url
+        password = _first(row, PASSWORD_COLUMNS)
+        if not account or not password:
+            stats["invalid"] += 1
+            continue
+        if CONTROL_CHARS.search(account):
+            stats["invalid"] += 1
+            stats["control_chars"] += 1
+            continue
+        yield account.title(), password
+
+
+def evaluate(entries, stats: dict, skip_weak: bool = False):
+    """Run evaluate_password on each entry, tallying (and optionally dropping) weak ones."""
+    for account, password in entries:
+        result = evaluate_password(password)
+        strength = result["strength"]
+        stats[strength] += 1
+        stats["breached"] += result["breached"]
+        if skip_weak and strength == "Weak":
+            stats["skipped_weak"] += 1
+            continue
+        yield account, password
+
+
+def encode(entries):
+    """Base64-encode passwords the same way add_password does."""
+    for account, password in entries:
+        yield account, base64.b64encode(password.encode()).decode()
+
+
+def _resolve_duplicate(storage, pending: dict, account: str, policy: str) -> str | None:
+    """Return the name to store account under, or None to skip it."""
+    if account not in storage and account not in pending:
+        return account
+    if policy == "overwrite":
+        return account
+    if policy == "rename":
+        n = 2
+        while f"{account} ({n})" in storage or f"{account} ({n})" in pending:
+            n += 1
+        return f"{account} ({n})"
+    return None
+
+
+def write_batches(entries, storage, stats: dict, policy: str = "skip",
+                  batch_size: int = BATCH_SIZE, progress=None) -> None:
+    """
+    Write entries into storage batch_size at a time.
+    Storages with set_many() (e.g. the journaled vault) get one write per batch.
+    """
+    set_many = getattr(storage, "set_many", None)
+    entries = iter(entries)
+    while True:
+        chunk = list(islice(entries, batch_size))
+        if not chunk:
+            break
+
+        pending = {}
+        for account, encoded_pw in chunk:
+            name = _resolve_duplicate(storage, pending, account, policy)
+            if name is None:
+                stats["duplicates_skipped"] += 1
+                continue
+            if name != account:
+                stats["renamed"] += 1
+            pending[name] = encoded_pw
+
+        if set_many is not None:
+            set_many(pending.items())
+        else:
+            for account, encoded_pw in pending.items():
+                storage[account] = encoded_pw
+        stats["written"] += len(pending)
+
+        if progress is not None:
+            progress(stats)
+
+
+def new_stats() -> dict:
+    return {
+        "read": 0, "invalid": 0, "control_chars": 0, "written": 0, "duplicates_skipped": 0, "renamed": 0,
+        "Weak": 0, "Medium": 0, "Strong": 0, "breached": 0, "skipped_weak": 0,
+        "malformed_lines": [], "started": time.perf_counter(),
+    }
+
+
+def import_file(f, storage, fmt: str = "csv", policy: str = "skip", run_evaluation: bool = False,
+                skip_weak: bool = False, batch_size: int = BATCH_SIZE, progress=None) -> dict:
+    """Stream an export file into storage. Returns the pipeline statistics."""
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy '{policy}'.")
+    stats = new_stats()
+    entries = normalize(read_rows(f, fmt, stats), stats)
+    if run_evaluation or skip_weak:
+        entries = evaluate(entries, stats, skip_weak)
+    write_batches(encode(entries), storage, stats, policy, batch_size, progress)
+    return stats
+
+
+# ================== Export ==================
+
+def export_file(storage, f, fmt: str = "csv") -> int:
+    """Stream every account of storage with its decoded password to f."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(f)
+        writer.writerow(["name", "password"])
+    for account in storage:
+        password = base64.b64decode(storage[account].encode()).decode()
+        if fmt == "csv":
+            writer.writerow([account, password])
+        else:
+            f.write(json.dumps({"account": account, "password": password}) + "\n")
+        count += 1
+    return count
+
+
+# ================== Command line ==================
+
+def print_progress(stats: dict) -> None:
+    if stats["read"] - stats.get("_last_report", 0) < PROGRESS_EVERY:
+        return
+    stats["_last_report"] = stats["read"]
+    elapsed = time.perf_counter() - stats["started"]
+    print(
+        f"\r{stats['read']:,} read, {stats['written']:,} written "
+        f"({stats['read'] / elapsed:,.0f} rows/s)",
+        end="", file=sys.stderr, flush=True,
+    )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import/export of the password vault.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="import a CSV or JSON Lines export")
+    imp.add_argument("file")
+    imp.add_argument("--format", choices=("csv", "jsonl"))
+    imp.add_argument("--on-duplicate", choices=DUPLICATE_POLICIES, default="skip")
+    imp.add_argument("--evaluate", action="store_true", help="report password strengths")
+    imp.add_argument("--skip-weak", action="store_true", help="do not import weak passwords")
+
+    exp = sub.add_parser("export", help="export the vault with decoded passwords")
+    exp.add_argument("file")
+    exp.add_argument("--format", choices=("csv", "jsonl"))
+
+    args = parser.parse_args(argv)
+    fmt = args.format or ("jsonl" if args.file.endswith((".jsonl", ".ndjson")) else "csv")
+
+    from vault_engine import load_passwords, save_passwords
+    storage = load_passwords()
+
+    if args.command == "export":
+        with open(args.file, "w", newline="", encoding="utf-8") as f:
+            print(f"Exported {export_file(storage, f, fmt)} accounts.")
+        return 0
+
+    with open(args.file, "r", newline="", encoding="utf-8-sig") as f:
+        stats = import_file(f, storage, fmt, args.on_duplicate, args.evaluate,
+                            args.skip_weak, progress=print_progress)
+    save_passwords(storage)
+
+    elapsed = time.perf_counter() - stats["started"]
+    print(file=sys.stderr)
+    for line_no in stats["malformed_lines"]:
+        print(f"Skipped line {line_no}: not a JSON object.", file=sys.stderr)
+    print(f"Imported {stats['written']} of {stats['read']} rows in {elapsed:.1f}s "
+          f"({stats['duplicates_skipped']} duplicates skipped, {stats['renamed']} renamed, "
+          f"{stats['invalid']} invalid, {stats['control_chars']} of them for control "
+          f"characters in the name).")
+    if args.evaluate or args.skip_weak:
+        print(f"Strength: Weak {stats['Weak']}, Medium {stats['Medium']}, Strong {stats['Strong']}, "
+              f"breached {stats['breached']}"
+              + (f" ({stats['skipped_weak']} weak skipped)" if args.skip_weak else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
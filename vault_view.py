@@ -0,0 +1,51 @@
+import base64
+import html
+
+# ================== Account list paging ==================
+#
+# Pure helpers behind view_passwords_ui, kept free of Streamlit so they can
+# be timed (see benchmarks/bench_view_render.py).
+
+SORT_ORDERS = ("A → Z", "Z → A")
+PAGE_SIZES = (25, 50, 100, 250)
+
+HIDDEN_PASSWORD = "<span class='password-hidden'>●●●●●●●●</span>"
+
+
+def order_accounts(accounts: list[str], order: str) -> list[str]:
+    """accounts is already sorted A → Z (as search_accounts returns it)."""
+    if order == SORT_ORDERS[1]:
+        return accounts[::-1]
+    return accounts
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+
+def page_slice(total: int, page: int, page_size: int) -> tuple[int, int]:
+    """Start/end indexes of a 1-based page, clamped to the valid range."""
+    page = min(max(page, 1), page_count(total, page_size))
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
+
+
+def render_page_html(storage, accounts: list[str], first_number: int, show_passwords: bool,
+                     reveal=None) -> str:
+    """
+    One HTML block for a page of accounts.
+    Only the passwords of these rows are read and decoded, through
+    reveal(account) when given (e.g. a SecretCache's get).
+    """
+    rows = []
+    for i, acc in enumerate(accounts, start=first_number):
+        if show_passwords:
+            if reveal is not None:
+                plaintext = reveal(acc)
+            else:
+                plaintext = base64.b64decode(storage[acc].encode()).decode()
+            password_display = html.escape(plaintext)
+        else:
+            password_display = HIDDEN_PASSWORD
+        rows.append(f"{i}. <b>{html.escape(acc)}</b> : {password_display}")
+    return "<p class='listed-passwords'>" + "<br>".join(rows) + "</p>"